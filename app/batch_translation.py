@@ -0,0 +1,373 @@
+"""
+batch_translation.py
+─────────────────────────────────────────────
+Offline translation through the OpenAI Batch API, for large backlogs
+that do not need interactive latency (half the price of synchronous
+requests, with separate rate limits).
+
+OCR runs first and leaves every translation empty. The distinct
+untranslated lines in extractions.json are then written as a JSONL file
+of chat completion requests, submitted as one batch, polled until the
+batch finishes and joined back into extractions.json. The batch id and
+the request → texts mapping are kept in a state file next to the
+output, so a restarted process resumes the same batch instead of
+submitting (and paying for) it again.
+"""
+
+import json
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+
+from openai import OpenAI
+
+from config.settings import (
+    BATCH_POLL_SECONDS,
+    MODEL,
+    OPENAI_API_KEY,
+    OUTPUT_FOLDER,
+    TRANSLATION_MEMORY_ENABLED,
+    TRANSLATION_TOKEN_BUDGET,
+)
+from app.glossary import get_glossary
+from app.logger import get_logger
+from app.text_utils import normalize_japanese
+from app.token_estimator import split_by_token_budget, usage_entry
+from app.translation_memory import get_translation_memory
+from app.translator import (
+    PROMPT_VERSION,
+    build_translation_request,
+    parse_translation_items,
+)
+
+log = get_logger("batch_translation")
+
+BATCH_STATE_FILENAME = "translation_batch.json"
+
+_ENDPOINT = "/v1/chat/completions"
+_COMPLETION_WINDOW = "24h"
+_TERMINAL_STATUSES = ("completed", "failed", "expired", "cancelled")
+# Batch API jobs are billed at half the synchronous price
+_BATCH_DISCOUNT = 0.5
+
+
+class DeferredBatcher:
+    """
+    Drop-in for TranslationBatcher during a batch-mode OCR pass: pages
+    are finished straight away with empty translations, which the batch
+    job fills in later (one request line per distinct normalized text).
+    """
+
+    def __init__(self):
+        self.pages = 0
+        self.flushes = 0
+        self.texts = 0
+        self._seen: Set[str] = set()
+
+    def add(
+        self, texts: List[str], on_translated, label: str = "", on_item=None, held_bytes: int = 0
+    ) -> None:
+        self.pages += 1
+        self.texts += len(texts)
+        self._seen.update(key for key in map(normalize_japanese, texts) if key)
+        on_translated([""] * len(texts), usage_entry(0, 0))
+
+    def flush(self) -> None:
+        pass
+
+    def dedup_stats(self) -> Dict:
+        """Run-wide deduplication counters, as TranslationBatcher.dedup_stats()."""
+        return {
+            "texts": self.texts,
+            "unique": len(self._seen),
+            "dedup_ratio": round(1 - len(self._seen) / self.texts, 4) if self.texts else 0.0,
+        }
+
+
+class BatchTranslator:
+    """Submits, polls and joins one Batch API translation job at a time."""
+
+    def __init__(
+        self,
+        client=None,
+        state_path: Optional[Path] = None,
+        token_budget: int = TRANSLATION_TOKEN_BUDGET,
+        poll_seconds: float = BATCH_POLL_SECONDS,
+        use_memory: bool = TRANSLATION_MEMORY_ENABLED,
+    ):
+        """
+        Parameters
+        ----------
+        client : openai.OpenAI, optional
+            Pre-built client (or a local stand-in with the same
+            files.create / files.content / batches.create /
+            batches.retrieve methods).
+        state_path : Path, optional
+            Resume file; defaults to OUTPUT_FOLDER/translation_batch.json.
+            The request JSONL is written next to it.
+        token_budget : int
+            Estimated tokens per request line, as in synchronous mode.
+        poll_seconds : float
+            Delay between batch status checks.
+        use_memory : bool
+            Serve known lines from the translation memory and store the
+            batch's translations in it.
+        """
+        self._state_path = state_path or OUTPUT_FOLDER / BATCH_STATE_FILENAME
+        self._token_budget = int(token_budget)
+        self._poll_seconds = poll_seconds
+        self.memory = get_translation_memory(MODEL, PROMPT_VERSION) if use_memory else None
+
+        if client is not None:
+            self._client = client
+            return
+
+        if not OPENAI_API_KEY or OPENAI_API_KEY == "your-openai-api-key-here":
+            raise ValueError("OPENAI_API_KEY is not set. Add it to your .env file.")
+        self._client = OpenAI(api_key=OPENAI_API_KEY)
+
+    def translate_extractions(self, extractions_path: Path) -> Dict:
+        """
+        Fill the empty translations in ``extractions_path`` in place.
+
+        Resumes the batch recorded in the state file if there is one, then
+        submits a new batch for every untranslated line the glossary, the
+        translation memory and the resumed batch did not answer. Lines a
+        batch fails to translate stay empty; running again submits a batch
+        for them.
+
+        Parameters
+        ----------
+        extractions_path : Path
+            extractions.json written by the OCR stage.
+
+        Returns
+        -------
+        dict
+            Job statistics for the processing report.
+        """
+        with open(extractions_path, "r", encoding="utf-8") as fh:
+            extraction_data = json.load(fh)
+
+        keys = list(dict.fromkeys(
+            normalize_japanese(entry["japanese_text"])
+            for entry in _untranslated_entries(extraction_data)
+        ))
+        stats = {
+            "batch_id": None,
+            "status": None,
+            "batches": 0,
+            "texts": len(keys),
+            "glossary_hits": 0,
+            "memory_hits": 0,
+            "requests": 0,
+            "translated": 0,
+            "untranslated": 0,
+            "usage": usage_entry(0, 0),
+        }
+
+        glossary = get_glossary()
+        known: Dict[str, str] = {}
+        if glossary is not None:
+            for key in keys:
+                translation = glossary.lookup(key)
+                if translation:
+                    known[key] = translation
+            stats["glossary_hits"] = len(known)
+        if self.memory:
+            remembered = self.memory.lookup_many(key for key in keys if key not in known)
+            remembered.update(self.memory.lookup_similar(
+                key for key in keys if key not in known and key not in remembered
+            ))
+            stats["memory_hits"] = len(remembered)
+            known.update(remembered)
+
+        # A state file left by an interrupted run only covers that run's
+        # texts: once it is joined, whatever is still missing (lines a re-run
+        # of OCR added to extractions.json, or that the batch failed) goes
+        # out in one follow-up batch.
+        filled = 0
+        state = self._load_state()
+        if state is not None:
+            log.info(f"🔁 Resuming translation batch {state['batch_id']}")
+            filled += self._finish(state, known, stats, extraction_data, extractions_path)
+
+        missing = [key for key in keys if key not in known]
+        if missing:
+            if state is not None:
+                log.info(f"📤 {len(missing)} text(s) still untranslated after the resumed batch")
+            state = self._submit(missing)
+            filled += self._finish(state, known, stats, extraction_data, extractions_path)
+        elif state is None:
+            filled += self._join(extraction_data, known, extractions_path)
+        stats["untranslated"] = sum(1 for _ in _untranslated_entries(extraction_data))
+
+        log.info(
+            f"✅ Batch translation: {filled} segment(s) filled, "
+            f"{stats['untranslated']} still untranslated"
+        )
+        return stats
+
+    def _finish(
+        self,
+        state: Dict,
+        known: Dict[str, str],
+        stats: Dict,
+        extraction_data: Dict,
+        extractions_path: Path,
+    ) -> int:
+        """
+        Wait for the batch in ``state``, add its translations to ``known``
+        and ``stats``, join them into extractions.json and drop the state
+        file. Returns the number of entries filled.
+        """
+        batch = self._wait(state["batch_id"])
+        translated, usage = self._collect(batch, state["requests"])
+        if self.memory and state.get("prompt_version") == PROMPT_VERSION:
+            self.memory.store_many(translated.items())
+        known.update(translated)
+
+        stats.update(
+            batch_id=state["batch_id"],
+            status=batch.status,
+            batches=stats["batches"] + 1,
+            requests=stats["requests"] + len(state["requests"]),
+            translated=stats["translated"] + len(translated),
+            usage=usage_entry(
+                stats["usage"]["prompt_tokens"] + usage["prompt_tokens"],
+                stats["usage"]["completion_tokens"] + usage["completion_tokens"],
+                _BATCH_DISCOUNT,
+            ),
+        )
+
+        filled = self._join(extraction_data, known, extractions_path)
+        # Only forget the batch once its results are safely joined
+        self._state_path.unlink(missing_ok=True)
+        return filled
+
+    @staticmethod
+    def _join(extraction_data: Dict, known: Dict[str, str], extractions_path: Path) -> int:
+        """Fill untranslated entries from ``known`` and write extractions.json atomically."""
+        filled = 0
+        for entry in _untranslated_entries(extraction_data):
+            translation = known.get(normalize_japanese(entry["japanese_text"]))
+            if translation:
+                entry["english_translation"] = translation
+                filled += 1
+
+        _write_json(extractions_path, extraction_data)
+        return filled
+
+    def _submit(self, texts: List[str]) -> Dict:
+        """Write the request JSONL, upload it, create the batch and save the state."""
+        requests: Dict[str, List[str]] = {}
+        lines = []
+        for number, group in enumerate(split_by_token_budget(texts, self._token_budget), start=1):
+            custom_id = f"translate-{number:05d}"
+            group_texts = [texts[i] for i in group]
+            requests[custom_id] = group_texts
+            items = [{"id": item_id, "text": text} for item_id, text in enumerate(group_texts, start=1)]
+            lines.append(json.dumps({
+                "custom_id": custom_id,
+                "method": "POST",
+                "url": _ENDPOINT,
+                "body": build_translation_request(items),
+            }, ensure_ascii=False))
+
+        input_path = self._state_path.with_suffix(".jsonl")
+        input_path.parent.mkdir(parents=True, exist_ok=True)
+        input_path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+        with open(input_path, "rb") as fh:
+            uploaded = self._client.files.create(file=fh, purpose="batch")
+        batch = self._client.batches.create(
+            input_file_id=uploaded.id,
+            endpoint=_ENDPOINT,
+            completion_window=_COMPLETION_WINDOW,
+        )
+
+        state = {
+            "batch_id": batch.id,
+            "input_file_id": uploaded.id,
+            "submitted_at": datetime.now().isoformat(),
+            "model": MODEL,
+            "prompt_version": PROMPT_VERSION,
+            "requests": requests,
+        }
+        # Written atomically: a torn state file would lose the batch id
+        _write_json(self._state_path, state)
+        log.info(f"📤 Submitted translation batch {batch.id}: {len(texts)} text(s) in {len(requests)} request(s)")
+        return state
+
+    def _wait(self, batch_id: str):
+        """Poll the batch until it reaches a terminal status."""
+        while True:
+            batch = self._client.batches.retrieve(batch_id)
+            counts = getattr(batch, "request_counts", None)
+            progress = f" ({counts.completed + counts.failed}/{counts.total})" if counts else ""
+            log.info(f"  ⏳ Batch {batch_id}: {batch.status}{progress}")
+            if batch.status in _TERMINAL_STATUSES:
+                if batch.status != "completed":
+                    log.warning(f"  Batch {batch_id} ended as {batch.status}; joining partial results")
+                return batch
+            time.sleep(self._poll_seconds)
+
+    def _collect(self, batch, requests: Dict[str, List[str]]) -> Tuple[Dict[str, str], Dict[str, int]]:
+        """Map normalized source → translation from the batch output file, plus token usage."""
+        translated: Dict[str, str] = {}
+        usage = {"prompt_tokens": 0, "completion_tokens": 0}
+        output_file_id = getattr(batch, "output_file_id", None)
+        if not output_file_id:
+            return translated, usage
+
+        output = self._client.files.content(output_file_id).text
+        for line in output.splitlines():
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                log.warning(f"  Skipping unreadable line in batch output: {line[:80]}")
+                continue
+            texts = requests.get(record.get("custom_id")) if isinstance(record, dict) else None
+            response = record.get("response") or {}
+            if texts is None or response.get("status_code") != 200:
+                continue
+            body = response.get("body") or {}
+            for name in usage:
+                usage[name] += (body.get("usage") or {}).get(name, 0)
+            choices = body.get("choices") or []
+            if not choices:
+                continue
+            content = ((choices[0].get("message") or {}).get("content") or "").strip()
+            items = parse_translation_items(
+                content, list(range(1, len(texts) + 1)),
+                truncated=choices[0].get("finish_reason") == "length",
+            )
+            for item_id, text in items.items():
+                translated[texts[item_id - 1]] = text
+        return translated, usage
+
+    def _load_state(self) -> Optional[Dict]:
+        if not self._state_path.exists():
+            return None
+        with open(self._state_path, "r", encoding="utf-8") as fh:
+            return json.load(fh)
+
+
+def _write_json(path: Path, data: Dict) -> None:
+    """Write ``data`` to a temporary file and move it over ``path``."""
+    tmp_path = path.with_suffix(".tmp")
+    with open(tmp_path, "w", encoding="utf-8") as fh:
+        json.dump(data, fh, ensure_ascii=False, indent=2)
+    tmp_path.replace(path)
+
+
+def _untranslated_entries(extraction_data: Dict) -> Iterator[Dict]:
+    """Extraction entries with Japanese text and no translation yet."""
+    for file_result in extraction_data.get("files", []):
+        for page in file_result.get("pages", []):
+            for entry in page.get("extractions", []):
+                if entry.get("japanese_text") and not entry.get("english_translation"):
+                    yield entry
@@ -0,0 +1,117 @@
+"""
+detection_cache.py
+─────────────────────────────────────────────
+On-disk cache of text detection results.
+Keyed by a hash of the page pixels plus every setting that changes
+what the detector returns, so re-running OCR after a translation
+change reuses earlier detections instead of paying for them again.
+"""
+
+import hashlib
+import json
+import threading
+from typing import Dict, List, Optional
+
+from PIL import Image
+
+from config.settings import (
+    CACHE_FOLDER,
+    DETECTION_CACHE_MODE,
+    DETECTION_CACHE_MAX_MB,
+)
+from app.disk_cache import DiskCache, make_key
+from app.logger import get_logger
+
+log = get_logger("detection_cache")
+
+# Bump when the stored detection format or extraction rules change
+DETECTION_CACHE_VERSION = 1
+
+CACHE_MODES = ("use", "bypass", "refresh")
+
+_caches: Dict[str, "DetectionCache"] = {}
+_caches_lock = threading.Lock()
+
+
+def image_digest(image: Image.Image) -> str:
+    """SHA-256 of the decoded pixels (mode and size included)."""
+    hasher = hashlib.sha256()
+    hasher.update(f"{image.mode}:{image.width}x{image.height}".encode("ascii"))
+    hasher.update(image.tobytes())
+    return hasher.hexdigest()
+
+
+class DetectionCache:
+    """Stores detection lists as JSON, keyed by page pixels + detector settings."""
+
+    def __init__(self, folder, max_bytes: int, mode: str = "use"):
+        """
+        Parameters
+        ----------
+        folder : Path
+            Directory holding the cache entries.
+        max_bytes : int
+            Total size budget; least recently used entries are evicted.
+        mode : str
+            "use" reads and writes, "refresh" ignores stored entries but
+            overwrites them with fresh results.
+        """
+        self._store = DiskCache(folder, max_bytes, suffix=".json")
+        self.mode = mode
+        self.hits = 0
+        self.misses = 0
+        self._stats_lock = threading.Lock()
+
+    def key(self, image: Image.Image, signature: str) -> str:
+        """Cache key for ``image`` detected with the given settings signature."""
+        return make_key(DETECTION_CACHE_VERSION, signature, image_digest(image))
+
+    def get(self, key: str) -> Optional[List[Dict]]:
+        """Return the stored detections, or None on a miss (always None in refresh mode)."""
+        data = None if self.mode == "refresh" else self._store.get(key)
+        detections = None
+        if data is not None:
+            try:
+                detections = json.loads(data.decode("utf-8"))
+            except (UnicodeDecodeError, json.JSONDecodeError) as exc:
+                log.warning(f"Discarding unreadable detection cache entry: {exc}")
+                self._store.delete(key)
+
+        with self._stats_lock:
+            if detections is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return detections
+
+    def put(self, key: str, detections: List[Dict]) -> None:
+        """Store a successful detection result."""
+        self._store.put(key, json.dumps(detections, ensure_ascii=False).encode("utf-8"))
+
+    def stats(self) -> Dict:
+        """Hit/miss counters for the processing report."""
+        return {"mode": self.mode, "hits": self.hits, "misses": self.misses}
+
+
+def get_detection_cache(mode: str = DETECTION_CACHE_MODE) -> Optional[DetectionCache]:
+    """
+    Shared process-wide cache for ``mode``, or None when mode is "bypass".
+
+    Raises
+    ------
+    ValueError
+        If ``mode`` is not one of CACHE_MODES.
+    """
+    mode = mode.strip().lower()
+    if mode not in CACHE_MODES:
+        raise ValueError(
+            f"Unknown detection cache mode '{mode}' (expected one of {', '.join(CACHE_MODES)})"
+        )
+    if mode == "bypass":
+        return None
+    with _caches_lock:
+        if mode not in _caches:
+            _caches[mode] = DetectionCache(
+                CACHE_FOLDER / "detections", DETECTION_CACHE_MAX_MB * 1024 * 1024, mode
+            )
+        return _caches[mode]
@@ -0,0 +1,322 @@
+"""
+detector_backend.py
+─────────────────────────────────────────────
+Common interface for text detection backends.
+Every backend turns page images into the same detection shape
+(japanese_text / bounding_box / confidence), so the processor does not
+care whether pages went to Google Cloud Vision, the legacy GPT-4o
+vision client or a local Tesseract install. The backend is chosen
+with DETECTION_BACKEND.
+"""
+
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional, Protocol, Set, Tuple, runtime_checkable
+
+from PIL import Image
+
+from config.settings import (
+    DETECTION_BACKEND,
+    DETECTION_CACHE_MODE,
+    DETECTION_TILE_MAX_HEIGHT,
+    DETECTION_TILE_OVERLAP,
+    MODEL,
+)
+from app.detection_cache import DetectionCache, get_detection_cache
+from app.logger import get_logger
+from app.tiling import merge_tile_detections, plan_tiles
+
+log = get_logger("detector_backend")
+
+DETECTION_BACKENDS = ("vision", "tesseract", "openai")
+
+
+@runtime_checkable
+class DetectorBackend(Protocol):
+    """What process_pdf_accurate() needs from a text detector."""
+
+    name: str
+    cache: Optional[DetectionCache]
+
+    def detect_text(self, image: Image.Image, label: str = "") -> List[Dict]:
+        ...
+
+    def detect_text_batch(
+        self, images: List[Image.Image], labels: Optional[List[str]] = None
+    ) -> List[List[Dict]]:
+        ...
+
+    def close(self) -> None:
+        ...
+
+
+class CachedDetector(ABC):
+    """
+    Base class for backends: answers pages from the detection cache,
+    splits very tall pages into overlapping tiles and hands everything
+    else to ``_detect_pages()``, which subclasses implement.
+    """
+
+    name = "detector"
+
+    def __init__(
+        self,
+        cache_mode: str,
+        cache_signature: str,
+        tile_max_height: int = DETECTION_TILE_MAX_HEIGHT,
+        tile_overlap: int = DETECTION_TILE_OVERLAP,
+    ):
+        """
+        Parameters
+        ----------
+        cache_mode : str
+            Detection cache mode: "use", "bypass" or "refresh".
+        cache_signature : str
+            Everything about the backend that changes its output for the
+            same pixels (backend, model, language, encoding...).
+        tile_max_height : int
+            Pages taller than this many pixels are detected in tiles
+            (0 = never tile).
+        tile_overlap : int
+            Rows shared by consecutive tiles.
+        """
+        self.cache = get_detection_cache(cache_mode)
+        self._tile_max_height = max(0, int(tile_max_height))
+        self._tile_overlap = max(0, int(tile_overlap))
+        self._cache_signature = (
+            f"{cache_signature}:tiles={self._tile_max_height}/{self._tile_overlap}"
+        )
+
+    def close(self) -> None:
+        """Release worker threads; backends with a pool override this."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def detect_text(self, image: Image.Image, label: str = "") -> List[Dict]:
+        """
+        Detect Japanese text in one page.
+
+        Parameters
+        ----------
+        image : PIL.Image.Image
+            The page image to analyze.
+        label : str, optional
+            Human-readable label for logging.
+
+        Returns
+        -------
+        list[dict]
+            List of detected text regions, each containing:
+            - japanese_text: The detected Japanese text
+            - bounding_box: Normalized coordinates (0-1)
+            - confidence: Detection confidence score
+        """
+        return self.detect_text_batch([image], [label])[0]
+
+    def detect_text_batch(
+        self,
+        images: List[Image.Image],
+        labels: Optional[List[str]] = None,
+    ) -> List[List[Dict]]:
+        """
+        Detect Japanese text in several pages.
+
+        Pages already in the detection cache are answered from it; only
+        successful results are written back, so a failed request is
+        retried on the next run. Pages taller than the tile limit are cut
+        into overlapping tiles that are detected alongside the other
+        pages (so they share the backend's batching and parallelism),
+        then merged back into page coordinates.
+
+        Returns
+        -------
+        list[list[dict]]
+            One detection list per input image, in input order (same
+            shape as detect_text()).
+        """
+        if not images:
+            return []
+        labels = labels or [""] * len(images)
+
+        results: Dict[int, List[Dict]] = {}
+        keys: Dict[int, str] = {}
+        if self.cache:
+            for i, image in enumerate(images):
+                keys[i] = self.cache.key(image, self._cache_signature)
+                cached = self.cache.get(keys[i])
+                if cached is not None:
+                    results[i] = cached
+            if results:
+                log.info(f"  Reusing cached detections for {len(results)}/{len(images)} page(s)")
+
+        pending = [i for i in range(len(images)) if i not in results]
+        if pending:
+            detected, partial = self._detect_tiled(pending, images, labels)
+            for i, detections in detected.items():
+                if detections is None:
+                    results[i] = []
+                    continue
+                results[i] = detections
+                # A page with failed tiles is returned but never cached
+                if self.cache and i not in partial:
+                    self.cache.put(keys[i], detections)
+
+        return [results[i] for i in range(len(images))]
+
+    def _detect_tiled(
+        self,
+        pending: List[int],
+        images: List[Image.Image],
+        labels: List[str],
+    ) -> Tuple[Dict[int, Optional[List[Dict]]], Set[int]]:
+        """
+        Detect ``pending`` pages, tiling tall ones.
+
+        Returns {index: detections or None} and the indices of tiled pages
+        where some tiles failed (their result is partial).
+        """
+        units: List[Image.Image] = []
+        unit_labels: List[str] = []
+        owners: List[tuple] = []  # (page index, tile span or None)
+        for i in pending:
+            image = images[i]
+            spans = plan_tiles(image.height, self._tile_max_height, self._tile_overlap)
+            if len(spans) == 1:
+                units.append(image)
+                unit_labels.append(labels[i])
+                owners.append((i, None))
+                continue
+            log.info(f"  [{labels[i]}] Tall page ({image.width}x{image.height}), "
+                     f"detecting in {len(spans)} tiles")
+            for top, bottom in spans:
+                units.append(image.crop((0, top, image.width, bottom)))
+                unit_labels.append(f"{labels[i]} rows {top}-{bottom}")
+                owners.append((i, (top, bottom)))
+
+        detected = self._detect_pages(units, unit_labels)
+
+        results: Dict[int, Optional[List[Dict]]] = {}
+        tiles: Dict[int, list] = {}
+        failed: Set[int] = set()
+        for (i, span), detections in zip(owners, detected):
+            if span is None:
+                results[i] = detections
+            elif detections is None:
+                failed.add(i)
+            else:
+                tiles.setdefault(i, []).append((span, detections))
+
+        for i in pending:
+            if i in results:
+                continue
+            merged = merge_tile_detections(tiles.get(i, []), images[i].width, images[i].height)
+            results[i] = merged
+            if i in failed:
+                log.warning(f"  [{labels[i]}] Some tiles failed; result is partial")
+        return results, failed
+
+    @abstractmethod
+    def _detect_pages(
+        self, images: List[Image.Image], labels: List[str]
+    ) -> List[Optional[List[Dict]]]:
+        """Detect uncached pages; None marks a page whose request failed."""
+
+
+class OCRClientDetector(CachedDetector):
+    """
+    Adapts the legacy GPT-4o vision OCRClient to the detector interface.
+    Only the text and boxes are kept; translation still goes through
+    the Translator like for every other backend.
+    """
+
+    def __init__(self, ocr_client=None, cache_mode: str = DETECTION_CACHE_MODE):
+        from app.ocr_client import OCRClient
+
+        self._client = ocr_client or OCRClient()
+        self.name = f"OpenAI vision ({MODEL})"
+        super().__init__(cache_mode, f"openai:{MODEL}")
+
+    def _detect_pages(
+        self, images: List[Image.Image], labels: List[str]
+    ) -> List[Optional[List[Dict]]]:
+        results: List[Optional[List[Dict]]] = []
+        for image, label in zip(images, labels):
+            result = self._client.extract_japanese(image, label=label)
+            if "error" in result:
+                results.append(None)
+                continue
+
+            detections = []
+            for extraction in result.get("extractions", []) if result.get("japanese_found") else []:
+                text = (extraction.get("japanese_text") or "").strip()
+                bbox = extraction.get("bounding_box")
+                if not text or not bbox:
+                    continue
+                detection = {
+                    "japanese_text": text,
+                    "bounding_box": bbox,
+                    "confidence": 1.0,  # the model does not report one
+                }
+                if extraction.get("bubble_box"):
+                    detection["bubble_box"] = extraction["bubble_box"]
+                detections.append(detection)
+            log.info(f"  [{label}] Detected {len(detections)} text block(s)")
+            results.append(detections)
+        return results
+
+
+def contains_japanese(text: str) -> bool:
+    """
+    Check if text contains Japanese characters (Hiragana, Katakana, Kanji).
+    """
+    for char in text:
+        # Hiragana: 3040-309F
+        # Katakana: 30A0-30FF
+        # Kanji (CJK Unified Ideographs): 4E00-9FFF
+        code = ord(char)
+        if (0x3040 <= code <= 0x309F or
+            0x30A0 <= code <= 0x30FF or
+            0x4E00 <= code <= 0x9FFF):
+            return True
+    return False
+
+
+def create_detector(
+    backend: str = DETECTION_BACKEND,
+    cache_mode: str = DETECTION_CACHE_MODE,
+) -> DetectorBackend:
+    """
+    Build the configured detection backend.
+
+    Backends are imported lazily so a local-only install does not need
+    the Google Cloud client (and vice versa).
+
+    Parameters
+    ----------
+    backend : str
+        "vision" (Google Cloud Vision), "tesseract" (local, offline) or
+        "openai" (legacy GPT-4o vision OCR).
+    cache_mode : str
+        Detection cache mode: "use", "bypass" or "refresh".
+
+    Raises
+    ------
+    ValueError
+        If ``backend`` is unknown.
+    """
+    backend = backend.strip().lower()
+    if backend == "vision":
+        from app.text_detector import TextDetector
+        return TextDetector(cache_mode=cache_mode)
+    if backend == "tesseract":
+        from app.tesseract_detector import TesseractDetector
+        return TesseractDetector(cache_mode=cache_mode)
+    if backend == "openai":
+        return OCRClientDetector(cache_mode=cache_mode)
+    raise ValueError(
+        f"Unknown DETECTION_BACKEND '{backend}' "
+        f"(expected one of {', '.join(DETECTION_BACKENDS)})"
+    )
@@ -0,0 +1,146 @@
+"""
+disk_cache.py
+─────────────────────────────────────────────
+Size-bounded, content-addressed blob store on local disk.
+Entries are evicted least-recently-used first (file mtime is
+refreshed on every hit) once the folder exceeds its byte budget.
+"""
+
+import hashlib
+import os
+import threading
+from pathlib import Path
+from typing import Optional
+
+from app.logger import get_logger
+
+log = get_logger("disk_cache")
+
+
+def make_key(*parts) -> str:
+    """Build a stable hex cache key from arbitrary key parts."""
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(str(part).encode("utf-8"))
+        digest.update(b"\x00")
+    return digest.hexdigest()
+
+
+class DiskCache:
+    """LRU blob cache stored as one file per key under ``folder``."""
+
+    def __init__(self, folder: Path, max_bytes: int, suffix: str = ".bin"):
+        """
+        Parameters
+        ----------
+        folder : Path
+            Directory holding the cache entries (created if missing).
+        max_bytes : int
+            Total size budget. Oldest entries are removed past this.
+        suffix : str
+            File extension for entries.
+        """
+        self._folder = folder
+        self._max_bytes = max(0, int(max_bytes))
+        self._suffix = suffix
+        self._lock = threading.Lock()
+        self._size: Optional[int] = None  # computed lazily on first write
+
+        self._folder.mkdir(parents=True, exist_ok=True)
+
+    def path_for(self, key: str) -> Path:
+        """Entry path, sharded by the first two hex digits of the key."""
+        return self._folder / key[:2] / f"{key}{self._suffix}"
+
+    def get(self, key: str) -> Optional[bytes]:
+        """Return the stored bytes for ``key`` (marking it recently used), or None."""
+        path = self.path_for(key)
+        try:
+            data = path.read_bytes()
+        except FileNotFoundError:
+            return None
+        except OSError as exc:
+            log.warning(f"Cache read failed for {path.name}: {exc}")
+            return None
+
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return data
+
+    def put(self, key: str, data: bytes) -> None:
+        """Store ``data`` under ``key`` and evict old entries if over budget."""
+        path = self.path_for(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        previous = path.stat().st_size if path.exists() else 0
+
+        # Write to a temp file first so readers never see a partial entry
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            tmp_path.write_bytes(data)
+            os.replace(tmp_path, path)
+        except OSError as exc:
+            log.warning(f"Cache write failed for {path.name}: {exc}")
+            tmp_path.unlink(missing_ok=True)
+            return
+
+        with self._lock:
+            if self._size is None:
+                self._size = self._scan_size()
+            else:
+                self._size += len(data) - previous
+            if self._size > self._max_bytes:
+                self._evict()
+
+    def delete(self, key: str) -> None:
+        """Remove ``key`` from the cache if present."""
+        path = self.path_for(key)
+        try:
+            size = path.stat().st_size
+            path.unlink()
+        except FileNotFoundError:
+            return
+        with self._lock:
+            if self._size is not None:
+                self._size -= size
+
+    def _entries(self):
+        return self._folder.glob(f"*/*{self._suffix}")
+
+    def _scan_size(self) -> int:
+        total = 0
+        for path in self._entries():
+            try:
+                total += path.stat().st_size
+            except FileNotFoundError:
+                pass
+        return total
+
+    def _evict(self) -> None:
+        """Delete least-recently-used entries until usage is at most 90% of the budget."""
+        entries = []
+        for path in self._entries():
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        entries.sort()
+
+        target = int(self._max_bytes * 0.9)
+        size = sum(entry[1] for entry in entries)
+        removed = 0
+        for _mtime, entry_size, path in entries:
+            if size <= target:
+                break
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+            size -= entry_size
+            removed += 1
+
+        self._size = size
+        log.debug(f"Evicted {removed} entr(ies) from {self._folder.name} cache")
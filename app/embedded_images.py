@@ -0,0 +1,203 @@
+"""
+embedded_images.py
+─────────────────────────────────────────────
+Fast path for scanned PDFs: pages that consist of a single full-page
+embedded image (JPEG, JBIG2, Flate...) are pulled out with Poppler's
+pdfimages instead of being re-rendered, which skips rasterisation and
+keeps the scan at its native resolution. Vector or mixed pages are
+left to the normal renderer.
+"""
+
+import re
+import subprocess
+import tempfile
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+from PIL import Image
+
+from app.logger import get_logger
+
+log = get_logger("embedded_images")
+
+# Image size must match the page size within this fraction to count as a scan page
+_PAGE_COVERAGE_TOLERANCE = 0.03
+
+# Colour spaces pdfimages can hand back without a lossy/inverted conversion
+_SUPPORTED_COLORS = {"gray", "rgb", "icc", "index"}
+
+_PAGE_SIZE_RE = re.compile(r"^Page\s+(\d+)\s+size:\s+([\d.]+)\s+x\s+([\d.]+)\s+pts")
+_PAGE_ROT_RE = re.compile(r"^Page\s+(\d+)\s+rot:\s+(\d+)")
+
+_scan_memo: Dict[Tuple[str, int, int], Dict[int, Dict]] = {}
+
+
+def scan_single_image_pages(pdf_path: Path, total_pages: int) -> Dict[int, Dict]:
+    """
+    Find pages that are exactly one embedded image covering the whole page.
+
+    Parameters
+    ----------
+    pdf_path : Path
+        Path to the PDF file.
+    total_pages : int
+        Page count (from pdfinfo).
+
+    Returns
+    -------
+    dict
+        {page_number: {"width", "height", "page_width_pts",
+        "page_height_pts", "rotation", "encoding"}} for every qualifying
+        page. Empty if pdfimages is unavailable or fails.
+    """
+    stat = pdf_path.stat()
+    memo_key = (str(pdf_path.resolve()), stat.st_size, stat.st_mtime_ns)
+    if memo_key in _scan_memo:
+        return _scan_memo[memo_key]
+
+    try:
+        listing = _run(["pdfimages", "-list", str(pdf_path)])
+        page_info = _run(["pdfinfo", "-f", "1", "-l", str(total_pages), str(pdf_path)])
+    except (OSError, subprocess.CalledProcessError) as exc:
+        log.debug(f"Embedded image scan unavailable for '{pdf_path.name}': {exc}")
+        _scan_memo[memo_key] = {}
+        return {}
+
+    page_sizes: Dict[int, Tuple[float, float]] = {}
+    rotations: Dict[int, int] = {}
+    for line in page_info.splitlines():
+        size_match = _PAGE_SIZE_RE.match(line)
+        if size_match:
+            page_sizes[int(size_match.group(1))] = (
+                float(size_match.group(2)), float(size_match.group(3))
+            )
+            continue
+        rot_match = _PAGE_ROT_RE.match(line)
+        if rot_match:
+            rotations[int(rot_match.group(1))] = int(rot_match.group(2))
+
+    # Group pdfimages rows by page; any smask/stencil row disqualifies the page
+    rows_by_page: Dict[int, list] = {}
+    for line in listing.splitlines():
+        parts = line.split()
+        if len(parts) < 14 or not parts[0].isdigit():
+            continue  # header / separator
+        rows_by_page.setdefault(int(parts[0]), []).append(parts)
+
+    pages: Dict[int, Dict] = {}
+    for page_number, rows in rows_by_page.items():
+        if len(rows) != 1 or page_number not in page_sizes:
+            continue
+        parts = rows[0]
+        image_type, color, encoding = parts[2], parts[5], parts[8]
+        if image_type != "image" or color not in _SUPPORTED_COLORS:
+            continue
+
+        try:
+            width, height = int(parts[3]), int(parts[4])
+            x_ppi, y_ppi = float(parts[12]), float(parts[13])
+        except ValueError:
+            continue
+        if x_ppi <= 0 or y_ppi <= 0:
+            continue
+
+        page_width_pts, page_height_pts = page_sizes[page_number]
+        if not (
+            _covers(width * 72.0 / x_ppi, page_width_pts)
+            and _covers(height * 72.0 / y_ppi, page_height_pts)
+        ):
+            continue
+
+        pages[page_number] = {
+            "width": width,
+            "height": height,
+            "page_width_pts": page_width_pts,
+            "page_height_pts": page_height_pts,
+            "rotation": rotations.get(page_number, 0) % 360,
+            "encoding": encoding,
+        }
+
+    log.info(
+        f"  🖼️  {len(pages)}/{total_pages} page(s) of '{pdf_path.name}' "
+        f"are single embedded images (native extraction)"
+    )
+    _scan_memo[memo_key] = pages
+    return pages
+
+
+def extract_page_image(
+    pdf_path: Path,
+    page_number: int,
+    info: Dict,
+    max_dpi: Optional[int] = None,
+) -> Optional[Image.Image]:
+    """
+    Pull the native image of a single-image page out of the PDF.
+
+    Parameters
+    ----------
+    pdf_path : Path
+        Path to the PDF file.
+    page_number : int
+        1-based page number (must be in scan_single_image_pages()).
+    info : dict
+        The page's entry from scan_single_image_pages().
+    max_dpi : int, optional
+        If given and the scan is finer than this, downscale to it (used for
+        low-resolution preview passes). JPEGs are decoded at reduced scale.
+
+    Returns
+    -------
+    PIL.Image.Image or None
+        The page image (L for gray/bilevel scans, otherwise RGB), or None
+        if extraction failed.
+    """
+    with tempfile.TemporaryDirectory(prefix="pdfimages_") as tmp_dir:
+        prefix = Path(tmp_dir) / "img"
+        try:
+            _run([
+                "pdfimages", "-f", str(page_number), "-l", str(page_number),
+                "-j", str(pdf_path), str(prefix),
+            ])
+        except (OSError, subprocess.CalledProcessError) as exc:
+            log.warning(f"pdfimages failed on '{pdf_path.name}' p{page_number}: {exc}")
+            return None
+
+        outputs = sorted(Path(tmp_dir).glob("img-*"))
+        if len(outputs) != 1:
+            return None
+
+        try:
+            image = Image.open(outputs[0])
+            target = None
+            if max_dpi:
+                target = (
+                    max(1, round(info["page_width_pts"] * max_dpi / 72.0)),
+                    max(1, round(info["page_height_pts"] * max_dpi / 72.0)),
+                )
+                if target[0] < image.width and target[1] < image.height:
+                    image.draft(image.mode, target)  # no-op for non-JPEG sources
+                else:
+                    target = None
+            # Keep single-channel scans single-channel; the caller applies COLOR_MODE
+            image = image.convert("L" if image.mode in ("1", "L") else "RGB")
+        except Exception as exc:
+            log.warning(f"Could not decode embedded image of '{pdf_path.name}' p{page_number}: {exc}")
+            return None
+
+    if target and image.size != target:
+        image = image.resize(target, Image.LANCZOS)
+    if info["rotation"]:
+        image = image.rotate(-info["rotation"], expand=True)
+    return image
+
+
+def _covers(image_extent_pts: float, page_extent_pts: float) -> bool:
+    if page_extent_pts <= 0:
+        return False
+    return abs(image_extent_pts - page_extent_pts) / page_extent_pts <= _PAGE_COVERAGE_TOLERANCE
+
+
+def _run(command) -> str:
+    result = subprocess.run(command, capture_output=True, text=True, check=True)
+    return result.stdout
@@ -0,0 +1,149 @@
+"""
+fuzzy_index.py
+─────────────────────────────────────────────
+Character n-gram index for near-duplicate lookup. OCR output often
+differs from an earlier reading of the same line only by punctuation,
+a trailing ー or a small kana; variant_key() folds those differences
+away, and the index finds the stored string with the highest Dice
+similarity above a threshold.
+
+Postings are partitioned by gram-set size, so a query only visits the
+sizes a match above the threshold can have, and candidates are
+generated from the rarest grams only (the CPMerge scheme of SimString)
+and then verified by binary search in the remaining postings. A query
+touches a handful of short lists even with hundreds of thousands of
+entries.
+"""
+
+import math
+import unicodedata
+from array import array
+from bisect import bisect_left
+from typing import Dict, List, Optional, Set, Tuple
+
+# Bigrams over the padded string: short Japanese lines still get enough grams
+_NGRAM = 2
+_PAD_START = "\x02"
+_PAD_END = "\x03"
+
+
+# Cut from the end of a line: ー and small kana there only stretch or clip
+# the last sound (えーっ, なにっ, すごいですねー)
+_TRAILING_VARIANTS = "ーぁぃぅぇぉっゃゅょゎァィゥェォッャュョヮヵヶ"
+
+
+def variant_key(text: str) -> str:
+    """
+    ``text`` without the differences OCR readings of one line show:
+    punctuation, symbols and spaces are dropped and a trailing run of ー
+    and small kana is cut. Two strings with the same key differ only in
+    those variants; anything else (きって / きて, びょういん / びよういん)
+    keeps the keys apart.
+    """
+    kept = "".join(char for char in text if unicodedata.category(char)[0] not in "PSZ")
+    return kept.rstrip(_TRAILING_VARIANTS)
+
+
+def _grams(text: str) -> Set[str]:
+    padded = f"{_PAD_START}{text}{_PAD_END}"
+    return {padded[i:i + _NGRAM] for i in range(len(padded) - _NGRAM + 1)}
+
+
+def _contains(postings: array, entry_id: int) -> bool:
+    i = bisect_left(postings, entry_id)
+    return i < len(postings) and postings[i] == entry_id
+
+
+class FuzzyIndex:
+    """Dice-similarity search over a growing set of strings."""
+
+    def __init__(self):
+        self._keys: List[str] = []
+        self._ids: Dict[str, int] = {}
+        # gram-set size → gram → ascending entry ids
+        self._postings: Dict[int, Dict[str, array]] = {}
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def add(self, text: str) -> None:
+        """Index ``text`` (no-op if it is already indexed or empty)."""
+        if not text or text in self._ids:
+            return
+        entry_id = len(self._keys)
+        self._keys.append(text)
+        self._ids[text] = entry_id
+        grams = _grams(text)
+        by_gram = self._postings.setdefault(len(grams), {})
+        for gram in grams:
+            postings = by_gram.get(gram)
+            if postings is None:
+                postings = by_gram[gram] = array("I")
+            postings.append(entry_id)
+
+    def best_match(self, text: str, threshold: float) -> Optional[Tuple[str, float]]:
+        """
+        Most similar indexed string to ``text``.
+
+        Parameters
+        ----------
+        text : str
+            Query string.
+        threshold : float
+            Minimum Dice similarity of bigram sets, in (0, 1].
+
+        Returns
+        -------
+        tuple[str, float] or None
+            (indexed string, similarity), or None if nothing reaches
+            ``threshold``.
+        """
+        grams = _grams(text)
+        size = len(grams)
+        if not grams or threshold <= 0:
+            return None
+
+        # Dice >= t bounds the other gram-set size to [size·t/(2−t), size·(2−t)/t]
+        low = max(1, math.ceil(size * threshold / (2 - threshold)))
+        high = math.floor(size * (2 - threshold) / threshold)
+
+        best_id, best_score = -1, threshold
+        for other_size in range(low, high + 1):
+            by_gram = self._postings.get(other_size)
+            if not by_gram:
+                continue
+            # Grams two sets must share for Dice >= threshold
+            needed = math.ceil(threshold * (size + other_size) / 2 - 1e-9)
+            if needed > min(size, other_size):
+                continue
+
+            lists = sorted((by_gram.get(gram, ()) for gram in grams), key=len)
+            # Any match shares at least one gram among the rarest (size - needed + 1)
+            seed = size - needed + 1
+            counts: Dict[int, int] = {}
+            for postings in lists[:seed]:
+                for entry_id in postings:
+                    counts[entry_id] = counts.get(entry_id, 0) + 1
+
+            for position in range(seed, size):
+                if not counts:
+                    break
+                postings = lists[position]
+                remaining = size - position - 1
+                for entry_id, count in list(counts.items()):
+                    if postings and _contains(postings, entry_id):
+                        count += 1
+                        counts[entry_id] = count
+                    if count + remaining < needed:
+                        del counts[entry_id]
+
+            for entry_id, count in counts.items():
+                if count < needed:
+                    continue
+                score = 2 * count / (size + other_size)
+                if score > best_score or (score == best_score and best_id < 0):
+                    best_id, best_score = entry_id, score
+
+        if best_id < 0:
+            return None
+        return self._keys[best_id], best_score
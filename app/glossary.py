@@ -0,0 +1,176 @@
+"""
+glossary.py
+─────────────────────────────────────────────
+Local glossary of fixed translations (SFX, name tags, stock phrases),
+answered before any translation request is built. Entries are stored in
+a hash keyed by a kana-folded form of the source, so ドンッ！ and ドン,
+or どきどき and ドキドキ, hit the same entry in one dict lookup. Keys
+shorter than three characters (ポン, ジー) collide with ordinary
+dialogue (ぽん, じー), so they only match texts written without
+hiragana, as SFX are.
+"""
+
+import json
+import re
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, Optional
+
+from config.settings import GLOSSARY_FILES
+from app.logger import get_logger
+from app.text_utils import normalize_japanese
+
+log = get_logger("glossary")
+
+# Hiragana ぁ..ゖ sit exactly 0x60 below their katakana counterparts
+_HIRAGANA_TO_KATAKANA = {code: code + 0x60 for code in range(0x3041, 0x3097)}
+
+_SMALL_TSU_RE = re.compile(r"ッ+")
+_LONG_VOWEL_RE = re.compile(r"ー{2,}")
+# A unit of one to three characters repeated: ゴゴゴゴ, ザワザワザワ
+_REPEAT_RE = re.compile(r"^(.{1,3}?)\1+$")
+_EDGE_PUNCTUATION = " !?.,~〜・♪♡♥「」『』()【】\"'"
+# Shorter keys need the source's script too: hiragana other than small tsu
+_MIN_FOLDED_KEY_LENGTH = 3
+_HIRAGANA_RE = re.compile(r"[ぁ-ぢつ-ゖ]")
+
+_glossary: Optional["Glossary"] = None
+_glossary_lock = threading.Lock()
+
+
+def glossary_key(text: str) -> str:
+    """
+    Lookup key of ``text``.
+
+    Normalizes like normalize_japanese, folds hiragana to katakana, drops
+    small tsu and edge punctuation, collapses long-vowel runs and folds a
+    repeated unit to two copies.
+
+    Parameters
+    ----------
+    text : str
+        Detected text or glossary source.
+
+    Returns
+    -------
+    str
+        Key shared by all spellings of the same entry.
+    """
+    key = normalize_japanese(text).translate(_HIRAGANA_TO_KATAKANA)
+    key = _SMALL_TSU_RE.sub("", key)
+    key = _LONG_VOWEL_RE.sub("ー", key)
+    key = key.strip(_EDGE_PUNCTUATION)
+    match = _REPEAT_RE.match(key)
+    if match:
+        key = match.group(1) * 2
+    return key
+
+
+class Glossary:
+    """Kana-folded source → fixed translation lookup."""
+
+    def __init__(self, entries: Optional[Dict[str, str]] = None):
+        """
+        Parameters
+        ----------
+        entries : dict, optional
+            Source → translation pairs to start with.
+        """
+        self._entries: Dict[str, str] = {}
+        self.hits = 0
+        self._stats_lock = threading.Lock()
+        if entries:
+            self.update(entries.items())
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def update(self, pairs: Iterable) -> None:
+        """Add (source, translation) pairs; later pairs override earlier ones."""
+        for source, translation in pairs:
+            key = glossary_key(source)
+            if key and translation:
+                self._entries[key] = translation
+
+    def lookup(self, text: str) -> Optional[str]:
+        """
+        Fixed translation of ``text``, or None if it is not in the glossary.
+
+        Keys under three characters only match texts without hiragana, so
+        dialogue such as じー or ぽん is not read as the SFX ジー or ポン.
+        """
+        key = glossary_key(text)
+        if len(key) < _MIN_FOLDED_KEY_LENGTH and _HIRAGANA_RE.search(normalize_japanese(text)):
+            return None
+        translation = self._entries.get(key)
+        if translation is not None:
+            with self._stats_lock:
+                self.hits += 1
+        return translation
+
+    def load_file(self, path: Path) -> int:
+        """
+        Add the entries of a .tsv or .json glossary file.
+
+        TSV files hold one ``source<TAB>translation`` pair per line
+        (blank lines and ``#`` comments are skipped). JSON files hold an
+        object mapping source → translation, or a list of
+        ``{"source": ..., "translation": ...}`` objects.
+
+        Parameters
+        ----------
+        path : Path
+            Glossary file.
+
+        Returns
+        -------
+        int
+            Number of entries read.
+        """
+        if path.suffix.lower() == ".json":
+            with open(path, "r", encoding="utf-8") as fh:
+                data = json.load(fh)
+            if isinstance(data, dict):
+                pairs = list(data.items())
+            else:
+                pairs = [(item.get("source", ""), item.get("translation", "")) for item in data]
+        else:
+            pairs = []
+            with open(path, "r", encoding="utf-8") as fh:
+                for line_number, line in enumerate(fh, start=1):
+                    line = line.rstrip("\n")
+                    if not line.strip() or line.lstrip().startswith("#"):
+                        continue
+                    source, sep, translation = line.partition("\t")
+                    if not sep:
+                        log.warning(f"{path.name}:{line_number}: no tab separator, skipped")
+                        continue
+                    pairs.append((source.strip(), translation.strip()))
+
+        self.update(pairs)
+        return len(pairs)
+
+
+def load_glossary(paths: Iterable[Path]) -> Glossary:
+    """Build a glossary from ``paths``; missing or unreadable files are skipped with a warning."""
+    glossary = Glossary()
+    for path in paths:
+        if not path.is_file():
+            log.warning(f"Glossary file not found: {path}")
+            continue
+        try:
+            count = glossary.load_file(path)
+        except (OSError, ValueError, AttributeError) as exc:
+            log.warning(f"Could not read glossary {path}: {exc}")
+            continue
+        log.info(f"📖 Glossary {path.name}: {count} entr{'y' if count == 1 else 'ies'}")
+    return glossary
+
+
+def get_glossary() -> Optional[Glossary]:
+    """Shared glossary built from GLOSSARY_FILES, or None when it has no entries."""
+    global _glossary
+    with _glossary_lock:
+        if _glossary is None:
+            _glossary = load_glossary(GLOSSARY_FILES)
+        return _glossary if len(_glossary) else None
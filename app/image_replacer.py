@@ -74,88 +74,103 @@ class ImageReplacer:
             log.info(f"  [{page_label}] No extractions to process")
             return image.copy(), 0, 0
 
-        # Work on a copy
-        img = image.copy()
-        draw = ImageDraw.Draw(img)
-        img_width, img_height = img.size
+        rendering = self.start_page(image, page_label)
+        for i, extraction in enumerate(extractions, 1):
+            rendering.add(extraction, i)
+        return rendering.finish()
 
-        success_count = 0
-        fail_count = 0
+    def start_page(self, image: Image.Image, page_label: str = "") -> "PageRendering":
+        """
+        Begin an incremental replacement of ``image``.
 
-        for i, extraction in enumerate(extractions, 1):
-            try:
-                # Extract data
-                japanese = extraction.get("japanese_text", "")
-                english = extraction.get("english_translation", "")
-                bbox_norm = extraction.get("bounding_box", {})
-                bubble_norm = extraction.get("bubble_box") or extraction.get("speech_bubble_box")
-                styling = extraction.get("styling", {})
-
-                if not bbox_norm or not english:
-                    log.warning(
-                        f"  [{page_label}] Extraction {i}: missing bbox or translation, skipping"
-                    )
-                    fail_count += 1
-                    continue
+        Extractions are drawn as they are added (e.g. while translations
+        are still streaming in) and the result is collected with
+        ``finish()``; replace_text() is the one-shot form of the same.
 
-                # Convert normalized coords to pixels
-                text_bbox_px = self._normalize_to_pixels(
-                    bbox_norm, img_width, img_height, pad=True, pad_px=TEXT_ERASE_PADDING
-                )
-                if not text_bbox_px:
-                    log.warning(
-                        f"  [{page_label}] Extraction {i}: invalid bounding box, skipping"
-                    )
-                    fail_count += 1
-                    continue
+        Parameters
+        ----------
+        image : PIL.Image.Image
+            Original image with Japanese text (not modified).
+        page_label : str
+            Label for logging.
+        """
+        return PageRendering(self, image, page_label)
 
-                # Use bubble box for rendering when available (larger area -> bigger text)
-                render_bbox_px = text_bbox_px
-                if bubble_norm:
-                    bubble_bbox_px = self._normalize_to_pixels(
-                        bubble_norm, img_width, img_height, pad=True, pad_px=BBOX_PADDING
-                    )
-                    if bubble_bbox_px:
-                        # Expand slightly to allow larger text inside the bubble
-                        expanded_bubble = self._expand_bbox(
-                            bubble_bbox_px, img_width, img_height, RENDER_BOX_PADDING_PCT, BBOX_PADDING
-                        )
-                        text_area = (text_bbox_px[2] - text_bbox_px[0]) * (text_bbox_px[3] - text_bbox_px[1])
-                        bubble_area = (expanded_bubble[2] - expanded_bubble[0]) * (expanded_bubble[3] - expanded_bubble[1])
-                        if bubble_area >= int(text_area * 1.1):
-                            render_bbox_px = expanded_bubble
-                else:
-                    # No bubble box: expand render area more aggressively
-                    render_bbox_px = self._expand_bbox(
-                        text_bbox_px, img_width, img_height, RENDER_BOX_PADDING_PCT, BBOX_PADDING
-                    )
-                # SIMPLE APPROACH: Just paint white rectangle over the original text
-                self._erase_text_simple(draw, text_bbox_px)
+    def _replace_one(
+        self,
+        draw: ImageDraw.Draw,
+        extraction: Dict,
+        i: int,
+        img_width: int,
+        img_height: int,
+        page_label: str,
+        background_ink,
+        text_ink,
+    ) -> bool:
+        """Erase one extraction's Japanese text and draw its translation; True on success."""
+        try:
+            # Extract data
+            japanese = extraction.get("japanese_text", "")
+            english = extraction.get("english_translation", "")
+            bbox_norm = extraction.get("bounding_box", {})
+            bubble_norm = extraction.get("bubble_box") or extraction.get("speech_bubble_box")
+            styling = extraction.get("styling", {})
+
+            if not bbox_norm or not english:
+                log.warning(
+                    f"  [{page_label}] Extraction {i}: missing bbox or translation, skipping"
+                )
+                return False
 
-                # Render English text in the same bbox
-                success = self._render_text(
-                    draw, english, text_bbox_px, styling, page_label, i
+            # Convert normalized coords to pixels
+            text_bbox_px = self._normalize_to_pixels(
+                bbox_norm, img_width, img_height, pad=True, pad_px=TEXT_ERASE_PADDING
+            )
+            if not text_bbox_px:
+                log.warning(
+                    f"  [{page_label}] Extraction {i}: invalid bounding box, skipping"
                 )
+                return False
 
-                if success:
-                    success_count += 1
-                    log.debug(
-                        f"  [{page_label}] Extraction {i}: '{japanese}' → '{english}'"
+            # Use bubble box for rendering when available (larger area -> bigger text)
+            render_bbox_px = text_bbox_px
+            if bubble_norm:
+                bubble_bbox_px = self._normalize_to_pixels(
+                    bubble_norm, img_width, img_height, pad=True, pad_px=BBOX_PADDING
+                )
+                if bubble_bbox_px:
+                    # Expand slightly to allow larger text inside the bubble
+                    expanded_bubble = self._expand_bbox(
+                        bubble_bbox_px, img_width, img_height, RENDER_BOX_PADDING_PCT, BBOX_PADDING
                     )
-                else:
-                    fail_count += 1
+                    text_area = (text_bbox_px[2] - text_bbox_px[0]) * (text_bbox_px[3] - text_bbox_px[1])
+                    bubble_area = (expanded_bubble[2] - expanded_bubble[0]) * (expanded_bubble[3] - expanded_bubble[1])
+                    if bubble_area >= int(text_area * 1.1):
+                        render_bbox_px = expanded_bubble
+            else:
+                # No bubble box: expand render area more aggressively
+                render_bbox_px = self._expand_bbox(
+                    text_bbox_px, img_width, img_height, RENDER_BOX_PADDING_PCT, BBOX_PADDING
+                )
+            # SIMPLE APPROACH: Just paint white rectangle over the original text
+            self._erase_text_simple(draw, text_bbox_px, background_ink)
 
-            except Exception as exc:
-                log.error(
-                    f"  [{page_label}] Extraction {i}: error during replacement: {exc}"
+            # Render English text in the same bbox
+            success = self._render_text(
+                draw, english, text_bbox_px, styling, page_label, i, text_ink
+            )
+
+            if success:
+                log.debug(
+                    f"  [{page_label}] Extraction {i}: '{japanese}' → '{english}'"
                 )
-                fail_count += 1
+            return success
 
-        log.info(
-            f"  [{page_label}] Replacements: {success_count} successful, "
-            f"{fail_count} failed"
-        )
-        return img, success_count, fail_count
+        except Exception as exc:
+            log.error(
+                f"  [{page_label}] Extraction {i}: error during replacement: {exc}"
+            )
+            return False
 
     def _normalize_to_pixels(
         self,
@@ -247,7 +262,17 @@ class ImageReplacer:
             return bbox
         return (nx1, ny1, nx2, ny2)
 
-    def _erase_text_simple(self, draw: ImageDraw.Draw, bbox: Tuple[int, int, int, int]):
+    @staticmethod
+    def _ink_for_mode(rgb: Tuple[int, ...], mode: str):
+        """
+        Convert an RGB color to a fill value valid for an image of ``mode``
+        (e.g. BACKGROUND_FILL_COLOR becomes a single luminance value on L pages).
+        """
+        if mode == "RGB":
+            return tuple(rgb)
+        return Image.new("RGB", (1, 1), tuple(rgb)).convert(mode).getpixel((0, 0))
+
+    def _erase_text_simple(self, draw: ImageDraw.Draw, bbox: Tuple[int, int, int, int], fill=None):
         """
         Simple approach: fill the bounding box with white background color.
         This reliably hides the original Japanese text without complex pixel analysis.
@@ -257,7 +282,7 @@ class ImageReplacer:
             return
         
         # Draw filled white rectangle over the bounding box
-        draw.rectangle([x1, y1, x2, y2], fill=BACKGROUND_FILL_COLOR)
+        draw.rectangle([x1, y1, x2, y2], fill=BACKGROUND_FILL_COLOR if fill is None else fill)
 
     def _detect_bubble_region(
         self, img: Image.Image, text_bbox: Tuple[int, int, int, int]
@@ -370,10 +395,12 @@ class ImageReplacer:
         styling: Dict,
         page_label: str,
         extraction_num: int,
+        fill=(0, 0, 0),
     ) -> bool:
         """
         Render English text in the bounding box with appropriate styling.
-        Uses multi-line wrapping if text is too long.
+        Uses multi-line wrapping if text is too long. ``fill`` must match
+        the image mode (see _ink_for_mode).
 
         Returns
         -------
@@ -453,7 +480,7 @@ class ImageReplacer:
                 x_pos = min(x_pos, x2_in - line_width)
                 
                 # Draw the line
-                draw.text((x_pos, current_y), line, fill=(0, 0, 0), font=font)
+                draw.text((x_pos, current_y), line, fill=fill, font=font)
 
                 # Add line spacing (except after last line)
                 if idx < len(wrapped_lines) - 1:
@@ -713,3 +740,42 @@ class ImageReplacer:
 
         log.debug(f"Font '{font_name}' not found in system paths")
         return None
+
+
+class PageRendering:
+    """One page being replaced extraction by extraction (see ImageReplacer.start_page)."""
+
+    def __init__(self, replacer: ImageReplacer, image: Image.Image, page_label: str):
+        # Work on a copy
+        self._replacer = replacer
+        self._page_label = page_label
+        self._img = image.copy()
+        self._draw = ImageDraw.Draw(self._img)
+
+        # Fill colors in the page's own mode (single value for L pages)
+        self._background_ink = replacer._ink_for_mode(BACKGROUND_FILL_COLOR, self._img.mode)
+        self._text_ink = replacer._ink_for_mode((0, 0, 0), self._img.mode)
+
+        self.success_count = 0
+        self.fail_count = 0
+
+    def add(self, extraction: Dict, i: int) -> bool:
+        """Replace one extraction (``i`` is its 1-based number, for logging)."""
+        img_width, img_height = self._img.size
+        success = self._replacer._replace_one(
+            self._draw, extraction, i, img_width, img_height,
+            self._page_label, self._background_ink, self._text_ink,
+        )
+        if success:
+            self.success_count += 1
+        else:
+            self.fail_count += 1
+        return success
+
+    def finish(self) -> Tuple[Image.Image, int, int]:
+        """(modified_image, successful_replacements, failed_replacements)"""
+        log.info(
+            f"  [{self._page_label}] Replacements: {self.success_count} successful, "
+            f"{self.fail_count} failed"
+        )
+        return self._img, self.success_count, self.fail_count
@@ -0,0 +1,179 @@
+"""
+page_filter.py
+─────────────────────────────────────────────
+Cheap local check that decides whether a page can contain text at all,
+so blank separators, solid pages and full-bleed art skip the billed
+detection call. Works on a small grayscale thumbnail using Pillow's
+C routines (histogram, edge filter, thresholding) plus a run-length
+connected-component pass, so it costs a few tens of milliseconds a page.
+"""
+
+import re
+from typing import Dict, List
+
+from PIL import Image, ImageFilter
+
+from config.settings import (
+    PAGE_FILTER_MIN_CANDIDATES,
+    PAGE_FILTER_MIN_EDGE_DENSITY,
+)
+from app.logger import get_logger
+
+log = get_logger("page_filter")
+
+# Pages are analysed at this width; glyphs stay a few pixels tall
+_ANALYSIS_WIDTH = 400
+
+# Gray level below which a pixel counts as ink, and edge strength that counts as an edge
+_INK_LEVEL = 128
+_EDGE_LEVEL = 64
+
+# Glyph-sized components, as a fraction of the analysis width
+_GLYPH_MIN = 0.005
+_GLYPH_MAX = 0.08
+_GLYPH_MAX_ASPECT = 10.0
+
+# Above this ink density, also look for light glyphs on a dark background
+_DARK_PAGE_INK = 0.35
+
+_RUN_RE = re.compile(rb"\xff+")
+
+
+class PageFilter:
+    """Flags pages with no glyph-like marks so detection can be skipped."""
+
+    def __init__(
+        self,
+        min_candidates: int = PAGE_FILTER_MIN_CANDIDATES,
+        min_edge_density: float = PAGE_FILTER_MIN_EDGE_DENSITY,
+    ):
+        """
+        Parameters
+        ----------
+        min_candidates : int
+            Pages with fewer glyph-sized connected components than this
+            are treated as text-free. Lower is more conservative.
+        min_edge_density : float
+            Pages whose fraction of edge pixels is below this are treated
+            as blank without counting components.
+        """
+        self.min_candidates = max(0, int(min_candidates))
+        self.min_edge_density = float(min_edge_density)
+
+    def analyze(self, image: Image.Image) -> Dict:
+        """
+        Compute the page statistics the decision is based on.
+
+        Parameters
+        ----------
+        image : PIL.Image.Image
+            The page image (any mode).
+
+        Returns
+        -------
+        dict
+            ink_density, edge_density (fractions of the page) and
+            candidates (glyph-sized connected components; 0 when the
+            page is below the edge density floor).
+        """
+        gray = image.convert("L")
+        if gray.width > _ANALYSIS_WIDTH:
+            height = max(1, round(gray.height * _ANALYSIS_WIDTH / gray.width))
+            gray = gray.resize((_ANALYSIS_WIDTH, height), Image.BOX)
+
+        total = gray.width * gray.height
+        ink_density = sum(gray.histogram()[:_INK_LEVEL]) / total
+        # The filter leaves a spurious 1px frame at the borders; drop it
+        edges = gray.filter(ImageFilter.FIND_EDGES).crop(
+            (1, 1, max(2, gray.width - 1), max(2, gray.height - 1))
+        )
+        edge_density = sum(edges.histogram()[_EDGE_LEVEL:]) / (edges.width * edges.height)
+
+        candidates = 0
+        if edge_density >= self.min_edge_density:
+            dark = gray.point(lambda v: 255 if v < _INK_LEVEL else 0)
+            candidates = _count_glyph_components(dark)
+            if ink_density > _DARK_PAGE_INK:
+                light = gray.point(lambda v: 255 if v >= 255 - _INK_LEVEL else 0)
+                candidates = max(candidates, _count_glyph_components(light))
+
+        return {
+            "ink_density": round(ink_density, 4),
+            "edge_density": round(edge_density, 4),
+            "candidates": candidates,
+        }
+
+    def has_text_candidates(self, image: Image.Image, label: str = "") -> bool:
+        """True if the page may contain text and should go to the detector."""
+        stats = self.analyze(image)
+        keep = stats["candidates"] >= self.min_candidates
+        if not keep:
+            log.debug(
+                f"  [{label}] No text candidates (ink {stats['ink_density']:.3f}, "
+                f"edges {stats['edge_density']:.3f}, {stats['candidates']} component(s))"
+            )
+        return keep
+
+
+def _count_glyph_components(binary: Image.Image) -> int:
+    """
+    Count 8-connected components of white pixels whose bounding box is
+    glyph-sized. Rows are scanned as runs (found with a bytes regex) and
+    runs touching the previous row are merged with union-find.
+    """
+    width, height = binary.size
+    data = binary.tobytes()
+
+    parent: List[int] = []
+    boxes: List[List[int]] = []  # x0, y0, x1, y1 per run
+
+    def find(label: int) -> int:
+        while parent[label] != label:
+            parent[label] = parent[parent[label]]
+            label = parent[label]
+        return label
+
+    previous: List[tuple] = []
+    for y in range(height):
+        row = data[y * width:(y + 1) * width]
+        current = []
+        j = 0
+        for match in _RUN_RE.finditer(row):
+            start, end = match.start(), match.end() - 1
+            label = len(parent)
+            parent.append(label)
+            boxes.append([start, y, end, y])
+
+            # Previous-row runs overlapping [start-1, end+1] are connected
+            while j < len(previous) and previous[j][1] < start - 1:
+                j += 1
+            k = j
+            while k < len(previous) and previous[k][0] <= end + 1:
+                root_a, root_b = find(label), find(previous[k][2])
+                if root_a != root_b:
+                    parent[root_b] = root_a
+                k += 1
+            current.append((start, end, label))
+        previous = current
+
+    merged: Dict[int, List[int]] = {}
+    for label, box in enumerate(boxes):
+        root = find(label)
+        acc = merged.get(root)
+        if acc is None:
+            merged[root] = list(box)
+        else:
+            acc[0] = min(acc[0], box[0])
+            acc[1] = min(acc[1], box[1])
+            acc[2] = max(acc[2], box[2])
+            acc[3] = max(acc[3], box[3])
+
+    min_size = max(2, round(width * _GLYPH_MIN))
+    max_size = max(min_size, round(width * _GLYPH_MAX))
+    count = 0
+    for x0, y0, x1, y1 in merged.values():
+        w, h = x1 - x0 + 1, y1 - y0 + 1
+        long_side, short_side = max(w, h), min(w, h)
+        if min_size <= long_side <= max_size and long_side <= short_side * _GLYPH_MAX_ASPECT:
+            count += 1
+    return count
@@ -2,19 +2,41 @@
 pdf_converter.py
 ─────────────────────────────────────────────
 Converts PDF files to PIL Images using pdf2image (Poppler).
+
+Pages can be rasterised all at once (pdf_to_images) or streamed in
+small windows (iter_pdf_pages) so that peak memory depends on the
+window size rather than on the length of the volume. With
+PDF_RENDER_WORKERS > 1 each window is sharded across a process pool.
+Single-image scan pages are extracted natively, and pages already in
+the raster cache skip Poppler entirely.
 """
 
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor
 from pathlib import Path
-from typing import List
+from typing import Dict, Iterator, List, Optional, Tuple
 
-from PIL import Image
-from pdf2image import convert_from_path
+from PIL import Image, ImageChops
+from pdf2image import convert_from_path, pdfinfo_from_path
 
-from config.settings import DPI
+from config.settings import (
+    DPI,
+    PDF_PAGE_CHUNK_SIZE,
+    PDF_RENDER_WORKERS,
+    EXTRACT_EMBEDDED_IMAGES,
+    COLOR_MODE,
+)
+from app.embedded_images import extract_page_image, scan_single_image_pages
 from app.logger import get_logger
+from app.raster_cache import RasterCache, get_raster_cache
 
 log = get_logger("pdf_converter")
 
+# Auto color mode: a page is grayscale if almost no pixel has channels
+# further apart than the tolerance (JPEG noise on B/W scans stays below it)
+_GRAY_CHANNEL_TOLERANCE = 16
+_GRAY_MAX_COLOR_FRACTION = 0.002
+
 
 def pdf_to_images(pdf_path: Path) -> List[Image.Image]:
     """
@@ -53,4 +75,368 @@ def pdf_to_images(pdf_path: Path) -> List[Image.Image]:
         ) from exc
 
     log.info(f"  → {len(images)} page(s) extracted")
-    return images
\ No newline at end of file
+    return images
+
+
+def get_page_count(pdf_path: Path) -> int:
+    """
+    Read the page count of a PDF with pdfinfo (no rasterisation).
+
+    Raises
+    ------
+    FileNotFoundError
+        If PDF doesn't exist.
+    RuntimeError
+        If pdfinfo fails.
+    """
+    if not pdf_path.is_file():
+        raise FileNotFoundError(f"PDF not found: {pdf_path}")
+
+    try:
+        info = pdfinfo_from_path(str(pdf_path))
+        return int(info.get("Pages", 0))
+    except Exception as exc:
+        raise RuntimeError(
+            f"pdfinfo failed on '{pdf_path.name}': {exc}"
+        ) from exc
+
+
+def iter_pdf_pages(
+    pdf_path: Path,
+    chunk_size: int = PDF_PAGE_CHUNK_SIZE,
+    workers: int = PDF_RENDER_WORKERS,
+    timings: Optional[Dict[int, float]] = None,
+    use_cache: bool = True,
+    dpi: int = DPI,
+    extract_embedded: bool = EXTRACT_EMBEDDED_IMAGES,
+) -> Iterator[Tuple[int, Image.Image]]:
+    """
+    Stream the pages of a PDF as (page_number, image) pairs.
+
+    Pages are rendered ``chunk_size`` at a time using Poppler's
+    first_page/last_page window, and each page is released by the
+    generator as soon as it has been yielded. When ``workers`` > 1 the
+    window is split into contiguous page-range shards rendered in
+    parallel by a process pool, then reassembled in page order.
+
+    Parameters
+    ----------
+    pdf_path : Path
+        Path to the PDF file.
+    chunk_size : int
+        Number of pages rendered per window (raised to ``workers`` so
+        every worker gets at least one page).
+    workers : int
+        Number of rendering processes.
+    timings : dict, optional
+        If provided, filled with {page_number: render_seconds}.
+    use_cache : bool
+        Read and populate the shared raster cache (if enabled in settings).
+    dpi : int
+        Render resolution (defaults to the configured DPI).
+    extract_embedded : bool
+        Take single-image scan pages straight from the PDF instead of
+        rendering them.
+
+    Yields
+    ------
+    tuple[int, PIL.Image.Image]
+        1-based page number and the rendered page.
+
+    Raises
+    ------
+    FileNotFoundError
+        If PDF doesn't exist.
+    RuntimeError
+        If pdfinfo or conversion fails.
+    """
+    total_pages = get_page_count(pdf_path)
+    workers = max(1, int(workers))
+    chunk_size = max(1, int(chunk_size), workers)
+
+    log.info(
+        f"Streaming '{pdf_path.name}' at {dpi} DPI "
+        f"({total_pages} page(s), {chunk_size} per window, {workers} worker(s))..."
+    )
+
+    cache = get_raster_cache() if use_cache else None
+    pdf_digest = cache.pdf_digest(pdf_path) if cache else ""
+    embedded = (
+        scan_single_image_pages(pdf_path, total_pages) if extract_embedded else {}
+    )
+
+    executor: Optional[Executor] = None
+    if workers > 1 and total_pages > 1:
+        executor = ProcessPoolExecutor(max_workers=workers)
+
+    try:
+        for first_page in range(1, total_pages + 1, chunk_size):
+            last_page = min(total_pages, first_page + chunk_size - 1)
+            window = _render_window(
+                pdf_path, first_page, last_page, executor, workers, dpi,
+                cache, pdf_digest, embedded,
+            )
+
+            while window:
+                # Pop so the generator holds no reference once a page is handed out
+                page_number, image, seconds = window.pop(0)
+                if timings is not None:
+                    timings[page_number] = seconds
+                yield page_number, image
+    finally:
+        if executor:
+            executor.shutdown(cancel_futures=True)
+
+
+def render_selected_pages(
+    pdf_path: Path,
+    page_numbers: List[int],
+    dpi: int = DPI,
+    total_pages: Optional[int] = None,
+    timings: Optional[Dict[int, float]] = None,
+    use_cache: bool = True,
+) -> Dict[int, Image.Image]:
+    """
+    Render some pages of a PDF through the same sources as iter_pdf_pages
+    (embedded scan image, raster cache, Poppler), with one Poppler call per
+    contiguous run of ``page_numbers``.
+
+    Used by the adaptive-DPI pass to re-render only the pages of a window
+    that need full resolution. Pass ``total_pages`` when it is already
+    known to skip the pdfinfo call.
+
+    Returns
+    -------
+    dict
+        {page_number: image}; ``timings`` (if given) gets each page's
+        render seconds added.
+
+    Raises
+    ------
+    RuntimeError
+        If conversion fails or a page could not be rendered.
+    """
+    if not page_numbers:
+        return {}
+    if total_pages is None:
+        total_pages = get_page_count(pdf_path)
+    cache = get_raster_cache() if use_cache else None
+    pdf_digest = cache.pdf_digest(pdf_path) if cache else ""
+    embedded = (
+        scan_single_image_pages(pdf_path, total_pages) if EXTRACT_EMBEDDED_IMAGES else {}
+    )
+
+    pages: Dict[int, Image.Image] = {}
+    for first_page, last_page in _contiguous_runs(sorted(set(page_numbers))):
+        for page_number, image, seconds in _render_window(
+            pdf_path, first_page, last_page, None, 1, dpi, cache, pdf_digest, embedded,
+        ):
+            pages[page_number] = image
+            if timings is not None:
+                timings[page_number] = timings.get(page_number, 0.0) + seconds
+
+    missing = [page_number for page_number in page_numbers if page_number not in pages]
+    if missing:
+        raise RuntimeError(f"Page(s) {missing} of '{pdf_path.name}' could not be rendered")
+    return pages
+
+
+def render_pages(
+    pdf_path: Path,
+    first_page: int,
+    last_page: int,
+    executor: Optional[Executor] = None,
+    workers: int = 1,
+    dpi: int = DPI,
+) -> List[Tuple[int, Image.Image, float]]:
+    """
+    Render an inclusive page range, optionally sharded across ``executor``.
+
+    Returns
+    -------
+    list[tuple[int, PIL.Image.Image, float]]
+        (page_number, image, render_seconds) in page order. Serial renders
+        use one Poppler call for the whole range, so their per-page time is
+        the range time divided evenly.
+    """
+    if executor is None or workers <= 1 or first_page == last_page:
+        start = time.perf_counter()
+        images = _render_range(pdf_path, first_page, last_page, dpi)
+        per_page = (time.perf_counter() - start) / max(1, len(images))
+        return [
+            (first_page + offset, image, per_page)
+            for offset, image in enumerate(images)
+        ]
+
+    futures = [
+        executor.submit(
+            _render_shard, str(pdf_path), shard_first, shard_last, dpi, _render_grayscale()
+        )
+        for shard_first, shard_last in _shard_range(first_page, last_page, workers)
+    ]
+
+    pages: List[Tuple[int, Image.Image, float]] = []
+    for future in futures:
+        try:
+            pages.extend(future.result())
+        except Exception as exc:
+            raise RuntimeError(
+                f"pdf2image failed on '{pdf_path.name}' "
+                f"(pages {first_page}-{last_page}): {exc}"
+            ) from exc
+    return pages
+
+
+def _render_window(
+    pdf_path: Path,
+    first_page: int,
+    last_page: int,
+    executor: Optional[Executor],
+    workers: int,
+    dpi: int,
+    cache: Optional[RasterCache],
+    pdf_digest: str,
+    embedded: Dict[int, Dict],
+) -> List[Tuple[int, Image.Image, float]]:
+    """
+    Produce a window of pages from the cheapest source available:
+    native embedded scan image, then raster cache, then Poppler.
+    """
+    pages: Dict[int, Tuple[int, Image.Image, float]] = {}
+    to_render: List[int] = []
+    extracted = cached = 0
+
+    for page_number in range(first_page, last_page + 1):
+        start = time.perf_counter()
+
+        if page_number in embedded:
+            image = extract_page_image(
+                pdf_path, page_number, embedded[page_number],
+                max_dpi=dpi if dpi < DPI else None,
+            )
+            if image is not None:
+                image = apply_color_mode(image)
+                pages[page_number] = (page_number, image, time.perf_counter() - start)
+                extracted += 1
+                continue
+
+        if cache:
+            image = cache.get(pdf_digest, page_number, dpi, COLOR_MODE)
+            if image is not None:
+                pages[page_number] = (page_number, image, time.perf_counter() - start)
+                cached += 1
+                continue
+
+        to_render.append(page_number)
+
+    for run_first, run_last in _contiguous_runs(to_render):
+        for page_number, image, seconds in render_pages(
+            pdf_path, run_first, run_last, executor, workers, dpi
+        ):
+            image = apply_color_mode(image)
+            if cache:
+                cache.put(pdf_digest, page_number, dpi, COLOR_MODE, image)
+            pages[page_number] = (page_number, image, seconds)
+
+    log.debug(
+        f"'{pdf_path.name}' p{first_page}-{last_page}: {extracted} extracted, "
+        f"{cached} cached, {len(to_render)} rendered"
+    )
+    return [pages[page_number] for page_number in sorted(pages)]
+
+
+def _contiguous_runs(page_numbers: List[int]) -> List[Tuple[int, int]]:
+    """Group sorted page numbers into inclusive (first, last) runs."""
+    runs: List[Tuple[int, int]] = []
+    for page_number in page_numbers:
+        if runs and runs[-1][1] == page_number - 1:
+            runs[-1] = (runs[-1][0], page_number)
+        else:
+            runs.append((page_number, page_number))
+    return runs
+
+
+def _shard_range(first_page: int, last_page: int, shards: int) -> List[Tuple[int, int]]:
+    """Split an inclusive page range into at most ``shards`` contiguous ranges."""
+    count = last_page - first_page + 1
+    shards = max(1, min(shards, count))
+    base, extra = divmod(count, shards)
+
+    ranges = []
+    start = first_page
+    for index in range(shards):
+        size = base + (1 if index < extra else 0)
+        ranges.append((start, start + size - 1))
+        start += size
+    return ranges
+
+
+def _render_shard(
+    pdf_path: str, first_page: int, last_page: int, dpi: int, grayscale: bool
+) -> List[Tuple[int, Image.Image, float]]:
+    """Process-pool worker: render a shard page by page, timing each page."""
+    pages = []
+    for page_number in range(first_page, last_page + 1):
+        start = time.perf_counter()
+        images = convert_from_path(
+            pdf_path, dpi=dpi, first_page=page_number, last_page=page_number,
+            grayscale=grayscale,
+        )
+        pages.append((page_number, images[0], time.perf_counter() - start))
+    return pages
+
+
+def _render_range(
+    pdf_path: Path, first_page: int, last_page: int, dpi: int = DPI
+) -> List[Image.Image]:
+    """Render an inclusive page range with a single Poppler call."""
+    try:
+        return convert_from_path(
+            str(pdf_path),
+            dpi=dpi,
+            first_page=first_page,
+            last_page=last_page,
+            grayscale=_render_grayscale(),
+        )
+    except Exception as exc:
+        raise RuntimeError(
+            f"pdf2image failed on '{pdf_path.name}' "
+            f"(pages {first_page}-{last_page}): {exc}"
+        ) from exc
+
+
+def apply_color_mode(image: Image.Image, mode: str = COLOR_MODE) -> Image.Image:
+    """
+    Convert a page to the configured color mode.
+
+    "RGB" keeps three channels, "L" forces single-channel grayscale, and
+    "auto" keeps RGB only for pages that actually contain color.
+    """
+    mode = mode.strip().upper()
+    if mode == "L":
+        return image if image.mode == "L" else image.convert("L")
+    if mode == "AUTO":
+        if image.mode == "L":
+            return image
+        rgb = image if image.mode == "RGB" else image.convert("RGB")
+        return rgb.convert("L") if _is_grayscale(rgb) else rgb
+    return image if image.mode == "RGB" else image.convert("RGB")
+
+
+def _is_grayscale(image: Image.Image) -> bool:
+    """True if an RGB page has (almost) no pixels with differing channels."""
+    sample = image.copy()
+    sample.thumbnail((512, 512))
+    red, green, blue = sample.split()
+    limit = sample.width * sample.height * _GRAY_MAX_COLOR_FRACTION
+
+    for first, second in ((red, green), (green, blue), (red, blue)):
+        histogram = ImageChops.difference(first, second).histogram()
+        if sum(histogram[_GRAY_CHANNEL_TOLERANCE + 1:]) > limit:
+            return False
+    return True
+
+
+def _render_grayscale() -> bool:
+    """Let Poppler render single-channel pages directly when COLOR_MODE is L."""
+    return COLOR_MODE.strip().upper() == "L"
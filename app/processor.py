@@ -2,26 +2,43 @@
 processor.py
 ─────────────────────────────────────────────
 Orchestrates the full pipeline:
-  1. PDF → images (pdf_converter)
+  1. PDF → images (pdf_converter, streamed page by page)
   2. OCR + translation + bounding boxes (ocr_client)
   3. Image replacement (image_replacer) - optional
 Returns structured results and optionally modified images.
 """
 
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
 
 from PIL import Image
 
-from app.pdf_converter import pdf_to_images
+from config.settings import (
+    ADAPTIVE_DPI,
+    DETECTION_WINDOW_MB,
+    DPI,
+    GROUP_REGIONS,
+    PDF_PAGE_CHUNK_SIZE,
+    PREVIEW_DPI,
+    TRANSLATION_STREAMING,
+    VISION_BATCH_SIZE,
+    VISION_CONCURRENCY,
+)
+from app.pdf_converter import get_page_count, iter_pdf_pages, pdf_to_images, render_selected_pages
 from app.ocr_client import OCRClient
-from app.text_detector import TextDetector
+from app.page_filter import PageFilter
+from app.region_grouping import group_regions
+from app.translation_batcher import TranslationBatcher
+from app.detector_backend import DetectorBackend
 from app.translator import Translator
-from app.image_replacer import ImageReplacer
+from app.image_replacer import ImageReplacer, PageRendering
 from app.logger import get_logger
 
 log = get_logger("processor")
 
+# Receives each finished page as (image, output_filename)
+ImageSink = Callable[[Image.Image, str], None]
+
 
 def process_pdf(
     pdf_path: Path,
@@ -140,123 +157,292 @@ def process_pdf(
 
 def process_pdf_accurate(
     pdf_path: Path,
-    text_detector: TextDetector,
+    text_detector: DetectorBackend,
     translator: Translator,
     image_replacer: Optional[ImageReplacer] = None,
-) -> Tuple[Dict, List[Tuple[Image.Image, str]]]:
+    image_sink: Optional[ImageSink] = None,
+    page_filter: Optional[PageFilter] = None,
+    batcher: Optional[TranslationBatcher] = None,
+) -> Dict:
     """
     Full pipeline with accurate detection (PaddleOCR) + translation (GPT-4o).
 
-    This is the recommended approach for production use.
+    This is the recommended approach for production use. Pages are streamed
+    from the PDF one window at a time and handed to ``image_sink`` as soon
+    as they are finished, so no page image outlives its own iteration.
+
+    With ADAPTIVE_DPI enabled, detection runs on a PREVIEW_DPI render and
+    only pages with detected text are re-rendered at full DPI (for
+    replacement or output); text-free pages are output as their preview
+    scaled up to DPI. Normalized bounding boxes carry over between the two
+    resolutions unchanged.
 
     Parameters
     ----------
     pdf_path : Path
         Path to PDF file.
-    text_detector : TextDetector
-        PaddleOCR-based text detector for accurate bounding boxes.
+    text_detector : DetectorBackend
+        Detection backend (see create_detector()) for accurate bounding boxes.
     translator : Translator
         GPT-4o-based translator for high-quality translation.
     image_replacer : ImageReplacer, optional
         If provided, will replace text in images.
+    image_sink : callable, optional
+        Called as ``image_sink(image, filename)`` for every output page.
+        If omitted, page images are discarded after processing.
+    page_filter : PageFilter, optional
+        If provided, pages it finds no text candidates on skip detection
+        (counted in the result as ``vision_calls_saved``).
+    batcher : TranslationBatcher, optional
+        Shared translation queue. When given, translation (and with it
+        replacement and output) of the last pages may still be pending
+        when this returns; their entries in the returned dict are filled
+        in by ``batcher.flush()``. When omitted, a private batcher is
+        used and flushed before returning.
 
     Returns
     -------
-    tuple[dict, list[tuple]]
-        - Extraction data dict
-        - List of (modified_image, filename) tuples
+    dict
+        Extraction data dict
     """
     log.info(f"\n📄 Processing: {pdf_path.name}")
 
-    # ── Step 1: PDF → images ───────────────────
+    # ── Step 1: Page count (pages are rendered lazily below) ──
     try:
-        images = pdf_to_images(pdf_path)
+        total_pages = get_page_count(pdf_path)
     except (FileNotFoundError, RuntimeError) as exc:
         log.error(f"  ❌ {exc}")
         return {
             "file": pdf_path.name,
             "error": str(exc),
             "pages": []
-        }, []
+        }
 
-    total_pages = len(images)
     log.info(f"  📑 {total_pages} page(s) to process")
 
+    own_batcher = batcher is None
+    if own_batcher:
+        batcher = TranslationBatcher(translator)
+
     pages_results: List[Dict] = []
     japanese_page_count = 0
-    modified_images: List[Tuple[Image.Image, str]] = []
-
-    for i, img in enumerate(images, start=1):
-        page_label = f"{pdf_path.name} p{i}/{total_pages}"
-
-        # ── Step 2: Detect text with PaddleOCR (accurate bounding boxes) ──
-        detections = text_detector.detect_text(img, label=page_label)
-
-        page_entry: Dict = {
-            "page_number": i,
-            "japanese_found": len(detections) > 0,
-            "extractions": [],
-            "replacement_stats": None,
-        }
+    render_error: Optional[str] = None
+    render_timings: Dict[int, float] = {}
+    calls_saved = 0
+    adaptive = ADAPTIVE_DPI and PREVIEW_DPI < DPI
+    detection_dpi = PREVIEW_DPI if adaptive else DPI
 
-        if detections:
-            # ── Step 3: Translate with GPT-4o (batch translation) ──
-            japanese_texts = [d["japanese_text"] for d in detections]
-            translations = translator.translate_batch(japanese_texts, label=page_label)
-
-            # Combine detection + translation
-            extractions = []
-            for detection, translation in zip(detections, translations):
-                extractions.append({
-                    "japanese_text": detection["japanese_text"],
-                    "english_translation": translation,
-                    "bounding_box": detection["bounding_box"],
-                    "confidence": detection["confidence"],
-                    "styling": {"bold": False, "italic": False}  # PaddleOCR doesn't detect styling
-                })
-
-            page_entry["extractions"] = extractions
-            japanese_page_count += 1
-            log.info(
-                f"  ✅ [{page_label}] "
-                f"{len(extractions)} segment(s) detected and translated"
+    try:
+        pages = iter_pdf_pages(pdf_path, timings=render_timings, dpi=detection_dpi)
+        # Enough pages to keep VISION_CONCURRENCY full batches in flight, within DETECTION_WINDOW_MB
+        window_pages = VISION_BATCH_SIZE * VISION_CONCURRENCY
+        for window in _page_windows(pages, window_pages, DETECTION_WINDOW_MB):
+            labels = [f"{pdf_path.name} p{i}/{total_pages}" for i, _ in window]
+
+            # ── Step 2: Detect text with PaddleOCR (accurate bounding boxes) ──
+            # Pages the local filter rules out never reach the detector
+            to_detect = [
+                j for j, (_, img) in enumerate(window)
+                if page_filter is None or page_filter.has_text_candidates(img, labels[j])
+            ]
+            skipped = [j not in to_detect for j in range(len(window))]
+            calls_saved += skipped.count(True)
+
+            # Remaining pages go to Vision as concurrent batch requests
+            window_detections: List[List[Dict]] = [[] for _ in window]
+            detected = text_detector.detect_text_batch(
+                [window[j][1] for j in to_detect], [labels[j] for j in to_detect]
             )
-
-            # ── Step 4: Replace text (if enabled) ──
-            if image_replacer:
-                modified_img, success, fail = image_replacer.replace_text(
-                    img, extractions, page_label
-                )
-                page_entry["replacement_stats"] = {
-                    "successful": success,
-                    "failed": fail,
+            for j, detections in zip(to_detect, detected):
+                window_detections[j] = detections
+
+            # Adaptive mode re-renders the pages with text at full DPI, in runs
+            # of consecutive pages (up to PDF_PAGE_CHUNK_SIZE per Poppler call)
+            text_pages = {
+                window[j][0] for j, detections in enumerate(window_detections) if detections
+            } if adaptive and (image_replacer or image_sink) else set()
+            full_pages: Dict[int, Image.Image] = {}
+
+            while window:
+                (i, img), detections = window.pop(0), window_detections.pop(0)
+                page_label = labels.pop(0)
+
+                page_entry: Dict = {
+                    "page_number": i,
+                    "japanese_found": len(detections) > 0,
+                    "extractions": [],
+                    "replacement_stats": None,
                 }
-                img_filename = f"{pdf_path.stem}_page_{i:03d}.png"
-                modified_images.append((modified_img, img_filename))
-            else:
-                img_filename = f"{pdf_path.stem}_page_{i:03d}.png"
-                modified_images.append((img, img_filename))
-
-        else:
-            # No Japanese found
-            log.info(f"  ○  [{page_label}] No Japanese text detected")
-            img_filename = f"{pdf_path.stem}_page_{i:03d}.png"
-            modified_images.append((img, img_filename))
+                if skipped.pop(0):
+                    page_entry["detection_skipped"] = True
+
+                # One region per bubble instead of one per Vision paragraph
+                if GROUP_REGIONS and len(detections) > 1:
+                    detections = group_regions(detections, img.width, img.height)
+
+                # Full-resolution page for replacement/output (second pass in adaptive mode).
+                # Only pages with text are rendered again; nothing is drawn on the
+                # others, so their preview is scaled up to the output size instead.
+                if i in text_pages:
+                    if i not in full_pages:
+                        run = [i]
+                        while run[-1] + 1 in text_pages and len(run) < PDF_PAGE_CHUNK_SIZE:
+                            run.append(run[-1] + 1)
+                        full_pages = render_selected_pages(
+                            pdf_path, run, total_pages=total_pages, timings=render_timings
+                        )
+                    img = full_pages.pop(i)
+                elif adaptive and image_sink is not None:
+                    img = _upscale_preview(img, detection_dpi)
+                filename = f"{pdf_path.stem}_page_{i:03d}.png"
+
+                if detections:
+                    # ── Step 3: Queue for translation (batched across pages) ──
+                    # Replacement and output happen once the batch is translated
+                    japanese_page_count += 1
+                    finisher = _PageFinisher(
+                        page_entry, detections, img, page_label, filename,
+                        image_replacer, image_sink,
+                    )
+                    batcher.add(
+                        [d["japanese_text"] for d in detections],
+                        finisher,
+                        label=page_label,
+                        # Streaming: start replacing bubbles before the whole answer is in
+                        on_item=finisher.render_item if image_replacer and TRANSLATION_STREAMING else None,
+                        held_bytes=_bitmap_bytes(img),
+                    )
+
+                else:
+                    if page_entry.get("detection_skipped"):
+                        log.info(f"  ⏭️  [{page_label}] No text candidates, detection skipped")
+                    else:
+                        # No Japanese found
+                        log.info(f"  ○  [{page_label}] No Japanese text detected")
+                    if image_sink:
+                        image_sink(img, filename)
+
+                page_entry["render_seconds"] = round(render_timings.get(i, 0.0), 3)
+                pages_results.append(page_entry)
+
+    except RuntimeError as exc:
+        # Rendering failed part-way: keep the pages already processed
+        log.error(f"  ❌ {exc}")
+        render_error = str(exc)
 
-        pages_results.append(page_entry)
+    if own_batcher:
+        batcher.flush()
 
     # ── Summary ────────────────────────────────
     log.info(
         f"  📊 {japanese_page_count}/{total_pages} pages "
         f"contained Japanese text"
     )
+    if page_filter is not None:
+        log.info(f"  ⏭️  Page filter saved {calls_saved} detection call(s)")
 
-    return {
+    file_result = {
         "file": pdf_path.name,
         "total_pages": total_pages,
         "pages_with_japanese": japanese_page_count,
+        "detection_dpi": detection_dpi,
+        "render_seconds": round(sum(render_timings.values()), 3),
+        "vision_calls_saved": calls_saved,
         "pages": pages_results,
-    }, modified_images
+    }
+    if render_error:
+        file_result["error"] = render_error
+    return file_result
+
+
+def _upscale_preview(img: Image.Image, preview_dpi: int) -> Image.Image:
+    """Scale a PREVIEW_DPI render up to the size of a DPI render of the same page."""
+    scale = DPI / preview_dpi
+    return img.resize(
+        (max(1, round(img.width * scale)), max(1, round(img.height * scale))),
+        Image.LANCZOS,
+    )
+
+
+class _PageFinisher:
+    """
+    Completes a page once its translations arrive. With streaming, bubbles
+    are also replaced one by one as their translations come in
+    (``render_item``), so only the stragglers are left for the end.
+    """
+
+    def __init__(
+        self,
+        page_entry: Dict,
+        detections: List[Dict],
+        img: Image.Image,
+        page_label: str,
+        filename: str,
+        image_replacer: Optional[ImageReplacer],
+        image_sink: Optional[ImageSink],
+    ):
+        self._page_entry = page_entry
+        self._detections = detections
+        self._img = img
+        self._page_label = page_label
+        self._filename = filename
+        self._image_replacer = image_replacer
+        self._image_sink = image_sink
+        self._rendering: Optional[PageRendering] = None
+        self._rendered: Set[int] = set()
+
+    @staticmethod
+    def _extraction(detection: Dict, translation: str) -> Dict:
+        # Combine detection + translation
+        return {
+            "japanese_text": detection["japanese_text"],
+            "english_translation": translation,
+            "bounding_box": detection["bounding_box"],
+            "confidence": detection["confidence"],
+            "styling": {"bold": False, "italic": False}  # Vision doesn't detect styling
+        }
+
+    def render_item(self, position: int, translation: str) -> None:
+        """Replace one bubble as soon as its translation is known."""
+        if position in self._rendered:
+            return
+        if self._rendering is None:
+            self._rendering = self._image_replacer.start_page(self._img, self._page_label)
+        self._rendered.add(position)
+        self._rendering.add(self._extraction(self._detections[position], translation), position + 1)
+
+    def __call__(self, translations: List[str], usage: Dict) -> None:
+        extractions = [
+            self._extraction(detection, translation)
+            for detection, translation in zip(self._detections, translations)
+        ]
+
+        self._page_entry["extractions"] = extractions
+        self._page_entry["translation_usage"] = usage
+        log.info(
+            f"  ✅ [{self._page_label}] "
+            f"{len(extractions)} segment(s) detected and translated"
+        )
+
+        # ── Step 4: Replace text (if enabled) ──
+        output_img = self._img
+        if self._image_replacer:
+            if self._rendering is None:
+                output_img, success, fail = self._image_replacer.replace_text(
+                    self._img, extractions, self._page_label
+                )
+            else:
+                for position, extraction in enumerate(extractions):
+                    if position not in self._rendered:
+                        self._rendering.add(extraction, position + 1)
+                output_img, success, fail = self._rendering.finish()
+            self._page_entry["replacement_stats"] = {
+                "successful": success,
+                "failed": fail,
+            }
+
+        if self._image_sink:
+            self._image_sink(output_img, self._filename)
 
 
 def process_all(
@@ -298,7 +484,8 @@ def process_replacement_only(
     extraction_data: Dict,
     input_folder: Path,
     image_replacer: ImageReplacer,
-) -> Tuple[List[Dict], List[Tuple[Image.Image, str]]]:
+    image_sink: ImageSink,
+) -> List[Dict]:
     """
     Re-run text replacement using existing extraction data (e.g., from extractions.json).
     Useful when you want to re-process text replacement without re-running OCR.
@@ -311,22 +498,23 @@ def process_replacement_only(
         Path to folder containing original PDFs
     image_replacer : ImageReplacer
         Initialized image replacer instance
+    image_sink : callable
+        Called as ``image_sink(image, filename)`` for every output page,
+        as soon as the page is finished.
 
     Returns
     -------
-    tuple[list[dict], list[tuple]]
-        - List of per-file extraction dicts (modified with new replacement stats)
-        - List of all (modified_image, filename) tuples for saving
+    list[dict]
+        List of per-file extraction dicts (modified with new replacement stats)
     """
     pdf_files = sorted(input_folder.glob("*.pdf"))
     if not pdf_files:
         log.warning(f"No PDF files found in {input_folder}")
-        return [], []
+        return []
 
     log.info(f"Found {len(pdf_files)} PDF(s) for text replacement")
 
     all_results = []
-    all_images = []
 
     # Map extraction data by filename
     extraction_by_file = {f["file"]: f for f in extraction_data.get("files", [])}
@@ -340,58 +528,82 @@ def process_replacement_only(
 
         log.info(f"\n🎨 Text replacement: {pdf_path.name}")
 
-        # Convert PDF to images
-        try:
-            images = pdf_to_images(pdf_path)
-        except (FileNotFoundError, RuntimeError) as exc:
-            log.error(f"  ❌ {exc}")
-            continue
-
-        total_pages = len(images)
+        # Map extraction data by page number
+        pages_by_number = {
+            p.get("page_number"): p for p in file_extractions.get("pages", [])
+        }
         pages_results: List[Dict] = []
 
-        for i, img in enumerate(images, start=1):
-            page_label = f"{pdf_path.name} p{i}/{total_pages}"
-            page_number = i
-
-            # Get extractions for this page
-            page_data = None
-            for p in file_extractions.get("pages", []):
-                if p.get("page_number") == page_number:
-                    page_data = p
-                    break
-
-            if page_data and page_data.get("japanese_found"):
-                extractions = page_data.get("extractions", [])
-                
-                # Apply text replacement
-                modified_img, success, fail = image_replacer.replace_text(
-                    img, extractions, page_label
-                )
-                page_data["replacement_stats"] = {
-                    "successful": success,
-                    "failed": fail,
-                }
-                log.info(
-                    f"  ✏️  [{page_label}] "
-                    f"{success} successful, {fail} failed"
-                )
-                
-                # Save modified image
-                img_filename = f"{pdf_path.stem}_page_{i:03d}.png"
-                all_images.append((modified_img, img_filename))
-            else:
-                # No Japanese or no extractions - save original
-                img_filename = f"{pdf_path.stem}_page_{i:03d}.png"
-                all_images.append((img, img_filename))
-                if not page_data:
+        # Stream PDF pages
+        try:
+            total_pages = get_page_count(pdf_path)
+            for i, img in iter_pdf_pages(pdf_path):
+                page_label = f"{pdf_path.name} p{i}/{total_pages}"
+                page_data = pages_by_number.get(i)
+                output_img = img
+
+                if page_data and page_data.get("japanese_found"):
+                    extractions = page_data.get("extractions", [])
+
+                    # Apply text replacement
+                    output_img, success, fail = image_replacer.replace_text(
+                        img, extractions, page_label
+                    )
+                    page_data["replacement_stats"] = {
+                        "successful": success,
+                        "failed": fail,
+                    }
+                    log.info(
+                        f"  ✏️  [{page_label}] "
+                        f"{success} successful, {fail} failed"
+                    )
+                elif not page_data:
+                    # No extraction data - save original
                     log.info(f"  ○  [{page_label}] No extraction data")
 
-            if page_data:
-                pages_results.append(page_data)
+                image_sink(output_img, f"{pdf_path.stem}_page_{i:03d}.png")
+
+                if page_data:
+                    pages_results.append(page_data)
+
+        except (FileNotFoundError, RuntimeError) as exc:
+            log.error(f"  ❌ {exc}")
+            continue
 
         # Update file result with new replacement stats
         file_extractions["pages"] = pages_results
         all_results.append(file_extractions)
 
-    return all_results, all_images
\ No newline at end of file
+    return all_results
+
+
+def _bitmap_bytes(img: Image.Image) -> int:
+    """Approximate memory of a decoded page bitmap (one byte per band per pixel)."""
+    return img.width * img.height * len(img.getbands())
+
+
+def _page_windows(
+    pages: Iterable[Tuple[int, Image.Image]],
+    max_pages: int,
+    max_mb: float,
+) -> Iterator[List[Tuple[int, Image.Image]]]:
+    """
+    Yield consecutive windows of (page_number, image) pairs holding at most
+    ``max_pages`` pages and, past the first page, at most ``max_mb`` of
+    decoded bitmaps, so the detection fan-out never decides peak memory.
+    """
+    max_bytes = max(0.0, max_mb) * 1024 * 1024
+    window: List[Tuple[int, Image.Image]] = []
+    held = 0
+    for page in pages:
+        size = _bitmap_bytes(page[1])
+        if window and held + size > max_bytes:
+            yield window
+            window, held = [], 0
+        window.append(page)
+        held += size
+        if len(window) >= max(1, max_pages):
+            yield window
+            window, held = [], 0
+    if window:
+        yield window
@@ -0,0 +1,85 @@
+"""
+raster_cache.py
+─────────────────────────────────────────────
+On-disk cache of rendered PDF pages shared by every stage.
+Keyed by (PDF content hash, page number, DPI, color mode), so a
+renamed or re-copied PDF still hits and an edited one never does.
+Pages are stored as uncompressed PPM/PGM, which decodes far faster
+than Poppler can re-render.
+"""
+
+import hashlib
+import io
+import threading
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+from PIL import Image
+
+from config.settings import (
+    CACHE_FOLDER,
+    RASTER_CACHE_ENABLED,
+    RASTER_CACHE_MAX_MB,
+)
+from app.disk_cache import DiskCache, make_key
+from app.logger import get_logger
+
+log = get_logger("raster_cache")
+
+_default_cache: Optional["RasterCache"] = None
+_default_lock = threading.Lock()
+
+
+class RasterCache:
+    """Stores rendered pages keyed by PDF content rather than by path."""
+
+    def __init__(self, folder: Path, max_bytes: int):
+        self._store = DiskCache(folder, max_bytes, suffix=".ppm")
+        self._digests: Dict[Tuple[str, int, int], str] = {}
+
+    def pdf_digest(self, pdf_path: Path) -> str:
+        """SHA-256 of the PDF bytes, memoised per (path, size, mtime)."""
+        stat = pdf_path.stat()
+        memo_key = (str(pdf_path.resolve()), stat.st_size, stat.st_mtime_ns)
+        digest = self._digests.get(memo_key)
+        if digest is None:
+            hasher = hashlib.sha256()
+            with open(pdf_path, "rb") as fh:
+                for block in iter(lambda: fh.read(1 << 20), b""):
+                    hasher.update(block)
+            digest = hasher.hexdigest()
+            self._digests[memo_key] = digest
+        return digest
+
+    def get(self, pdf_digest: str, page_number: int, dpi: int, mode: str) -> Optional[Image.Image]:
+        """Return the cached page, or None on a miss."""
+        data = self._store.get(make_key(pdf_digest, page_number, dpi, mode))
+        if data is None:
+            return None
+        try:
+            image = Image.open(io.BytesIO(data))
+            image.load()
+            return image
+        except Exception as exc:
+            log.warning(f"Discarding unreadable cached page {page_number}: {exc}")
+            self._store.delete(make_key(pdf_digest, page_number, dpi, mode))
+            return None
+
+    def put(self, pdf_digest: str, page_number: int, dpi: int, mode: str, image: Image.Image) -> None:
+        """Store a rendered page."""
+        buffer = io.BytesIO()
+        image.save(buffer, format="PPM")
+        self._store.put(make_key(pdf_digest, page_number, dpi, mode), buffer.getvalue())
+
+
+def get_raster_cache() -> Optional[RasterCache]:
+    """Shared process-wide cache, or None when RASTER_CACHE_ENABLED is off."""
+    global _default_cache
+    if not RASTER_CACHE_ENABLED:
+        return None
+    with _default_lock:
+        if _default_cache is None:
+            _default_cache = RasterCache(
+                CACHE_FOLDER / "raster", RASTER_CACHE_MAX_MB * 1024 * 1024
+            )
+        return _default_cache
@@ -0,0 +1,86 @@
+"""
+rate_limiter.py
+─────────────────────────────────────────────
+Thread-safe token-bucket limiter for requests per minute and tokens
+per minute, shared by every translation worker. A 429 response can
+pause the whole limiter for its Retry-After period, so the other
+workers back off too instead of tripping the quota again.
+"""
+
+import threading
+import time
+from typing import List
+
+
+class _Bucket:
+    """Refills continuously at ``per_minute / 60`` units per second."""
+
+    def __init__(self, per_minute: int):
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.level = self.capacity
+        self.updated = time.monotonic()
+
+    def refill(self, now: float) -> None:
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_for(self, amount: float) -> float:
+        """Seconds until ``amount`` units are available (0 if they are now)."""
+        amount = min(amount, self.capacity)
+        return 0.0 if self.level >= amount else (amount - self.level) / self.rate
+
+
+class RateLimiter:
+    """Blocks callers until both the request and token budgets allow them."""
+
+    def __init__(self, requests_per_minute: int, tokens_per_minute: int):
+        """
+        Parameters
+        ----------
+        requests_per_minute : int
+            Request budget (0 = unlimited).
+        tokens_per_minute : int
+            Token budget (0 = unlimited).
+        """
+        self._requests = _Bucket(requests_per_minute) if requests_per_minute > 0 else None
+        self._tokens = _Bucket(tokens_per_minute) if tokens_per_minute > 0 else None
+        self._paused_until = 0.0
+        self._cond = threading.Condition()
+
+    def acquire(self, tokens: int = 0) -> float:
+        """
+        Wait until one request of ``tokens`` tokens may be sent, and take it.
+
+        Returns
+        -------
+        float
+            Seconds spent waiting.
+        """
+        start = time.monotonic()
+        with self._cond:
+            while True:
+                now = time.monotonic()
+                wait = max(0.0, self._paused_until - now)
+                for bucket, amount in self._demands(tokens):
+                    bucket.refill(now)
+                    wait = max(wait, bucket.wait_for(amount))
+                if wait <= 0:
+                    for bucket, amount in self._demands(tokens):
+                        bucket.level -= min(amount, bucket.capacity)
+                    return time.monotonic() - start
+                self._cond.wait(timeout=wait)
+
+    def pause(self, seconds: float) -> None:
+        """Hold every caller for ``seconds`` (e.g. a 429's Retry-After)."""
+        with self._cond:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+            self._cond.notify_all()
+
+    def _demands(self, tokens: int) -> List[tuple]:
+        demands = []
+        if self._requests:
+            demands.append((self._requests, 1))
+        if self._tokens:
+            demands.append((self._tokens, tokens))
+        return demands
@@ -0,0 +1,176 @@
+"""
+region_grouping.py
+─────────────────────────────────────────────
+Merges fragmented detections into bubble-level regions.
+Vision often returns one paragraph per column of vertical manga text,
+so a single speech bubble arrives as several boxes. Neighbouring boxes
+with the same orientation, similar glyph size and aligned extents are
+clustered with a uniform-grid spatial hash and union-find, so only
+nearby pairs are ever compared.
+"""
+
+from collections import defaultdict
+from statistics import median
+from typing import Dict, List, Tuple
+
+from config.settings import GROUP_GAP_FACTOR
+from app.logger import get_logger
+
+log = get_logger("region_grouping")
+
+# A box this much taller than wide is a vertical text column
+_VERTICAL_ASPECT = 1.2
+
+# Aligned boxes must overlap this fraction of the shorter extent
+_MIN_ALIGNMENT = 0.5
+
+# Glyph sizes (short side of the box) may differ by at most this factor
+_MAX_GLYPH_RATIO = 1.6
+
+
+def group_regions(
+    detections: List[Dict],
+    page_width: int,
+    page_height: int,
+    gap_factor: float = GROUP_GAP_FACTOR,
+) -> List[Dict]:
+    """
+    Cluster nearby, aligned detections into single regions.
+
+    Parameters
+    ----------
+    detections : list[dict]
+        Detections with normalized bounding boxes.
+    page_width, page_height : int
+        Page size in pixels (boxes are compared in pixel space so that
+        the page aspect ratio does not skew gaps).
+    gap_factor : float
+        Largest gap between two boxes, as a multiple of their glyph size,
+        for them to be merged.
+
+    Returns
+    -------
+    list[dict]
+        One detection per region. Single-box regions are returned as-is;
+        merged regions get the union box, the texts joined in reading
+        order (right-to-left columns for vertical text) and the lowest
+        confidence of their members.
+    """
+    if len(detections) < 2:
+        return detections
+
+    boxes = [_pixel_box(d["bounding_box"], page_width, page_height) for d in detections]
+    glyphs = [max(1.0, min(x1 - x0, y1 - y0)) for x0, y0, x1, y1 in boxes]
+    vertical = [(y1 - y0) > (x1 - x0) * _VERTICAL_ASPECT for x0, y0, x1, y1 in boxes]
+
+    # Grid cells about one merge reach wide, so candidates sit in nearby cells
+    cell = max(1.0, median(glyphs) * (1.0 + gap_factor))
+    grid: Dict[Tuple[int, int], List[int]] = defaultdict(list)
+    for index, (x0, y0, x1, y1) in enumerate(boxes):
+        reach = glyphs[index] * gap_factor
+        for cx in range(int((x0 - reach) // cell), int((x1 + reach) // cell) + 1):
+            for cy in range(int((y0 - reach) // cell), int((y1 + reach) // cell) + 1):
+                grid[(cx, cy)].append(index)
+
+    parent = list(range(len(detections)))
+
+    def find(index: int) -> int:
+        while parent[index] != index:
+            parent[index] = parent[parent[index]]
+            index = parent[index]
+        return index
+
+    seen = set()
+    for members in grid.values():
+        for pos, a in enumerate(members):
+            for b in members[pos + 1:]:
+                pair = (a, b) if a < b else (b, a)
+                if pair in seen:
+                    continue
+                seen.add(pair)
+                if _linked(boxes[a], boxes[b], glyphs[a], glyphs[b],
+                           vertical[a], vertical[b], gap_factor):
+                    root_a, root_b = find(a), find(b)
+                    if root_a != root_b:
+                        parent[root_b] = root_a
+
+    groups: Dict[int, List[int]] = defaultdict(list)
+    for index in range(len(detections)):
+        groups[find(index)].append(index)
+
+    regions = []
+    for members in groups.values():
+        if len(members) == 1:
+            regions.append(detections[members[0]])
+            continue
+        regions.append(_merge(members, detections, boxes, vertical, page_width, page_height))
+
+    if len(regions) < len(detections):
+        log.debug(f"  Grouped {len(detections)} box(es) into {len(regions)} region(s)")
+
+    # Keep a stable reading order: top to bottom, right to left
+    regions.sort(key=lambda d: (round(d["bounding_box"]["y"], 2), -d["bounding_box"]["x"]))
+    return regions
+
+
+def _linked(a, b, glyph_a, glyph_b, vertical_a, vertical_b, gap_factor) -> bool:
+    """True if boxes ``a`` and ``b`` belong to the same text region."""
+    if vertical_a != vertical_b:
+        return False
+    if max(glyph_a, glyph_b) > min(glyph_a, glyph_b) * _MAX_GLYPH_RATIO:
+        return False
+
+    max_gap = max(glyph_a, glyph_b) * gap_factor
+    if vertical_a:
+        # Side-by-side columns: small horizontal gap, overlapping rows
+        gap = max(a[0], b[0]) - min(a[2], b[2])
+        overlap = min(a[3], b[3]) - max(a[1], b[1])
+        shorter = min(a[3] - a[1], b[3] - b[1])
+    else:
+        # Stacked lines: small vertical gap, overlapping columns
+        gap = max(a[1], b[1]) - min(a[3], b[3])
+        overlap = min(a[2], b[2]) - max(a[0], b[0])
+        shorter = min(a[2] - a[0], b[2] - b[0])
+
+    return gap <= max_gap and shorter > 0 and overlap >= shorter * _MIN_ALIGNMENT
+
+
+def _merge(members, detections, boxes, vertical, page_width, page_height) -> Dict:
+    if vertical[members[0]]:
+        # Vertical Japanese reads columns right to left
+        order = sorted(members, key=lambda i: -boxes[i][2])
+    else:
+        order = sorted(members, key=lambda i: boxes[i][1])
+
+    x0 = min(boxes[i][0] for i in members)
+    y0 = min(boxes[i][1] for i in members)
+    x1 = max(boxes[i][2] for i in members)
+    y1 = max(boxes[i][3] for i in members)
+
+    merged = dict(detections[order[0]])
+    merged["japanese_text"] = "".join(detections[i]["japanese_text"] for i in order)
+    merged["bounding_box"] = {
+        "x": x0 / page_width,
+        "y": y0 / page_height,
+        "width": (x1 - x0) / page_width,
+        "height": (y1 - y0) / page_height,
+    }
+    merged["confidence"] = min(detections[i].get("confidence", 1.0) for i in members)
+
+    bubbles = [detections[i]["bubble_box"] for i in members if detections[i].get("bubble_box")]
+    if bubbles:
+        merged["bubble_box"] = _union(bubbles)
+    return merged
+
+
+def _pixel_box(box: Dict, page_width: int, page_height: int) -> Tuple[float, float, float, float]:
+    x0, y0 = box["x"] * page_width, box["y"] * page_height
+    return (x0, y0, x0 + box["width"] * page_width, y0 + box["height"] * page_height)
+
+
+def _union(boxes: List[Dict]) -> Dict:
+    x0 = min(b["x"] for b in boxes)
+    y0 = min(b["y"] for b in boxes)
+    x1 = max(b["x"] + b["width"] for b in boxes)
+    y1 = max(b["y"] + b["height"] for b in boxes)
+    return {"x": x0, "y": y0, "width": x1 - x0, "height": y1 - y0}
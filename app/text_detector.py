@@ -5,27 +5,83 @@ Uses Google Cloud Vision API for accurate Japanese text detection.
 Provides pixel-perfect coordinate detection for manga text.
 """
 
-from typing import List, Dict
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Optional, Tuple
 from PIL import Image
 import io
 
 from google.cloud import vision
 
+from app.detector_backend import CachedDetector, contains_japanese
 from app.logger import get_logger
-from config.settings import GOOGLE_CLOUD_API_KEY
+from config.settings import (
+    DETECTION_CACHE_MODE,
+    GOOGLE_CLOUD_API_KEY,
+    VISION_BATCH_SIZE,
+    VISION_BATCH_MAX_MB,
+    VISION_CONCURRENCY,
+    VISION_UPLOAD_FORMAT,
+    VISION_UPLOAD_QUALITY,
+    VISION_UPLOAD_MAX_EDGE,
+)
 
 log = get_logger("text_detector")
 
 
-class TextDetector:
+class TextDetector(CachedDetector):
     """Accurate text detection using Google Cloud Vision API."""
 
-    def __init__(self):
+    name = "Google Cloud Vision"
+
+    def __init__(
+        self,
+        client=None,
+        concurrency: int = VISION_CONCURRENCY,
+        upload_format: str = VISION_UPLOAD_FORMAT,
+        upload_quality: int = VISION_UPLOAD_QUALITY,
+        upload_max_edge: int = VISION_UPLOAD_MAX_EDGE,
+        cache_mode: str = DETECTION_CACHE_MODE,
+    ):
         """
         Initialize Google Cloud Vision client for Japanese text detection.
         
         Uses API key authentication for simplicity.
+
+        Parameters
+        ----------
+        client : vision.ImageAnnotatorClient, optional
+            Pre-built client (or a local fake exposing the same
+            document_text_detection / batch_annotate_images methods).
+        concurrency : int
+            Maximum number of Vision requests in flight at once.
+        upload_format : str
+            Upload encoding: PNG, JPEG or WEBP.
+        upload_quality : int
+            Quality for lossy upload formats (1-100).
+        upload_max_edge : int
+            Downscale pages whose long edge exceeds this many pixels
+            before upload (0 = never).
+        cache_mode : str
+            Detection cache mode: "use", "bypass" or "refresh".
         """
+        self._concurrency = max(1, int(concurrency))
+        self._upload_format = upload_format.strip().upper()
+        self._upload_quality = int(upload_quality)
+        self._upload_max_edge = max(0, int(upload_max_edge))
+        self._pool = ThreadPoolExecutor(
+            max_workers=self._concurrency, thread_name_prefix="vision"
+        )
+        # Everything that changes what Vision returns for the same pixels
+        super().__init__(
+            cache_mode,
+            f"vision:DOCUMENT_TEXT_DETECTION:{self._upload_format}:"
+            f"{self._upload_quality}:{self._upload_max_edge}",
+        )
+
+        if client is not None:
+            self.client = client
+            return
+
         log.info("Initializing Google Cloud Vision for Japanese text detection...")
 
         if not GOOGLE_CLOUD_API_KEY:
@@ -44,59 +100,190 @@ class TextDetector:
             log.error(f"Failed to initialize Google Cloud Vision: {e}")
             raise
 
-    def detect_text(self, image: Image.Image, label: str = "") -> List[Dict]:
+    def close(self) -> None:
+        """Shut down the request pool (waits for requests in flight)."""
+        self._pool.shutdown(wait=True)
+
+    def _detect_single(self, image: Image.Image, label: str) -> Optional[List[Dict]]:
+        """One document_text_detection call; None if the request failed."""
+        log.info(f"  [{label}] Detecting Japanese text with Google Cloud Vision...")
+
+        try:
+            # Create Vision API image object
+            # Boxes are normalized against the uploaded size, so a downscaled
+            # upload still maps back onto the original page
+            content, (img_width, img_height) = self._encode_image(image)
+            vision_image = vision.Image(content=content)
+
+            # Run DOCUMENT_TEXT_DETECTION for structured output
+            # This gives us paragraphs/blocks instead of individual characters
+            response = self.client.document_text_detection(image=vision_image)
+
+            return self._detections_from_response(response, img_width, img_height, label)
+
+        except Exception as exc:
+            log.error(f"  [{label}] Google Cloud Vision detection failed: {exc}")
+            return None
+
+    def _detect_pages(
+        self,
+        images: List[Image.Image],
+        labels: List[str],
+    ) -> List[Optional[List[Dict]]]:
         """
-        Detect Japanese text in an image with accurate bounding boxes.
-        
-        Uses document text detection to get structured blocks (paragraphs)
-        instead of individual characters, providing better translations
-        and more accurate bounding boxes.
+        Detect Japanese text in several pages with batch_annotate_images.
+
+        Pages are packed into requests of at most VISION_BATCH_SIZE images
+        and VISION_BATCH_MAX_MB of payload, and up to VISION_CONCURRENCY
+        requests are kept in flight at once. An error on one image only
+        empties that image's result; if a whole request fails, its pages
+        are retried one by one.
 
         Parameters
         ----------
-        image : PIL.Image.Image
-            The page image to analyze.
-        label : str, optional
-            Human-readable label for logging.
+        images : list[PIL.Image.Image]
+            Page images to analyze (cache misses only).
+        labels : list[str]
+            Human-readable label per image for logging.
 
         Returns
         -------
-        list[dict]
-            List of detected text regions, each containing:
-            - japanese_text: The detected Japanese text
-            - bounding_box: Normalized coordinates (0-1)
-            - confidence: Detection confidence score
+        list[list[dict] or None]
+            One detection list per input image, in input order, or None
+            where the request for that image failed.
         """
-        log.info(f"  [{label}] Detecting Japanese text with Google Cloud Vision...")
+        encoded = [self._encode_image(image) for image in images]
+        payloads = [content for content, _ in encoded]
+        upload_sizes = [size for _, size in encoded]
+        results: Dict[int, Optional[List[Dict]]] = {}
 
-        # Convert PIL Image to bytes for Google Cloud Vision
-        img_byte_arr = io.BytesIO()
-        image.save(img_byte_arr, format='PNG')
-        img_byte_arr.seek(0)
+        batches = self._plan_batches([len(p) for p in payloads])
+        if self._concurrency == 1 or len(batches) == 1:
+            for indices in batches:
+                results.update(
+                    self._annotate_batch(indices, images, payloads, upload_sizes, labels)
+                )
+        else:
+            # Requests run concurrently; results are keyed by index so order is kept
+            futures = [
+                self._pool.submit(
+                    self._annotate_batch, indices, images, payloads, upload_sizes, labels
+                )
+                for indices in batches
+            ]
+            for future in futures:
+                results.update(future.result())
+
+        return [results[i] for i in range(len(images))]
 
-        img_width, img_height = image.size
+    def _annotate_batch(
+        self,
+        indices: List[int],
+        images: List[Image.Image],
+        payloads: List[bytes],
+        upload_sizes: List[Tuple[int, int]],
+        labels: List[str],
+    ) -> Dict[int, Optional[List[Dict]]]:
+        """Run one batch_annotate_images request; returns {image_index: detections or None}."""
+        results: Dict[int, Optional[List[Dict]]] = {i: None for i in indices}
+
+        span = labels[indices[0]]
+        if len(indices) > 1:
+            span = f"{span} … {labels[indices[-1]]}"
+        log.info(
+            f"  [{span}] Detecting Japanese text in {len(indices)} page(s) "
+            f"with one Vision request..."
+        )
+        requests = [
+            vision.AnnotateImageRequest(
+                image=vision.Image(content=payloads[i]),
+                features=[vision.Feature(type_=vision.Feature.Type.DOCUMENT_TEXT_DETECTION)],
+            )
+            for i in indices
+        ]
 
         try:
-            # Create Vision API image object
-            vision_image = vision.Image(content=img_byte_arr.read())
+            batch_response = self.client.batch_annotate_images(requests=requests)
+        except Exception as exc:
+            log.warning(
+                f"  Vision batch request failed ({exc}); "
+                f"retrying {len(indices)} page(s) individually"
+            )
+            for i in indices:
+                results[i] = self._detect_single(images[i], labels[i])
+            return results
 
-            # Run DOCUMENT_TEXT_DETECTION for structured output
-            # This gives us paragraphs/blocks instead of individual characters
-            response = self.client.document_text_detection(image=vision_image)
+        for i, response in zip(indices, batch_response.responses):
+            width, height = upload_sizes[i]
+            try:
+                results[i] = self._detections_from_response(response, width, height, labels[i])
+            except Exception as exc:
+                log.error(f"  [{labels[i]}] Could not read Vision response: {exc}")
 
-            if response.error.message:
-                log.error(f"  [{label}] Vision API error: {response.error.message}")
-                return []
+        return results
 
-            # Use the full document structure for better text grouping
-            detections = self._extract_text_blocks(response, img_width, img_height, label)
-            
-            log.info(f"  [{label}] Detected {len(detections)} text block(s)")
-            return detections
+    @staticmethod
+    def _plan_batches(payload_sizes: List[int]) -> List[List[int]]:
+        """Group consecutive image indices under the per-request count/size limits."""
+        max_images = max(1, VISION_BATCH_SIZE)
+        max_bytes = VISION_BATCH_MAX_MB * 1024 * 1024
 
-        except Exception as exc:
-            log.error(f"  [{label}] Google Cloud Vision detection failed: {exc}")
-            return []
+        batches: List[List[int]] = []
+        current: List[int] = []
+        current_bytes = 0
+        for index, size in enumerate(payload_sizes):
+            if current and (len(current) >= max_images or current_bytes + size > max_bytes):
+                batches.append(current)
+                current, current_bytes = [], 0
+            current.append(index)
+            current_bytes += size
+        if current:
+            batches.append(current)
+        return batches
+
+    def _encode_image(self, image: Image.Image) -> Tuple[bytes, Tuple[int, int]]:
+        """
+        Encode a page for upload using the configured format/quality,
+        downscaling it first if its long edge exceeds the upload limit.
+
+        Returns
+        -------
+        tuple[bytes, tuple[int, int]]
+            Encoded bytes and the (width, height) actually uploaded.
+        """
+        long_edge = max(image.size)
+        if self._upload_max_edge and long_edge > self._upload_max_edge:
+            scale = self._upload_max_edge / long_edge
+            image = image.resize(
+                (max(1, round(image.width * scale)), max(1, round(image.height * scale))),
+                Image.LANCZOS,
+                reducing_gap=2.0,
+            )
+
+        # Convert PIL Image to bytes for Google Cloud Vision
+        # (L pages from COLOR_MODE=L/auto encode as single-channel images)
+        img_byte_arr = io.BytesIO()
+        if self._upload_format in ("JPEG", "JPG"):
+            image.save(img_byte_arr, format="JPEG", quality=self._upload_quality)
+        elif self._upload_format == "WEBP":
+            image.save(img_byte_arr, format="WEBP", quality=self._upload_quality, method=4)
+        else:
+            image.save(img_byte_arr, format="PNG")
+        return img_byte_arr.getvalue(), image.size
+
+    def _detections_from_response(
+        self, response, img_width: int, img_height: int, label: str
+    ) -> Optional[List[Dict]]:
+        """Turn one AnnotateImageResponse into detections (None on API error)."""
+        if response.error.message:
+            log.error(f"  [{label}] Vision API error: {response.error.message}")
+            return None
+
+        # Use the full document structure for better text grouping
+        detections = self._extract_text_blocks(response, img_width, img_height, label)
+
+        log.info(f"  [{label}] Detected {len(detections)} text block(s)")
+        return detections
 
     def _extract_text_blocks(
         self, 
@@ -134,7 +321,7 @@ class TextDetector:
                         continue
                     
                     # Check if this contains Japanese characters
-                    if not self._contains_japanese(text):
+                    if not contains_japanese(text):
                         continue
                     
                     # Get bounding box from paragraph
@@ -168,21 +355,6 @@ class TextDetector:
             text_parts.append(word_text)
         return " ".join(text_parts)
 
-    def _contains_japanese(self, text: str) -> bool:
-        """
-        Check if text contains Japanese characters (Hiragana, Katakana, Kanji).
-        """
-        for char in text:
-            # Hiragana: 3040-309F
-            # Katakana: 30A0-30FF
-            # Kanji (CJK Unified Ideographs): 4E00-9FFF
-            code = ord(char)
-            if (0x3040 <= code <= 0x309F or
-                0x30A0 <= code <= 0x30FF or
-                0x4E00 <= code <= 0x9FFF):
-                return True
-        return False
-
     def _vertices_to_normalized_bbox(
         self,
         vertices,
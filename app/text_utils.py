@@ -0,0 +1,40 @@
+"""
+text_utils.py
+─────────────────────────────────────────────
+Normalization of detected Japanese text, so the same line read twice
+(full-width vs half-width forms, the spaces the detectors put between
+words) maps to one key for caching and deduplication.
+"""
+
+import re
+import unicodedata
+
+# Whitespace next to a CJK character is a word-assembly artefact, not content
+_CJK = r"　-〿぀-ヿㇰ-ㇿ一-鿿！-｠"
+_SPACE_BEFORE_CJK_RE = re.compile(rf"\s+(?=[{_CJK}])")
+_SPACE_AFTER_CJK_RE = re.compile(rf"(?<=[{_CJK}])\s+")
+_SPACES_RE = re.compile(r"\s+")
+
+
+def normalize_japanese(text: str) -> str:
+    """
+    Canonical form of a detected string.
+
+    Applies NFKC (half-width katakana and full-width ASCII fold to their
+    standard forms), drops whitespace adjacent to Japanese characters and
+    collapses any remaining runs of whitespace.
+
+    Parameters
+    ----------
+    text : str
+        Detected text.
+
+    Returns
+    -------
+    str
+        Normalized text.
+    """
+    text = unicodedata.normalize("NFKC", text or "")
+    text = _SPACE_BEFORE_CJK_RE.sub("", text)
+    text = _SPACE_AFTER_CJK_RE.sub("", text)
+    return _SPACES_RE.sub(" ", text).strip()
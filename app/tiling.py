@@ -0,0 +1,135 @@
+"""
+tiling.py
+─────────────────────────────────────────────
+Splits very tall pages (long-strip webtoons) into overlapping
+horizontal tiles for detection, and merges the per-tile detections
+back into page-normalized boxes. Text cut by a tile edge is also seen
+whole in the neighbouring tile thanks to the overlap; the duplicate
+(and the clipped copy) are dropped during the merge.
+"""
+
+from typing import Dict, List, Tuple
+
+# Boxes within this many pixels of an interior tile edge were probably cut off
+_EDGE_MARGIN_PX = 2
+
+# Two boxes are duplicates if their intersection covers this much of the smaller one
+_DUPLICATE_OVERLAP = 0.6
+
+# Box fields (normalized x/y/width/height) that are reprojected from tile to page
+_BOX_FIELDS = ("bounding_box", "bubble_box")
+
+
+def plan_tiles(height: int, max_height: int, overlap: int) -> List[Tuple[int, int]]:
+    """
+    Vertical tile spans covering a page of ``height`` pixels.
+
+    Parameters
+    ----------
+    height : int
+        Page height in pixels.
+    max_height : int
+        Maximum tile height (0 disables tiling).
+    overlap : int
+        Rows shared by consecutive tiles; should exceed the tallest
+        text region so each one fits whole in at least one tile.
+
+    Returns
+    -------
+    list[tuple[int, int]]
+        (top, bottom) row spans, bottom exclusive. A single span covering
+        the page when no tiling is needed.
+    """
+    if max_height <= 0 or height <= max_height:
+        return [(0, height)]
+
+    overlap = max(0, min(overlap, max_height // 2))
+    step = max_height - overlap
+    count = -(-(height - overlap) // step)  # ceil
+    # Spread the tiles evenly instead of leaving a thin last tile
+    step = -(-(height - overlap) // count)
+    tile_height = step + overlap
+
+    spans = []
+    for index in range(count):
+        top = min(index * step, height - tile_height)
+        spans.append((max(0, top), min(height, top + tile_height)))
+    return spans
+
+
+def merge_tile_detections(
+    tile_results: List[Tuple[Tuple[int, int], List[Dict]]],
+    page_width: int,
+    page_height: int,
+) -> List[Dict]:
+    """
+    Reproject per-tile detections onto the page and drop overlap duplicates.
+
+    Parameters
+    ----------
+    tile_results : list
+        ((top, bottom), detections) per tile, detections normalized to
+        the tile.
+    page_width, page_height : int
+        Page size in pixels.
+
+    Returns
+    -------
+    list[dict]
+        Detections normalized to the whole page, top to bottom.
+    """
+    candidates = []  # (clipped, -area, y, x, pixel box, detection)
+    for (top, bottom), detections in tile_results:
+        tile_height = bottom - top
+        for detection in detections:
+            reprojected = dict(detection)
+            for field in _BOX_FIELDS:
+                if detection.get(field):
+                    reprojected[field] = _to_page(detection[field], top, tile_height, page_height)
+
+            box = _pixel_box(detection["bounding_box"], top, tile_height, page_width)
+            clipped = (
+                (top > 0 and box[1] <= top + _EDGE_MARGIN_PX)
+                or (bottom < page_height and box[3] >= bottom - _EDGE_MARGIN_PX)
+            )
+            area = (box[2] - box[0]) * (box[3] - box[1])
+            candidates.append((clipped, -area, box[1], box[0], box, reprojected))
+
+    # Whole boxes first, larger first, so they win over clipped/partial copies
+    candidates.sort(key=lambda c: (c[0], c[1], c[2], c[3]))
+
+    kept: List[Tuple[Tuple[float, float, float, float], Dict]] = []
+    for _clipped, _area, _y, _x, box, detection in candidates:
+        if any(_overlap_ratio(box, other) >= _DUPLICATE_OVERLAP for other, _ in kept):
+            continue
+        kept.append((box, detection))
+
+    kept.sort(key=lambda item: (item[0][1], item[0][0]))
+    return [detection for _, detection in kept]
+
+
+def _to_page(box: Dict, top: int, tile_height: int, page_height: int) -> Dict:
+    return {
+        "x": box["x"],
+        "y": (top + box["y"] * tile_height) / page_height,
+        "width": box["width"],
+        "height": box["height"] * tile_height / page_height,
+    }
+
+
+def _pixel_box(box: Dict, top: int, tile_height: int, page_width: int) -> Tuple[float, float, float, float]:
+    x0 = box["x"] * page_width
+    y0 = top + box["y"] * tile_height
+    return (x0, y0, x0 + box["width"] * page_width, y0 + box["height"] * tile_height)
+
+
+def _overlap_ratio(a, b) -> float:
+    """Intersection area over the smaller box's area."""
+    ix = min(a[2], b[2]) - max(a[0], b[0])
+    iy = min(a[3], b[3]) - max(a[1], b[1])
+    if ix <= 0 or iy <= 0:
+        return 0.0
+    smaller = min(
+        (a[2] - a[0]) * (a[3] - a[1]), (b[2] - b[0]) * (b[3] - b[1])
+    )
+    return ix * iy / smaller if smaller else 0.0
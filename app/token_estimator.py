@@ -0,0 +1,115 @@
+"""
+token_estimator.py
+─────────────────────────────────────────────
+Cheap token estimates for translation requests, used to size batches
+without calling a tokenizer. Japanese runs close to one token per
+character on current OpenAI tokenizers; other text about four
+characters per token. English output is budgeted as a multiple of the
+source tokens. Actual usage reported by the API is priced here too.
+"""
+
+import math
+import re
+from typing import Dict, List
+
+from config.settings import (
+    TRANSLATION_PRICE_INPUT_PER_1M,
+    TRANSLATION_PRICE_OUTPUT_PER_1M,
+)
+
+# Kana, CJK ideographs, CJK punctuation and full-width forms
+_CJK_RE = re.compile(r"[　-ヿㇰ-ㇿ㐀-䶿一-鿿＀-￯]")
+
+# JSON framing ({"id": n, "text": "..."}) around each item in prompt and answer
+_ITEM_OVERHEAD = 10
+
+# English translation tokens per Japanese source token
+_COMPLETION_RATIO = 1.5
+
+# The {"translations": [...]} wrapper around the items of one answer
+_RESPONSE_OVERHEAD = 16
+
+
+def estimate_tokens(text: str) -> int:
+    """Approximate token count of ``text``."""
+    cjk = len(_CJK_RE.findall(text))
+    return cjk + math.ceil((len(text) - cjk) / 4)
+
+
+def estimate_item_tokens(text: str) -> int:
+    """Approximate prompt + completion tokens one translation item costs."""
+    source = estimate_tokens(text)
+    return source + math.ceil(source * _COMPLETION_RATIO) + 2 * _ITEM_OVERHEAD
+
+
+def estimate_completion_tokens(texts: List[str]) -> int:
+    """Approximate completion tokens of the structured answer for ``texts``."""
+    return _RESPONSE_OVERHEAD + sum(
+        math.ceil(estimate_tokens(text) * _COMPLETION_RATIO) + _ITEM_OVERHEAD
+        for text in texts
+    )
+
+
+def estimate_cost(prompt_tokens: int, completion_tokens: int, discount: float = 1.0) -> float:
+    """
+    USD cost of a token usage at TRANSLATION_PRICE_*_PER_1M.
+
+    Parameters
+    ----------
+    prompt_tokens : int
+        Prompt (input) tokens.
+    completion_tokens : int
+        Completion (output) tokens.
+    discount : float
+        Price multiplier (0.5 for Batch API jobs).
+    """
+    cost = (
+        prompt_tokens * TRANSLATION_PRICE_INPUT_PER_1M
+        + completion_tokens * TRANSLATION_PRICE_OUTPUT_PER_1M
+    ) / 1_000_000
+    return round(cost * discount, 6)
+
+
+def usage_entry(prompt_tokens: int, completion_tokens: int, discount: float = 1.0) -> Dict:
+    """Token usage record, as stored per page and per file in the report."""
+    return {
+        "prompt_tokens": prompt_tokens,
+        "completion_tokens": completion_tokens,
+        "cost_usd": estimate_cost(prompt_tokens, completion_tokens, discount),
+    }
+
+
+def split_by_token_budget(texts: List[str], budget: int) -> List[List[int]]:
+    """
+    Group consecutive text indices so each group's estimated item tokens
+    stay within ``budget``. An item larger than the budget gets a group
+    of its own.
+
+    Parameters
+    ----------
+    texts : list[str]
+        Texts to translate.
+    budget : int
+        Token budget per group (0 or less = one group).
+
+    Returns
+    -------
+    list[list[int]]
+        Index groups, in order.
+    """
+    if budget <= 0:
+        return [list(range(len(texts)))] if texts else []
+
+    groups: List[List[int]] = []
+    current: List[int] = []
+    current_tokens = 0
+    for index, text in enumerate(texts):
+        cost = estimate_item_tokens(text)
+        if current and current_tokens + cost > budget:
+            groups.append(current)
+            current, current_tokens = [], 0
+        current.append(index)
+        current_tokens += cost
+    if current:
+        groups.append(current)
+    return groups
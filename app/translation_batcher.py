@@ -0,0 +1,219 @@
+"""
+translation_batcher.py
+─────────────────────────────────────────────
+Accumulates the detected texts of several pages (and several PDFs)
+and translates them together, so a page with two bubbles no longer
+pays for a whole request and system prompt of its own. Each page
+registers a callback that receives its own slice of translations once
+the batch it belongs to has been translated, together with its share
+of the flush's token usage (split by each page's estimated tokens).
+
+The batcher also deduplicates for the whole run: texts are normalized
+(see normalize_japanese) and each distinct string is translated once
+(sent as the first original spelling seen), with its translation fanned
+back out to every later occurrence.
+"""
+
+import threading
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+from config.settings import (
+    TRANSLATION_MAX_PENDING_MB,
+    TRANSLATION_MAX_PENDING_PAGES,
+    TRANSLATION_TOKEN_BUDGET,
+)
+from app.logger import get_logger
+from app.text_utils import normalize_japanese
+from app.token_estimator import estimate_item_tokens, usage_entry
+from app.translator import Translator
+
+log = get_logger("translation_batcher")
+
+# Receives the page's translations, in the order its texts were added,
+# and its token usage (see token_estimator.usage_entry)
+PageCallback = Callable[[List[str], Dict], None]
+
+# Receives (position in the page's texts, translation) as soon as one is ready
+PageItemCallback = Callable[[int, str], None]
+
+
+class TranslationBatcher:
+    """Token-budgeted translation queue shared across pages and files."""
+
+    def __init__(
+        self,
+        translator: Translator,
+        token_budget: int = TRANSLATION_TOKEN_BUDGET,
+        max_pending_pages: int = TRANSLATION_MAX_PENDING_PAGES,
+        max_pending_mb: float = TRANSLATION_MAX_PENDING_MB,
+    ):
+        """
+        Parameters
+        ----------
+        translator : Translator
+            Translator used for each flush.
+        token_budget : int
+            Estimated tokens (source + expected translation) per request.
+            A flush waits for enough pages to fill one request per
+            translator worker, which the translator then sends concurrently.
+        max_pending_pages : int
+            Flush once this many pages are waiting, whatever their size.
+        max_pending_mb : float
+            Flush once the page images held by waiting pages (``held_bytes``
+            of add()) reach this many MB, so memory is bounded by size
+            rather than by page count.
+        """
+        self._translator = translator
+        self._flush_tokens = max(1, int(token_budget)) * getattr(translator, "concurrency", 1)
+        self._max_pending_pages = max(1, int(max_pending_pages))
+        self._max_pending_bytes = max(0.0, max_pending_mb) * 1024 * 1024
+        self._pending: List[Tuple[List[str], PageCallback, str, Optional[PageItemCallback]]] = []
+        # Pending normalized key → first original spelling, which is what gets sent
+        self._pending_keys: Dict[str, str] = {}
+        self._pending_tokens = 0
+        self._pending_bytes = 0
+        # Run-wide: normalized source → translation, and every source seen
+        self._translated: Dict[str, str] = {}
+        self._seen: Set[str] = set()
+        self.pages = 0
+        self.flushes = 0
+        self.texts = 0
+
+    def add(
+        self,
+        texts: List[str],
+        on_translated: PageCallback,
+        label: str = "",
+        on_item: Optional[PageItemCallback] = None,
+        held_bytes: int = 0,
+    ) -> None:
+        """
+        Queue one page's texts.
+
+        The queue is flushed first if this page would push it past the
+        flush size, and afterwards if the page or memory limit is reached.
+
+        Parameters
+        ----------
+        texts : list[str]
+            The page's Japanese texts. Strings already translated in this
+            run, or already queued, add nothing to the flush size.
+        on_translated : callable
+            Called with the page's translations and token usage once they
+            are available.
+        label : str, optional
+            Human-readable page label for logging.
+        on_item : callable, optional
+            Called as ``on_item(position, translation)`` for each of the
+            page's texts as soon as its translation is known (from a
+            translation worker thread; calls are serialized), before
+            ``on_translated``.
+        held_bytes : int, optional
+            Memory the page keeps alive until it is translated (its
+            decoded image), counted against ``max_pending_mb``.
+        """
+        keys = [normalize_japanese(text) for text in texts]
+        new_keys = {
+            key: text for key, text in zip(keys, texts)
+            if key and key not in self._translated and key not in self._pending_keys
+        }
+        cost = sum(estimate_item_tokens(key) for key in new_keys)
+        if self._pending and self._pending_tokens + cost > self._flush_tokens:
+            self.flush()
+
+        self._pending.append((keys, on_translated, label, on_item))
+        for key, text in zip(keys, texts):
+            if key and key not in self._translated:
+                self._pending_keys.setdefault(key, text)
+        self._pending_tokens += cost
+        self._pending_bytes += held_bytes
+        self._seen.update(key for key in keys if key)
+        self.pages += 1
+        self.texts += len(keys)
+
+        if (
+            len(self._pending) >= self._max_pending_pages
+            or (held_bytes and self._pending_bytes >= self._max_pending_bytes)
+        ):
+            self.flush()
+
+    def flush(self) -> None:
+        """Translate every queued page and hand each its translations."""
+        if not self._pending:
+            return
+
+        pending, self._pending = self._pending, []
+        originals, self._pending_keys = self._pending_keys, {}
+        self._pending_tokens = 0
+        self._pending_bytes = 0
+        self.flushes += 1
+
+        all_keys = [key for keys, _, _, _ in pending for key in keys]
+        first_label, last_label = pending[0][2], pending[-1][2]
+        span = first_label if len(pending) == 1 else f"{first_label} … {last_label}"
+
+        # Each distinct string not yet translated in this run is sent once
+        missing = list(dict.fromkeys(
+            key for key in all_keys if key and key not in self._translated
+        ))
+        log.info(
+            f"  [{span}] Translating {len(missing)} unique of {len(all_keys)} text(s) "
+            f"from {len(pending)} page(s)"
+        )
+        # Pages that render per item: key → [(page callback, position)]
+        targets: Dict[str, List[Tuple[PageItemCallback, int]]] = {}
+        for keys, _, _, page_on_item in pending:
+            if page_on_item:
+                for position, key in enumerate(keys):
+                    targets.setdefault(key, []).append((page_on_item, position))
+        for key, key_targets in targets.items():
+            if key in self._translated:
+                for page_on_item, position in key_targets:
+                    page_on_item(position, self._translated[key])
+
+        item_lock = threading.Lock()
+
+        def on_missing_item(index: int, translation: str) -> None:
+            with item_lock:
+                for page_on_item, position in targets.get(missing[index], ()):
+                    page_on_item(position, translation)
+
+        used = {"prompt_tokens": 0, "completion_tokens": 0}
+        if missing:
+            before = self._translator.usage_snapshot()
+            translations = self._translator.translate_batch(
+                [originals.get(key, key) for key in missing],
+                label=span,
+                on_item=on_missing_item if targets else None,
+            )
+            after = self._translator.usage_snapshot()
+            used = {name: after[name] - before[name] for name in used}
+            # Failed (empty) translations are retried if the string recurs
+            self._translated.update(
+                (key, translation) for key, translation in zip(missing, translations) if translation
+            )
+
+        # Each page pays for the strings it needed sent, by estimated tokens
+        sent = set(missing)
+        weights = [
+            sum(estimate_item_tokens(key) for key in keys if key in sent)
+            for keys, _, _, _ in pending
+        ]
+        total_weight = sum(weights) or 1
+        for (keys, on_translated, _, _), weight in zip(pending, weights):
+            share = weight / total_weight
+            on_translated(
+                [self._translated.get(key, "") for key in keys],
+                usage_entry(
+                    round(used["prompt_tokens"] * share),
+                    round(used["completion_tokens"] * share),
+                ),
+            )
+
+    def dedup_stats(self) -> Dict:
+        """Run-wide deduplication counters for the processing report."""
+        return {
+            "texts": self.texts,
+            "unique": len(self._seen),
+            "dedup_ratio": round(1 - len(self._seen) / self.texts, 4) if self.texts else 0.0,
+        }
@@ -0,0 +1,246 @@
+"""
+translation_memory.py
+─────────────────────────────────────────────
+Persistent translation memory (SQLite) shared by every run.
+Lines that recur across chapters and volumes (SFX, names, stock
+phrases) are translated once and then served locally. Entries are
+keyed by normalized Japanese text, model and prompt version, so a
+model or prompt change never serves stale translations. Lines with no
+exact entry reuse a remembered line that differs only in punctuation
+or a trailing ー / small kana; more distant but similar lines are only
+suggested in the log (see fuzzy_index.py).
+"""
+
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from config.settings import (
+    CACHE_FOLDER,
+    TRANSLATION_FUZZY_THRESHOLD,
+    TRANSLATION_MEMORY_ENABLED,
+)
+from app.fuzzy_index import FuzzyIndex, variant_key
+from app.logger import get_logger
+
+log = get_logger("translation_memory")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS translations (
+    source         TEXT    NOT NULL,
+    model          TEXT    NOT NULL,
+    prompt_version TEXT    NOT NULL,
+    translation    TEXT    NOT NULL,
+    created_at     REAL    NOT NULL,
+    last_used_at   REAL    NOT NULL,
+    use_count      INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (source, model, prompt_version)
+)
+"""
+
+# SQLite caps bound parameters per statement; stay well below it
+_LOOKUP_CHUNK = 500
+
+_memories: Dict[Tuple[str, str], "TranslationMemory"] = {}
+_memories_lock = threading.Lock()
+
+
+class TranslationMemory:
+    """Normalized-source → translation store for one (model, prompt version)."""
+
+    def __init__(
+        self,
+        db_path: Path,
+        model: str,
+        prompt_version: str,
+        fuzzy_threshold: float = TRANSLATION_FUZZY_THRESHOLD,
+    ):
+        """
+        Parameters
+        ----------
+        db_path : Path
+            SQLite database file (created if missing).
+        model : str
+            Translation model the entries belong to.
+        prompt_version : str
+            Version of the translation prompt the entries belong to.
+        fuzzy_threshold : float
+            Minimum similarity for lookup_similar() suggestions
+            (0 = lookup_similar() disabled).
+        """
+        db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._model = model
+        self._prompt_version = prompt_version
+        self._fuzzy_threshold = fuzzy_threshold
+        # Built from the stored sources on the first similarity lookup:
+        # variant key → stored source, and a similarity index over the keys
+        self._variants: Optional[Dict[str, str]] = None
+        self._fuzzy: Optional[FuzzyIndex] = None
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(db_path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(_SCHEMA)
+        self._conn.commit()
+        self.hits = 0
+        self.misses = 0
+        self.fuzzy_hits = 0
+        self.fuzzy_suggestions = 0
+
+    def lookup_many(self, sources: Iterable[str]) -> Dict[str, str]:
+        """
+        Return {normalized source: translation} for the sources found.
+
+        Parameters
+        ----------
+        sources : iterable of str
+            Normalized source texts.
+        """
+        unique = list(dict.fromkeys(sources))
+        with self._lock:
+            found = self._select(unique)
+            self._touch(found)
+            self.hits += len(found)
+            self.misses += len(unique) - len(found)
+        return found
+
+    def lookup_similar(self, sources: Iterable[str]) -> Dict[str, str]:
+        """
+        Return {normalized source: translation} for the sources with a
+        stored source that differs only in punctuation or a trailing ー /
+        small kana (the same variant_key). Meant for sources lookup_many()
+        missed. Every reuse is logged; a stored source that is merely at
+        least ``fuzzy_threshold`` similar (行きたい / 行きたくない) is never
+        reused, only logged as a suggestion.
+
+        Parameters
+        ----------
+        sources : iterable of str
+            Normalized source texts.
+        """
+        if self._fuzzy_threshold <= 0:
+            return {}
+        unique = list(dict.fromkeys(sources))
+        if not unique:
+            return {}
+
+        with self._lock:
+            if self._fuzzy is None:
+                self._variants, self._fuzzy = self._build_fuzzy_index()
+            matches: Dict[str, str] = {}
+            for source in unique:
+                key = variant_key(source)
+                if not key:
+                    continue
+                if key in self._variants:
+                    matches[source] = self._variants[key]
+                    continue
+                suggestion = self._fuzzy.best_match(key, self._fuzzy_threshold)
+                if suggestion:
+                    self.fuzzy_suggestions += 1
+                    log.debug(
+                        f"「{source}」 resembles remembered 「{self._variants[suggestion[0]]}」 "
+                        f"(similarity {suggestion[1]:.2f}); not reused"
+                    )
+            stored = self._select(list(set(matches.values())))
+            self._touch(stored)
+            found: Dict[str, str] = {}
+            for source, match in matches.items():
+                if match in stored:
+                    found[source] = stored[match]
+                    log.info(f"♻️  Reusing translation of 「{match}」 for 「{source}」")
+            self.fuzzy_hits += len(found)
+        return found
+
+    def store_many(self, pairs: Iterable[Tuple[str, str]]) -> None:
+        """Store (normalized source, translation) pairs; empty translations are skipped."""
+        now = time.time()
+        rows = [
+            (source, self._model, self._prompt_version, translation, now, now)
+            for source, translation in pairs
+            if source and translation
+        ]
+        if not rows:
+            return
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO translations "
+                "(source, model, prompt_version, translation, created_at, last_used_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+            self._conn.commit()
+            if self._fuzzy is not None:
+                for row in rows:
+                    self._add_variant(row[0])
+
+    def stats(self) -> Dict:
+        """Hit/miss counters for the processing report."""
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0,
+            "fuzzy_hits": self.fuzzy_hits,
+            "fuzzy_suggestions": self.fuzzy_suggestions,
+        }
+
+    def _select(self, sources: List[str]) -> Dict[str, str]:
+        """Stored translations of ``sources`` (caller holds the lock)."""
+        found: Dict[str, str] = {}
+        for start in range(0, len(sources), _LOOKUP_CHUNK):
+            chunk = sources[start:start + _LOOKUP_CHUNK]
+            placeholders = ",".join("?" * len(chunk))
+            rows = self._conn.execute(
+                f"SELECT source, translation FROM translations "
+                f"WHERE model = ? AND prompt_version = ? AND source IN ({placeholders})",
+                (self._model, self._prompt_version, *chunk),
+            ).fetchall()
+            found.update(rows)
+        return found
+
+    def _touch(self, sources: Iterable[str]) -> None:
+        """Record a use of each of ``sources`` (caller holds the lock)."""
+        now = time.time()
+        rows = [(now, source, self._model, self._prompt_version) for source in sources]
+        if rows:
+            self._conn.executemany(
+                "UPDATE translations SET last_used_at = ?, use_count = use_count + 1 "
+                "WHERE source = ? AND model = ? AND prompt_version = ?",
+                rows,
+            )
+            self._conn.commit()
+
+    def _build_fuzzy_index(self) -> Tuple[Dict[str, str], FuzzyIndex]:
+        """Index every stored source of this model and prompt version (caller holds the lock)."""
+        start = time.monotonic()
+        self._variants, self._fuzzy = {}, FuzzyIndex()
+        for (source,) in self._conn.execute(
+            "SELECT source FROM translations WHERE model = ? AND prompt_version = ?",
+            (self._model, self._prompt_version),
+        ):
+            self._add_variant(source)
+        log.info(f"Indexed {len(self._variants)} remembered line(s) for similarity lookup "
+                 f"in {time.monotonic() - start:.2f}s")
+        return self._variants, self._fuzzy
+
+    def _add_variant(self, source: str) -> None:
+        """Add a stored source to the variant map and index (caller holds the lock)."""
+        key = variant_key(source)
+        if key:
+            self._variants[key] = source
+            self._fuzzy.add(key)
+
+
+def get_translation_memory(model: str, prompt_version: str) -> Optional[TranslationMemory]:
+    """Shared process-wide memory, or None when TRANSLATION_MEMORY_ENABLED is off."""
+    if not TRANSLATION_MEMORY_ENABLED:
+        return None
+    with _memories_lock:
+        key = (model, prompt_version)
+        if key not in _memories:
+            _memories[key] = TranslationMemory(
+                CACHE_FOLDER / "translation_memory.sqlite3", model, prompt_version
+            )
+        return _memories[key]
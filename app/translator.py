@@ -5,8 +5,13 @@ Uses GPT-4o Text API (not Vision) for Japanese to English translation.
 Much faster and cheaper than vision API, with better translation quality.
 """
 
+import json
+import math
+import threading
 import time
-from typing import Dict, List
+from concurrent.futures import ThreadPoolExecutor
+from email.utils import parsedate_to_datetime
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
 from openai import OpenAI
 
 from config.settings import (
@@ -14,29 +19,177 @@ from config.settings import (
     MODEL,
     MAX_RETRIES,
     RETRY_DELAY_SECONDS,
+    TRANSLATION_CONCURRENCY,
+    TRANSLATION_MEMORY_ENABLED,
+    TRANSLATION_RPM,
+    TRANSLATION_STREAMING,
+    TRANSLATION_TOKEN_BUDGET,
+    TRANSLATION_TPM,
 )
+from app.glossary import Glossary, get_glossary
 from app.logger import get_logger
+from app.rate_limiter import RateLimiter
+from app.text_utils import normalize_japanese
+from app.token_estimator import (
+    estimate_completion_tokens,
+    estimate_tokens,
+    split_by_token_budget,
+)
+from app.translation_memory import get_translation_memory
 
 log = get_logger("translator")
 
+# Bump whenever _SYSTEM_PROMPT or the request format changes, so the
+# translation memory stops serving translations made with the old prompt
+PROMPT_VERSION = "2"
+
+_SYSTEM_PROMPT = """You are an expert Japanese to English translator specializing in manga and comic translation.
+
+Your task:
+- Translate each Japanese text to natural, fluent English
+- Maintain the original tone and style  
+- Keep translations concise for speech bubbles
+- Preserve any emphasis or emotion in the text
+
+CRITICAL OUTPUT FORMAT:
+The input is a JSON array of items, each with an "id" and a Japanese "text".
+Return a JSON object {"translations": [{"id": <id>, "text": <translation>}, ...]}
+with exactly one entry per input id, using the ids you were given.
+DO NOT merge, split or skip items.
+
+Example if 2 texts:
+{"translations": [{"id": 1, "text": "Hello"}, {"id": 2, "text": "Thank you"}]}"""
+
+# Structured output: the API guarantees this shape, so the answer is
+# parsed by id instead of by line position
+_RESPONSE_FORMAT = {
+    "type": "json_schema",
+    "json_schema": {
+        "name": "translations",
+        "strict": True,
+        "schema": {
+            "type": "object",
+            "properties": {
+                "translations": {
+                    "type": "array",
+                    "items": {
+                        "type": "object",
+                        "properties": {
+                            "id": {"type": "integer"},
+                            "text": {"type": "string"},
+                        },
+                        "required": ["id", "text"],
+                        "additionalProperties": False,
+                    },
+                },
+            },
+            "required": ["translations"],
+            "additionalProperties": False,
+        },
+    },
+}
+
+# max_tokens is sized per request from the expected answer, because OpenAI
+# counts it against the TPM limit up front; a truncated answer doubles it
+_COMPLETION_MARGIN = 1.5
+_MIN_COMPLETION_TOKENS = 256
+_MAX_COMPLETION_TOKENS = 16384
+
+# 400s caused by the texts sent, which a smaller request can get past
+_CONTENT_ERROR_CODES = {"content_filter", "content_policy_violation", "context_length_exceeded"}
+_CONTENT_ERROR_PHRASES = ("content management policy", "content filter", "maximum context length")
+
+# Called as on_item(index, translation) as soon as one text is translated
+ItemCallback = Callable[[int, str], None]
+
 
 class Translator:
     """Japanese to English translation using GPT-4o text API."""
 
-    def __init__(self):
-        """Initialize OpenAI client."""
+    def __init__(
+        self,
+        client=None,
+        use_memory: bool = TRANSLATION_MEMORY_ENABLED,
+        glossary: Optional[Glossary] = None,
+        token_budget: int = TRANSLATION_TOKEN_BUDGET,
+        concurrency: int = TRANSLATION_CONCURRENCY,
+        rate_limiter: Optional[RateLimiter] = None,
+        streaming: bool = TRANSLATION_STREAMING,
+    ):
+        """
+        Initialize OpenAI client.
+
+        Parameters
+        ----------
+        client : openai.OpenAI, optional
+            Pre-built client (or a local stand-in with the same
+            chat.completions.create method).
+        use_memory : bool
+            Serve repeated lines from the persistent translation memory.
+        glossary : Glossary, optional
+            Fixed translations answered without an API call; defaults to
+            the one loaded from GLOSSARY_FILES.
+        token_budget : int
+            Estimated tokens (source + expected translation) per API
+            request; larger batches are split.
+        concurrency : int
+            Requests kept in flight at once when a batch is split.
+        rate_limiter : RateLimiter, optional
+            Shared RPM/TPM limiter; defaults to one built from
+            TRANSLATION_RPM / TRANSLATION_TPM.
+        streaming : bool
+            Stream completions when the caller passes ``on_item``, so each
+            item is delivered as soon as its JSON object is complete.
+        """
+        self.memory = get_translation_memory(MODEL, PROMPT_VERSION) if use_memory else None
+        self.glossary = glossary if glossary is not None else get_glossary()
+        self._token_budget = int(token_budget)
+        self.concurrency = max(1, int(concurrency))
+        self.streaming = streaming
+        self._pool = ThreadPoolExecutor(
+            max_workers=self.concurrency, thread_name_prefix="translate"
+        )
+        self._limiter = rate_limiter or RateLimiter(TRANSLATION_RPM, TRANSLATION_TPM)
+        self._system_tokens = estimate_tokens(_SYSTEM_PROMPT)
+        self._count_lock = threading.Lock()
+        self.request_count = 0
+        self.usage = {"prompt_tokens": 0, "completion_tokens": 0}
+        self._bisection_levels: Dict[int, List[int]] = {}
+
+        if client is not None:
+            self._client = client
+            return
+
         if not OPENAI_API_KEY or OPENAI_API_KEY == "your-openai-api-key-here":
             raise ValueError("OPENAI_API_KEY is not set. Add it to your .env file.")
 
-        self._client = OpenAI(api_key=OPENAI_API_KEY)
+        # Retries (and 429 back-off) are handled here, with the shared limiter
+        self._client = OpenAI(api_key=OPENAI_API_KEY, max_retries=0)
+
+    def close(self) -> None:
+        """Shut down the request pool (waits for requests in flight)."""
+        self._pool.shutdown(wait=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
 
     def translate_batch(
         self,
         japanese_texts: List[str],
-        label: str = ""
+        label: str = "",
+        on_item: Optional[ItemCallback] = None,
     ) -> List[str]:
         """
-        Translate multiple Japanese texts to English in a single API call.
+        Translate multiple Japanese texts to English.
+
+        Texts in the glossary or the translation memory are answered
+        locally and only the rest are sent; successful new translations
+        are stored in the memory.
+        The rest go out in as few API calls as TRANSLATION_TOKEN_BUDGET
+        allows, up to TRANSLATION_CONCURRENCY of them at once.
 
         Parameters
         ----------
@@ -44,6 +197,11 @@ class Translator:
             List of Japanese text strings to translate.
         label : str, optional
             Human-readable label for logging.
+        on_item : callable, optional
+            Called as ``on_item(index, translation)`` for each text as soon
+            as it is translated (possibly from a worker thread), before
+            this method returns. With streaming enabled, items arrive while
+            the response is still being generated.
 
         Returns
         -------
@@ -53,85 +211,374 @@ class Translator:
         if not japanese_texts:
             return []
 
-        log.info(f"  [{label}] Translating {len(japanese_texts)} text(s)...")
+        if self.glossary is None:
+            return self._translate_remembered(japanese_texts, label, on_item)
+
+        translations = [self.glossary.lookup(text) or "" for text in japanese_texts]
+        remaining = [i for i, translation in enumerate(translations) if not translation]
+        if len(remaining) < len(japanese_texts):
+            log.info(
+                f"  [{label}] Glossary: {len(japanese_texts) - len(remaining)}/"
+                f"{len(japanese_texts)} text(s) served locally"
+            )
+            if on_item:
+                for index, translation in enumerate(translations):
+                    if translation:
+                        on_item(index, translation)
+        if remaining:
+            translated = self._translate_remembered(
+                [japanese_texts[i] for i in remaining], label, _remap(on_item, remaining)
+            )
+            for index, translation in zip(remaining, translated):
+                translations[index] = translation
+        return translations
+
+    def _translate_remembered(
+        self,
+        japanese_texts: List[str],
+        label: str,
+        on_item: Optional[ItemCallback] = None,
+    ) -> List[str]:
+        """Answer from the translation memory where possible, translate and store the rest."""
+        if self.memory is None:
+            return self._translate_budgeted(japanese_texts, label, on_item)
+
+        keys = [normalize_japanese(text) for text in japanese_texts]
+        known = self.memory.lookup_many(keys)
+        # The model gets the first original spelling of each key, not the key
+        originals: Dict[str, str] = {}
+        for key, text in zip(keys, japanese_texts):
+            originals.setdefault(key, text)
+
+        # Each distinct missing line is sent once, in first-seen order
+        missing = list(dict.fromkeys(key for key in keys if key not in known))
+        similar = self.memory.lookup_similar(missing)
+        if similar:
+            known.update(similar)
+            missing = [key for key in missing if key not in similar]
+        if known:
+            served = sum(1 for key in keys if key in known)
+            fuzzy = sum(1 for key in keys if key in similar)
+            log.info(
+                f"  [{label}] Translation memory: {served}/{len(keys)} text(s) served locally"
+                + (f" ({fuzzy} by similarity)" if fuzzy else "")
+            )
+            if on_item:
+                for index, key in enumerate(keys):
+                    if key in known:
+                        on_item(index, known[key])
+        if missing:
+            key_on_item = None
+            if on_item:
+                # A missing key stands for every text that normalizes to it
+                positions: Dict[str, List[int]] = {}
+                for index, key in enumerate(keys):
+                    positions.setdefault(key, []).append(index)
 
-        # Format texts with numbering for batch translation
-        numbered_texts = "\n".join(
-            f"{i+1}. {text}" for i, text in enumerate(japanese_texts)
+                def key_on_item(missing_index: int, translation: str) -> None:
+                    for index in positions[missing[missing_index]]:
+                        on_item(index, translation)
+
+            translated = self._translate_budgeted(
+                [originals[key] for key in missing], label, key_on_item
+            )
+            self.memory.store_many(zip(missing, translated))
+            known.update((key, text) for key, text in zip(missing, translated) if text)
+
+        return [known.get(key, "") for key in keys]
+
+    def _translate_budgeted(
+        self,
+        japanese_texts: List[str],
+        label: str,
+        on_item: Optional[ItemCallback] = None,
+    ) -> List[str]:
+        """Split ``japanese_texts`` by token budget and translate the parts concurrently."""
+        groups = split_by_token_budget(japanese_texts, self._token_budget)
+        if len(groups) == 1:
+            return self._translate_bisecting(japanese_texts, label, on_item)
+
+        parts = [
+            (
+                [japanese_texts[i] for i in group],
+                f"{label} part {number}/{len(groups)}",
+                _remap(on_item, group),
+            )
+            for number, group in enumerate(groups, start=1)
+        ]
+        if self.concurrency == 1:
+            results = [self._translate_bisecting(*part) for part in parts]
+        else:
+            futures = [self._pool.submit(self._translate_bisecting, *part) for part in parts]
+            results = [future.result() for future in futures]
+
+        return [translation for part in results for translation in part]
+
+    def _translate_bisecting(
+        self,
+        japanese_texts: List[str],
+        label: str,
+        on_item: Optional[ItemCallback] = None,
+    ) -> List[str]:
+        """
+        Translate ``japanese_texts``, bisecting whatever still fails.
+
+        After the full request (with its retries) the untranslated items are
+        split in half and each half is sent once, recursing into the items a
+        half still misses down to single items, so one string the model
+        chokes on cannot blank the rest of its batch. Bisection only follows
+        an answer with missing or empty ids, or a 400 objecting to the texts
+        themselves (content filter, context length): a request that ended in
+        any other error (network, 5xx, a 400 rejecting the request) is not
+        split, and splitting stops at the first half that errors.
+        """
+        translations, answered = self._translate_api(japanese_texts, label, on_item=on_item)
+        failed = [i for i, text in enumerate(translations) if not text]
+        if not failed or len(japanese_texts) == 1:
+            return translations
+        if not answered:
+            log.warning(f"  [{label}] Request failed without an answer; not bisecting")
+            return translations
+
+        levels: Dict[int, List[int]] = {}
+        self._bisect(japanese_texts, failed, translations, label, 1, levels, on_item)
+
+        unresolved = sum(1 for text in translations if not text)
+        summary = "; ".join(
+            f"level {level}: {requests} request(s), {recovered}/{items} recovered"
+            for level, (requests, items, recovered) in sorted(levels.items())
         )
+        log.info(f"  [{label}] Bisection: {summary}; {unresolved} left untranslated")
+        with self._count_lock:
+            for level, counts in levels.items():
+                totals = self._bisection_levels.setdefault(level, [0, 0, 0])
+                for slot, value in enumerate(counts):
+                    totals[slot] += value
+        return translations
 
-        system_prompt = """You are an expert Japanese to English translator specializing in manga and comic translation.
+    def _bisect(
+        self,
+        japanese_texts: List[str],
+        indices: List[int],
+        translations: List[str],
+        label: str,
+        level: int,
+        levels: Dict[int, List[int]],
+        on_item: Optional[ItemCallback] = None,
+    ) -> bool:
+        """
+        Send each half of ``indices`` once, filling ``translations`` in place.
+        Returns False as soon as a request ends in an error instead of an
+        answer, which stops the whole bisection.
+        """
+        middle = len(indices) // 2
+        halves = [indices] if len(indices) == 1 else [indices[:middle], indices[middle:]]
+        for half in halves:
+            part, answered = self._translate_api(
+                [japanese_texts[i] for i in half], f"{label} L{level}",
+                max_attempts=1, on_item=_remap(on_item, half),
+            )
+            counts = levels.setdefault(level, [0, 0, 0])  # requests, items, recovered
+            counts[0] += 1
+            counts[1] += len(half)
+            if not answered:
+                log.warning(f"  [{label} L{level}] Request failed without an answer; bisection stopped")
+                return False
+            still_failed = []
+            for index, text in zip(half, part):
+                if text:
+                    translations[index] = text
+                    counts[2] += 1
+                else:
+                    still_failed.append(index)
+            if still_failed and len(half) > 1:
+                if not self._bisect(
+                    japanese_texts, still_failed, translations, label, level + 1, levels, on_item
+                ):
+                    return False
+        return True
 
-Your task:
-- Translate each Japanese text to natural, fluent English
-- Maintain the original tone and style  
-- Keep translations concise for speech bubbles
-- Preserve any emphasis or emotion in the text
+    def bisection_stats(self) -> Dict:
+        """Per-level bisection counters for the processing report."""
+        with self._count_lock:
+            return {
+                str(level): {"requests": requests, "items": items, "recovered": recovered}
+                for level, (requests, items, recovered) in sorted(self._bisection_levels.items())
+            }
 
-CRITICAL OUTPUT FORMAT:
-Return ONLY a numbered list of translations, one per line.
-EACH LINE MUST BE: {number}. {translation}
-DO NOT include any other text, explanations, or formatting.
-DO NOT use markdown code blocks.
+    def usage_snapshot(self) -> Dict[str, int]:
+        """Prompt/completion tokens used so far (API-reported where available)."""
+        with self._count_lock:
+            return dict(self.usage)
 
-Example if 3 texts:
-1. Hello
-2. Thank you
-3. How are you?"""
+    def _translate_api(
+        self,
+        japanese_texts: List[str],
+        label: str,
+        max_attempts: int = MAX_RETRIES,
+        on_item: Optional[ItemCallback] = None,
+    ) -> Tuple[List[str], bool]:
+        """
+        Translate ``japanese_texts`` with schema-constrained chat completions.
 
-        user_prompt = f"""Translate these Japanese texts to English:
+        Items are sent with ids and answered as {"translations": [{"id", "text"}]}.
+        Ids that come back missing or empty are re-requested on their own,
+        up to ``max_attempts`` attempts; whatever is still missing is left empty.
+        An answer cut off at max_tokens (finish_reason "length") is parsed
+        for the items it completed and the next attempt gets twice the limit.
+        Each translation is passed to ``on_item`` once, as soon as it is
+        known (mid-stream when streaming).
 
-{numbered_texts}"""
+        Returns the translations and whether the last attempt got an answer
+        (False when it ended in an exception, such as a network error, a
+        5xx or a 429; a 400 rejecting the content counts as an answer).
+        A 400 rejecting the request itself is not retried.
+        """
+        log.info(f"  [{label}] Translating {len(japanese_texts)} text(s)...")
 
-        for attempt in range(1, MAX_RETRIES + 1):
-            try:
-                response = self._client.chat.completions.create(
-                    model=MODEL,
-                    messages=[
-                        {"role": "system", "content": system_prompt},
-                        {"role": "user", "content": user_prompt}
-                    ],
-                    temperature=0.3,  # Slight creativity for natural translation
-                    max_tokens=2000
-                )
+        results: Dict[int, str] = {}
+        pending = list(range(1, len(japanese_texts) + 1))
+        limit_scale = 1.0
+        answered = False
+        stream = self.streaming and on_item is not None
 
-                # Parse response
-                content = response.choices[0].message.content.strip()
-                log.debug(f"  [{label}] Raw response preview: {content[:200]}...")
-                translations = self._parse_translations(content, len(japanese_texts))
+        def accept(item_id: int, text: str) -> None:
+            if item_id not in results:
+                results[item_id] = text
+                if on_item:
+                    on_item(item_id - 1, text)
+
+        for attempt in range(1, max_attempts + 1):
+            items = [{"id": item_id, "text": japanese_texts[item_id - 1]} for item_id in pending]
+            max_tokens = completion_token_limit([item["text"] for item in items], limit_scale)
+            request = build_translation_request(items, max_tokens)
+            prompt_tokens = self._system_tokens + estimate_tokens(request["messages"][1]["content"])
+            request_tokens = prompt_tokens + max_tokens
 
-                if len(translations) == len(japanese_texts):
-                    log.info(f"  [{label}] Translation successful ({len(translations)} texts)")
-                    return translations
+            answered = False
+            try:
+                waited = self._limiter.acquire(request_tokens)
+                if waited > 1:
+                    log.debug(f"  [{label}] Rate limiter held request for {waited:.1f}s")
+                with self._count_lock:
+                    self.request_count += 1
+                if stream:
+                    content, finish_reason, usage = self._stream_completion(
+                        request, set(pending), accept
+                    )
                 else:
+                    response = self._client.chat.completions.create(**request)
+                    content = (response.choices[0].message.content or "").strip()
+                    finish_reason = getattr(response.choices[0], "finish_reason", None)
+                    usage = getattr(response, "usage", None)
+
+                answered = True
+                log.debug(f"  [{label}] Raw response preview: {content[:200]}...")
+                self._record_usage(usage, prompt_tokens, content)
+                truncated = finish_reason == "length"
+                if truncated:
                     log.warning(
-                        f"  [{label}] Translation count mismatch "
-                        f"(expected {len(japanese_texts)}, got {len(translations)}) on attempt {attempt}/{MAX_RETRIES}"
+                        f"  [{label}] Answer truncated at max_tokens={max_tokens} "
+                        f"(attempt {attempt}/{max_attempts})"
                     )
-                    if attempt < MAX_RETRIES:
-                        time.sleep(RETRY_DELAY_SECONDS)
-                        continue
-                    # On final attempt, return what we have (padded with empty strings)
-                    log.warning(f"  [{label}] Returning {len(translations)} translations (padded with empty strings)")
-                    while len(translations) < len(japanese_texts):
-                        translations.append("")
-                    return translations
+                    limit_scale *= 2
+                for item_id, text in parse_translation_items(content, pending, truncated).items():
+                    accept(item_id, text)
+                pending = [item_id for item_id in pending if item_id not in results]
+
+                if not pending:
+                    log.info(f"  [{label}] Translation successful ({len(results)} texts)")
+                    break
+                log.warning(
+                    f"  [{label}] {len(pending)}/{len(items)} id(s) missing or empty "
+                    f"on attempt {attempt}/{max_attempts}"
+                )
 
             except Exception as exc:
+                retry_after = _retry_after_seconds(exc)
+                if retry_after is not None:
+                    # Rate limited: hold every worker, not just this one
+                    log.warning(
+                        f"  [{label}] Rate limited (attempt {attempt}), "
+                        f"retrying after {retry_after:.1f}s"
+                    )
+                    self._limiter.pause(retry_after)
+                    continue
                 log.error(f"  [{label}] Translation error (attempt {attempt}): {exc}")
-                if attempt < MAX_RETRIES:
-                    time.sleep(RETRY_DELAY_SECONDS)
-                else:
-                    # Return empty translations on final failure
-                    log.error(f"  [{label}] All retries exhausted, returning empty translations")
-                    return [""] * len(japanese_texts)
+                # A 400 refusing this content (content filter, context length) is not
+                # an outage: bisecting can still isolate the item it objects to
+                answered = _rejects_content(exc)
+                if getattr(exc, "status_code", None) == 400 and not answered:
+                    # The request itself is invalid and would fail the same way again
+                    break
+
+            if attempt < max_attempts:
+                time.sleep(self._backoff_seconds(attempt))
+
+        if pending:
+            log.warning(
+                f"  [{label}] {len(pending)} text(s) left untranslated after {max_attempts} attempt(s)"
+            )
+        return [results.get(item_id, "") for item_id in range(1, len(japanese_texts) + 1)], answered
+
+    def _stream_completion(
+        self,
+        request: Dict,
+        expected_ids: set,
+        accept: Callable[[int, str], None],
+    ) -> Tuple[str, Optional[str], object]:
+        """
+        Send ``request`` as a streamed completion, passing each item to
+        ``accept`` as soon as its JSON object closes.
+
+        Returns
+        -------
+        tuple
+            (full content, finish_reason, usage or None)
+        """
+        parser = _ItemStreamParser()
+        parts: List[str] = []
+        finish_reason = None
+        usage = None
+        stream = self._client.chat.completions.create(
+            **request, stream=True, stream_options={"include_usage": True}
+        )
+        for chunk in stream:
+            if getattr(chunk, "usage", None):
+                usage = chunk.usage
+            if not chunk.choices:
+                continue
+            choice = chunk.choices[0]
+            delta = getattr(choice.delta, "content", None)
+            if delta:
+                parts.append(delta)
+                for item_id, text in parser.feed(delta):
+                    if item_id in expected_ids:
+                        accept(item_id, text)
+            if choice.finish_reason:
+                finish_reason = choice.finish_reason
+        return "".join(parts).strip(), finish_reason, usage
 
-        return [""] * len(japanese_texts)
+    def _record_usage(self, usage, estimated_prompt_tokens: int, content: str) -> None:
+        """Add a response's token usage (estimated if the response carries none)."""
+        prompt_tokens = getattr(usage, "prompt_tokens", None)
+        completion_tokens = getattr(usage, "completion_tokens", None)
+        if prompt_tokens is None or completion_tokens is None:
+            prompt_tokens, completion_tokens = estimated_prompt_tokens, estimate_tokens(content)
+        with self._count_lock:
+            self.usage["prompt_tokens"] += prompt_tokens
+            self.usage["completion_tokens"] += completion_tokens
 
-    def _parse_translations(self, content: str, expected_count: int) -> List[str]:
+    @staticmethod
+    def _backoff_seconds(attempt: int) -> float:
+        """Exponential back-off from RETRY_DELAY_SECONDS for non-429 failures."""
+        return RETRY_DELAY_SECONDS * (2 ** (attempt - 1))
+
+    @staticmethod
+    def _parse_translations(content: str, expected_count: int) -> List[str]:
         """
-        Parse numbered translations from GPT response.
-        Handles multiple formats: numbered, bullet points, markdown code blocks, JSON.
+        Parse numbered translations from a free-form GPT response.
+        Fallback for answers that ignore the structured format. Handles multiple formats: numbered, bullet points, markdown code blocks, JSON.
 
         Parameters
         ----------
@@ -145,8 +592,6 @@ Example if 3 texts:
         list[str]
             Parsed translations.
         """
-        import json
-        
         # Remove markdown code blocks if present
         content = content.strip()
         original_content = content
@@ -226,3 +671,204 @@ Example if 3 texts:
             log.debug(f"Parser got {len(translations)} translations vs {expected_count} expected")
 
         return translations[:expected_count]  # Return only expected count
+
+
+def completion_token_limit(texts: List[str], scale: float = 1.0) -> int:
+    """
+    max_tokens for a request translating ``texts``: the estimated answer
+    with a safety margin, times ``scale``, within the model's output limit.
+    """
+    limit = max(_MIN_COMPLETION_TOKENS, estimate_completion_tokens(texts) * _COMPLETION_MARGIN)
+    return int(min(_MAX_COMPLETION_TOKENS, math.ceil(limit * scale)))
+
+
+def build_translation_request(items: List[Dict], max_tokens: Optional[int] = None) -> Dict:
+    """
+    Chat completion arguments for one translation request.
+
+    Parameters
+    ----------
+    items : list[dict]
+        ``{"id": int, "text": str}`` items to translate.
+    max_tokens : int, optional
+        Completion limit; defaults to completion_token_limit() of the items.
+
+    Returns
+    -------
+    dict
+        Keyword arguments for ``chat.completions.create`` (also the body
+        of a Batch API request line).
+    """
+    user_prompt = (
+        "Translate these Japanese texts to English:\n\n"
+        + json.dumps(items, ensure_ascii=False)
+    )
+    return {
+        "model": MODEL,
+        "messages": [
+            {"role": "system", "content": _SYSTEM_PROMPT},
+            {"role": "user", "content": user_prompt},
+        ],
+        "temperature": 0.3,  # Slight creativity for natural translation
+        "max_tokens": max_tokens or completion_token_limit([item["text"] for item in items]),
+        "response_format": _RESPONSE_FORMAT,
+    }
+
+
+def parse_translation_items(
+    content: str,
+    expected_ids: List[int],
+    truncated: bool = False,
+) -> Dict[int, str]:
+    """
+    Map item id → translation from a structured response.
+
+    Entries with an unknown id or an empty text are dropped so they are
+    re-requested. Content that is not the expected JSON object (a model
+    ignoring the schema) goes through the legacy ``_parse_translations``
+    and is accepted only if it yields exactly one line per id. A
+    ``truncated`` answer (finish_reason "length") is cut off mid-JSON, so
+    its completed items are read with the streaming item parser instead.
+    """
+    if truncated:
+        wanted = set(expected_ids)
+        found: Dict[int, str] = {}
+        for item_id, text in _ItemStreamParser().feed(content):
+            if item_id in wanted:
+                found.setdefault(item_id, text)
+        return found
+
+    try:
+        parsed = json.loads(content)
+    except (json.JSONDecodeError, ValueError):
+        parsed = None
+
+    if isinstance(parsed, dict) and isinstance(parsed.get("translations"), list):
+        wanted = set(expected_ids)
+        found: Dict[int, str] = {}
+        for entry in parsed["translations"]:
+            if not isinstance(entry, dict):
+                continue
+            item_id, text = entry.get("id"), entry.get("text")
+            if item_id in wanted and isinstance(text, str) and text.strip():
+                found.setdefault(item_id, text.strip())
+        return found
+
+    translations = Translator._parse_translations(content, len(expected_ids))
+    if len(translations) != len(expected_ids):
+        return {}
+    return {
+        item_id: text
+        for item_id, text in zip(expected_ids, translations)
+        if text
+    }
+
+
+class _ItemStreamParser:
+    """
+    Incremental parser for a streamed {"translations": [{"id", "text"}, ...]}
+    answer: feed() returns the items whose JSON object closed in the new
+    text. Only the characters of the item being read are buffered.
+    """
+
+    # Depth of an item object: outer object → translations array → item
+    _ITEM_DEPTH = 3
+
+    def __init__(self):
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+        self._item: List[str] = []
+
+    def feed(self, delta: str) -> List[Tuple[int, str]]:
+        items: List[Tuple[int, str]] = []
+        for char in delta:
+            if self._depth >= self._ITEM_DEPTH:
+                self._item.append(char)
+
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == "\\":
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+                continue
+
+            if char == '"':
+                self._in_string = True
+            elif char in "{[":
+                self._depth += 1
+                if self._depth == self._ITEM_DEPTH:
+                    self._item = [char]
+            elif char in "}]":
+                if self._depth == self._ITEM_DEPTH and self._item:
+                    item = _parse_stream_item("".join(self._item))
+                    if item:
+                        items.append(item)
+                    self._item = []
+                self._depth -= 1
+        return items
+
+
+def _parse_stream_item(raw: str) -> Optional[Tuple[int, str]]:
+    """(id, text) of one streamed item object, or None if it is not valid."""
+    try:
+        entry = json.loads(raw)
+    except (json.JSONDecodeError, ValueError):
+        return None
+    if not isinstance(entry, dict):
+        return None
+    item_id, text = entry.get("id"), entry.get("text")
+    if isinstance(item_id, int) and isinstance(text, str) and text.strip():
+        return item_id, text.strip()
+    return None
+
+
+def _remap(on_item: Optional[ItemCallback], indices: Sequence[int]) -> Optional[ItemCallback]:
+    """Wrap ``on_item`` so a sub-list's index i reports as ``indices[i]``."""
+    if on_item is None:
+        return None
+    return lambda index, translation: on_item(indices[index], translation)
+
+
+def _rejects_content(exc: Exception) -> bool:
+    """
+    Whether ``exc`` is a 400 objecting to the texts sent (content filter,
+    context length) rather than to the request itself (an unsupported
+    parameter or response_format), so a smaller slice may still succeed.
+    """
+    if getattr(exc, "status_code", None) != 400:
+        return False
+    if getattr(exc, "code", None) in _CONTENT_ERROR_CODES:
+        return True
+    message = str(getattr(exc, "message", None) or exc).lower()
+    return any(phrase in message for phrase in _CONTENT_ERROR_PHRASES)
+
+
+def _retry_after_seconds(exc: Exception) -> Optional[float]:
+    """
+    Wait requested by a 429 response (Retry-After / retry-after-ms headers),
+    RETRY_DELAY_SECONDS if the 429 carries no header, or None for other errors.
+    """
+    if getattr(exc, "status_code", None) != 429:
+        return None
+
+    response = getattr(exc, "response", None)
+    headers = getattr(response, "headers", None) or {}
+    retry_ms = headers.get("retry-after-ms")
+    if retry_ms:
+        try:
+            return max(0.0, float(retry_ms) / 1000.0)
+        except ValueError:
+            pass
+    retry_after = headers.get("retry-after")
+    if retry_after:
+        try:
+            return max(0.0, float(retry_after))
+        except ValueError:
+            try:
+                return max(0.0, parsedate_to_datetime(retry_after).timestamp() - time.time())
+            except (TypeError, ValueError):
+                pass
+    return float(RETRY_DELAY_SECONDS)
@@ -0,0 +1,133 @@
+"""
+benchmark_vision_upload.py
+─────────────────────────────────────────────
+Compares Vision upload encodings (format / quality / max long edge)
+against the original full-resolution PNG path.
+
+Usage:
+    python benchmark_vision_upload.py --input input/volume.pdf --pages 10
+    python benchmark_vision_upload.py --variants PNG JPEG:85 WEBP:80 JPEG:85:2048 --detect
+
+Variants are FORMAT[:QUALITY[:MAX_EDGE]]. The first variant is the baseline.
+
+Output:
+    Per variant: total encode time, payload bytes, and (with --detect,
+    which calls the real Vision API) detection counts and box agreement
+    with the baseline.
+"""
+
+import argparse
+import time
+from pathlib import Path
+
+from app.pdf_converter import iter_pdf_pages
+from app.text_detector import TextDetector
+from config.settings import INPUT_FOLDER
+
+
+def pick_pdf(path: Path) -> Path:
+    if path.is_file():
+        return path
+    pdfs = sorted(path.glob("*.pdf"))
+    if not pdfs:
+        raise SystemExit(f"❌ No PDF files found in: {path}")
+    return pdfs[0]
+
+
+def parse_variant(spec: str) -> dict:
+    parts = spec.split(":")
+    return {
+        "name": spec,
+        "upload_format": parts[0].upper(),
+        "upload_quality": int(parts[1]) if len(parts) > 1 and parts[1] else 90,
+        "upload_max_edge": int(parts[2]) if len(parts) > 2 and parts[2] else 0,
+    }
+
+
+def iou(a: dict, b: dict) -> float:
+    ax2, ay2 = a["x"] + a["width"], a["y"] + a["height"]
+    bx2, by2 = b["x"] + b["width"], b["y"] + b["height"]
+    ix = max(0.0, min(ax2, bx2) - max(a["x"], b["x"]))
+    iy = max(0.0, min(ay2, by2) - max(a["y"], b["y"]))
+    inter = ix * iy
+    union = a["width"] * a["height"] + b["width"] * b["height"] - inter
+    return inter / union if union > 0 else 0.0
+
+
+def box_agreement(baseline: list, candidate: list) -> float:
+    """Mean best-IoU of each baseline box against the candidate boxes."""
+    scores = []
+    for page_base, page_cand in zip(baseline, candidate):
+        for det in page_base:
+            best = max(
+                (iou(det["bounding_box"], c["bounding_box"]) for c in page_cand),
+                default=0.0,
+            )
+            scores.append(best)
+    return sum(scores) / len(scores) if scores else 1.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark Vision upload encodings")
+    parser.add_argument("--input", type=Path, default=INPUT_FOLDER,
+                        help="PDF file or folder (first PDF is used)")
+    parser.add_argument("--pages", type=int, default=10,
+                        help="Number of pages to sample")
+    parser.add_argument("--variants", nargs="+",
+                        default=["PNG", "JPEG:90", "JPEG:80:2400", "WEBP:80"],
+                        help="FORMAT[:QUALITY[:MAX_EDGE]] (first is the baseline)")
+    parser.add_argument("--detect", action="store_true",
+                        help="Also run Vision detection (billed) and compare results")
+    args = parser.parse_args()
+
+    pdf_path = pick_pdf(args.input)
+    images = []
+    for page_number, image in iter_pdf_pages(pdf_path):
+        images.append(image)
+        if len(images) >= args.pages:
+            break
+
+    print("=" * 78)
+    print(f"Vision upload benchmark: {pdf_path.name} ({len(images)} page(s))")
+    print("=" * 78)
+    print(f"  {'variant':<16}{'encode s':>10}{'MB':>10}{'vs base':>9}"
+          f"{'boxes':>8}{'box IoU':>9}")
+
+    baseline_bytes = None
+    baseline_detections = None
+
+    for spec in args.variants:
+        variant = parse_variant(spec)
+        detector = TextDetector(
+            # Encode-only runs never call Vision, so no real client is needed
+            client=None if args.detect else object(),
+            upload_format=variant["upload_format"],
+            upload_quality=variant["upload_quality"],
+            upload_max_edge=variant["upload_max_edge"],
+            cache_mode="bypass",
+        )
+
+        start = time.perf_counter()
+        total_bytes = sum(len(detector._encode_image(image)[0]) for image in images)
+        encode_seconds = time.perf_counter() - start
+
+        if baseline_bytes is None:
+            baseline_bytes = total_bytes
+
+        boxes = agreement = "-"
+        if args.detect:
+            detections = detector.detect_text_batch(images)
+            boxes = str(sum(len(page) for page in detections))
+            if baseline_detections is None:
+                baseline_detections = detections
+            agreement = f"{box_agreement(baseline_detections, detections):.3f}"
+
+        print(f"  {variant['name']:<16}{encode_seconds:>10.2f}"
+              f"{total_bytes / 1e6:>10.2f}{total_bytes / baseline_bytes:>8.0%} "
+              f"{boxes:>8}{agreement:>9}")
+
+    print("=" * 78)
+
+
+if __name__ == "__main__":
+    main()
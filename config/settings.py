@@ -13,8 +13,23 @@ import os
 _ENV_PATH = Path(__file__).resolve().parent.parent / ".env"
 load_dotenv(_ENV_PATH)
 
+# ── Text detection backend ───────────────────
+DETECTION_BACKEND:  str = os.environ.get("DETECTION_BACKEND", "vision")  # vision, tesseract or openai
+TESSERACT_LANG:     str = os.environ.get("TESSERACT_LANG",    "jpn+jpn_vert")
+TESSERACT_PSM:      int = int(os.environ.get("TESSERACT_PSM",     "11"))  # 11 = sparse text
+TESSERACT_WORKERS:  int = int(os.environ.get("TESSERACT_WORKERS", "2"))
+DETECTION_TILE_MAX_HEIGHT: int = int(os.environ.get("DETECTION_TILE_MAX_HEIGHT", "4096"))  # 0 = never tile
+DETECTION_TILE_OVERLAP:    int = int(os.environ.get("DETECTION_TILE_OVERLAP",    "384"))
+
 # ── Google Cloud Vision (OCR) ───────────────
 GOOGLE_CLOUD_API_KEY: str = os.environ.get("GOOGLE_CLOUD_API_KEY", "")
+VISION_BATCH_SIZE:    int = int(os.environ.get("VISION_BATCH_SIZE",   "16"))  # API max: 16 images/request
+VISION_BATCH_MAX_MB:  int = int(os.environ.get("VISION_BATCH_MAX_MB", "8"))
+VISION_CONCURRENCY:   int = int(os.environ.get("VISION_CONCURRENCY",  "4"))
+DETECTION_WINDOW_MB:  int = int(os.environ.get("DETECTION_WINDOW_MB", "64"))  # rendered pages held per detection window
+VISION_UPLOAD_FORMAT: str = os.environ.get("VISION_UPLOAD_FORMAT", "PNG")  # PNG, JPEG or WEBP
+VISION_UPLOAD_QUALITY: int = int(os.environ.get("VISION_UPLOAD_QUALITY", "90"))
+VISION_UPLOAD_MAX_EDGE: int = int(os.environ.get("VISION_UPLOAD_MAX_EDGE", "0"))  # 0 = no downscale
 
 # ── OpenAI (Translation) ────────────────────
 OPENAI_API_KEY: str = os.environ.get("OPENAI_API_KEY", "")
@@ -22,6 +37,28 @@ OPENAI_API_KEY: str = os.environ.get("OPENAI_API_KEY", "")
 # ── Stage 1: OCR + Translation ───────────────
 MODEL:                str = os.environ.get("MODEL",                "gpt-4o")
 DPI:                  int = int(os.environ.get("DPI",              "200"))
+PDF_PAGE_CHUNK_SIZE:  int = int(os.environ.get("PDF_PAGE_CHUNK_SIZE", "4"))
+PDF_RENDER_WORKERS:   int = int(os.environ.get("PDF_RENDER_WORKERS",  "1"))
+ADAPTIVE_DPI:        bool = os.environ.get("ADAPTIVE_DPI", "false").lower() == "true"
+PREVIEW_DPI:          int = int(os.environ.get("PREVIEW_DPI",         "100"))
+EXTRACT_EMBEDDED_IMAGES: bool = os.environ.get("EXTRACT_EMBEDDED_IMAGES", "true").lower() == "true"
+COLOR_MODE:           str = os.environ.get("COLOR_MODE",          "RGB")  # RGB, L or auto
+GROUP_REGIONS:       bool = os.environ.get("GROUP_REGIONS", "true").lower() == "true"
+GROUP_GAP_FACTOR:    float = float(os.environ.get("GROUP_GAP_FACTOR", "0.6"))
+PAGE_FILTER_ENABLED: bool = os.environ.get("PAGE_FILTER_ENABLED", "false").lower() == "true"
+PAGE_FILTER_MIN_CANDIDATES:     int = int(os.environ.get("PAGE_FILTER_MIN_CANDIDATES", "4"))
+PAGE_FILTER_MIN_EDGE_DENSITY: float = float(os.environ.get("PAGE_FILTER_MIN_EDGE_DENSITY", "0.0002"))
+TRANSLATION_TOKEN_BUDGET:      int = int(os.environ.get("TRANSLATION_TOKEN_BUDGET", "2400"))
+TRANSLATION_MAX_PENDING_PAGES: int = int(os.environ.get("TRANSLATION_MAX_PENDING_PAGES", "16"))
+TRANSLATION_MAX_PENDING_MB:  float = float(os.environ.get("TRANSLATION_MAX_PENDING_MB", "128"))
+TRANSLATION_CONCURRENCY:       int = int(os.environ.get("TRANSLATION_CONCURRENCY", "4"))
+TRANSLATION_RPM:               int = int(os.environ.get("TRANSLATION_RPM", "500"))    # 0 = unlimited
+TRANSLATION_TPM:               int = int(os.environ.get("TRANSLATION_TPM", "30000"))  # 0 = unlimited
+TRANSLATION_MODE:              str = os.environ.get("TRANSLATION_MODE", "sync")  # sync or batch
+TRANSLATION_STREAMING:        bool = os.environ.get("TRANSLATION_STREAMING", "false").lower() == "true"
+BATCH_POLL_SECONDS:            int = int(os.environ.get("BATCH_POLL_SECONDS", "60"))
+TRANSLATION_PRICE_INPUT_PER_1M:  float = float(os.environ.get("TRANSLATION_PRICE_INPUT_PER_1M", "2.50"))   # USD
+TRANSLATION_PRICE_OUTPUT_PER_1M: float = float(os.environ.get("TRANSLATION_PRICE_OUTPUT_PER_1M", "10.00"))  # USD
 MAX_RETRIES:          int = int(os.environ.get("MAX_RETRIES",      "3"))
 RETRY_DELAY_SECONDS:  int = int(os.environ.get("RETRY_DELAY_SECONDS", "2"))
 
@@ -53,6 +90,23 @@ _PROJECT_ROOT = Path(__file__).resolve().parent.parent
 INPUT_FOLDER:  Path = (_PROJECT_ROOT / os.environ.get("INPUT_FOLDER",  "input")).resolve()
 OUTPUT_FOLDER: Path = (_PROJECT_ROOT / os.environ.get("OUTPUT_FOLDER", "output")).resolve()
 LOG_FOLDER:    Path = (_PROJECT_ROOT / os.environ.get("LOG_FOLDER",    "logs")).resolve()
+CACHE_FOLDER:  Path = (_PROJECT_ROOT / os.environ.get("CACHE_FOLDER",  "cache")).resolve()
+
+# ── Caches ───────────────────────────────────
+RASTER_CACHE_ENABLED: bool = os.environ.get("RASTER_CACHE_ENABLED", "false").lower() == "true"
+RASTER_CACHE_MAX_MB:  int  = int(os.environ.get("RASTER_CACHE_MAX_MB", "4096"))
+TRANSLATION_MEMORY_ENABLED: bool = os.environ.get("TRANSLATION_MEMORY_ENABLED", "true").lower() == "true"
+TRANSLATION_FUZZY_THRESHOLD: float = float(os.environ.get("TRANSLATION_FUZZY_THRESHOLD", "0.85"))  # 0 = exact only
+DETECTION_CACHE_MODE:   str = os.environ.get("DETECTION_CACHE_MODE", "use")  # use, bypass or refresh
+DETECTION_CACHE_MAX_MB: int = int(os.environ.get("DETECTION_CACHE_MAX_MB", "256"))
+
+# ── Glossary ─────────────────────────────────
+# Comma-separated .tsv/.json files (relative to the project root); empty = off
+GLOSSARY_FILES: list = [
+    (_PROJECT_ROOT / name.strip()).resolve()
+    for name in os.environ.get("GLOSSARY_FILES", "config/glossary_sfx.tsv").split(",")
+    if name.strip()
+]
 
 # ── Output structure ─────────────────────────
 EXTRACTIONS_FILENAME: str  = "extractions.json"
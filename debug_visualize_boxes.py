@@ -18,7 +18,7 @@ import json
 from pathlib import Path
 from PIL import Image, ImageDraw
 
-from app.pdf_converter import pdf_to_images
+from app.pdf_converter import iter_pdf_pages
 from config.settings import INPUT_FOLDER, OUTPUT_FOLDER
 
 # Debug output folder
@@ -95,12 +95,13 @@ def main():
 
         print(f"📄 Processing: {pdf_name}")
 
-        # Convert PDF to images
-        images = pdf_to_images(pdf_path)
+        pages_by_number = {
+            p.get("page_number"): p for p in file_data.get("pages", [])
+        }
 
-        # Process each page
-        for page_data in file_data.get("pages", []):
-            page_num = page_data.get("page_number")
+        # Stream PDF pages and process each one with extractions
+        for page_num, img in iter_pdf_pages(pdf_path):
+            page_data = pages_by_number.get(page_num) or {}
             extractions = page_data.get("extractions", [])
 
             if not extractions:
@@ -108,8 +109,8 @@ def main():
 
             print(f"   Page {page_num}: {len(extractions)} extraction(s)")
 
-            # Get the image for this page
-            img = images[page_num - 1].copy()
+            # Annotations are colored, so work in RGB even for grayscale pages
+            img = img.convert('RGB')
             img_width, img_height = img.size
 
             # Create a semi-transparent overlay for filled rectangles
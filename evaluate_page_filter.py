@@ -0,0 +1,104 @@
+"""
+evaluate_page_filter.py
+─────────────────────────────────────────────
+Measures the local no-text page filter against a labeled sample: the
+extractions.json of an earlier run, where a page counts as "has text"
+if detection found Japanese on it.
+
+Usage:
+    python evaluate_page_filter.py
+    python evaluate_page_filter.py --extractions output/extractions.json --thresholds 2 4 8
+
+Output:
+    For each candidate threshold, how many detection calls the filter
+    would save and which text pages it would miss (wrongly skip).
+"""
+
+import argparse
+import json
+import time
+from pathlib import Path
+
+from app.page_filter import PageFilter
+from app.pdf_converter import iter_pdf_pages
+from config.settings import (
+    EXTRACTIONS_FILENAME,
+    INPUT_FOLDER,
+    OUTPUT_FOLDER,
+    PAGE_FILTER_MIN_CANDIDATES,
+)
+
+
+def load_labels(extractions_path: Path) -> tuple:
+    """Return ({file: {page_number: has_text}}, detection_dpi) from a previous run."""
+    data = json.loads(extractions_path.read_text(encoding="utf-8"))
+    labels = {}
+    for file_entry in data.get("files", []):
+        pages = {}
+        for page in file_entry.get("pages", []):
+            # Pages the filter skipped in that run have no ground truth
+            if page.get("detection_skipped"):
+                continue
+            pages[page["page_number"]] = bool(page.get("japanese_found"))
+        labels[file_entry.get("file")] = pages
+    metadata = data.get("metadata", {})
+    return labels, metadata.get("detection_dpi") or metadata.get("dpi")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Evaluate the no-text page filter")
+    parser.add_argument("--extractions", type=Path,
+                        default=OUTPUT_FOLDER / EXTRACTIONS_FILENAME,
+                        help="extractions.json from a run with the filter disabled")
+    parser.add_argument("--input", type=Path, default=INPUT_FOLDER,
+                        help="Folder holding the PDFs of that run")
+    parser.add_argument("--thresholds", type=int, nargs="+",
+                        default=sorted({1, 2, PAGE_FILTER_MIN_CANDIDATES, 8, 16}),
+                        help="PAGE_FILTER_MIN_CANDIDATES values to compare")
+    args = parser.parse_args()
+
+    if not args.extractions.exists():
+        raise SystemExit(f"❌ Extractions file not found: {args.extractions}")
+    labels, dpi = load_labels(args.extractions)
+
+    page_filter = PageFilter(min_candidates=0)
+    samples = []  # (file, page_number, has_text, candidates)
+    analysis_seconds = 0.0
+
+    for file_name, page_labels in labels.items():
+        pdf_path = args.input / file_name
+        if not pdf_path.exists():
+            print(f"⚠️  Skipping {file_name}: not found in {args.input}")
+            continue
+        for page_number, image in iter_pdf_pages(pdf_path, dpi=dpi):
+            if page_number not in page_labels:
+                continue
+            start = time.perf_counter()
+            stats = page_filter.analyze(image)
+            analysis_seconds += time.perf_counter() - start
+            samples.append((file_name, page_number, page_labels[page_number], stats["candidates"]))
+
+    if not samples:
+        raise SystemExit("❌ No labeled pages could be matched to input PDFs")
+
+    text_pages = sum(1 for sample in samples if sample[2])
+    print("=" * 70)
+    print(f"Page filter evaluation: {len(samples)} labeled page(s), "
+          f"{text_pages} with text, {dpi} DPI")
+    print(f"  analysis time: {analysis_seconds / len(samples) * 1000:.1f} ms/page")
+    print("=" * 70)
+    print(f"  {'threshold':>9}{'skipped':>9}{'saved':>8}{'misses':>8}")
+
+    for threshold in args.thresholds:
+        skipped = [s for s in samples if s[3] < threshold]
+        misses = [s for s in skipped if s[2]]
+        print(f"  {threshold:>9}{len(skipped):>9}"
+              f"{len(skipped) / len(samples):>8.0%}{len(misses):>8}")
+        for file_name, page_number, _has_text, candidates in misses:
+            print(f"      miss: {file_name} p{page_number} ({candidates} candidate(s))")
+
+    print("=" * 70)
+
+
+if __name__ == "__main__":
+    main()
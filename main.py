@@ -3,17 +3,20 @@ main.py
 ─────────────────────────────────────────────
 Entry point for the unified Japanese OCR & Translation pipeline.
 
-    python main.py [--stage {ocr,replace,all}]
+    python main.py [--stage {ocr,translate,replace,all}] [--translation-mode {sync,batch}]
 
 Stages:
-  ocr      - Extract Japanese text + bounding boxes + translations (OpenAI API)
-  replace  - Replace Japanese text with English in images (uses existing extractions.json)
-  all      - Run full pipeline (default)
+  ocr       - Extract Japanese text + bounding boxes + translations (OpenAI API)
+  translate - Submit or resume a Batch API job for the untranslated lines in extractions.json
+  replace   - Replace Japanese text with English in images (uses existing extractions.json)
+  all       - Run full pipeline (default)
 
 Examples:
     python main.py --stage all        # Full pipeline
     python main.py --stage ocr        # OCR only
     python main.py --stage replace    # Text replacement only (requires existing extractions.json)
+    python main.py --stage ocr --translation-mode batch   # OCR, then translate via the Batch API
+    python main.py --stage translate  # Resume an interrupted batch job
 """
 
 import argparse
@@ -32,21 +35,47 @@ from config.settings import (
     OPENAI_API_KEY,
     MODEL,
     DPI,
+    PDF_RENDER_WORKERS,
+    ADAPTIVE_DPI,
+    PREVIEW_DPI,
+    COLOR_MODE,
+    DETECTION_BACKEND,
+    DETECTION_CACHE_MODE,
+    PAGE_FILTER_ENABLED,
+    PAGE_FILTER_MIN_CANDIDATES,
     ENABLE_TEXT_REPLACEMENT,
+    TRANSLATION_MODE,
 )
 from app.logger import get_logger
-from app.text_detector import TextDetector
+from app.page_filter import PageFilter
+from app.detector_backend import DETECTION_BACKENDS, create_detector
 from app.translator import Translator
+from app.batch_translation import BatchTranslator, DeferredBatcher
+from app.translation_batcher import TranslationBatcher
+from app.token_estimator import usage_entry
 from app.image_replacer import ImageReplacer
 from app.processor import process_pdf_accurate, process_replacement_only
 
 log = get_logger("main")
 
 
-def _validate(stage: str) -> None:
+def _validate(stage: str, translation_mode: str) -> None:
     """Fail fast with clear error messages."""
+    if translation_mode not in ("sync", "batch"):
+        raise SystemExit(
+            f"❌ Unknown TRANSLATION_MODE: {translation_mode}\n"
+            "   Use one of: sync, batch"
+        )
+
     if stage in ("ocr", "all"):
-        if not GOOGLE_CLOUD_API_KEY or GOOGLE_CLOUD_API_KEY == "your-google-cloud-api-key-here":
+        if DETECTION_BACKEND.strip().lower() not in DETECTION_BACKENDS:
+            raise SystemExit(
+                f"❌ Unknown DETECTION_BACKEND: {DETECTION_BACKEND}\n"
+                f"   Use one of: {', '.join(DETECTION_BACKENDS)}"
+            )
+        if DETECTION_BACKEND.strip().lower() == "vision" and (
+            not GOOGLE_CLOUD_API_KEY or GOOGLE_CLOUD_API_KEY == "your-google-cloud-api-key-here"
+        ):
             raise SystemExit(
                 "❌ GOOGLE_CLOUD_API_KEY is not set.\n"
                 "   Add your Google Cloud API key to the .env file."
@@ -67,14 +96,21 @@ def _validate(stage: str) -> None:
                 "   Add PDFs to the input folder and try again."
             )
     
-    if stage == "replace":
+    if stage in ("translate", "replace"):
         extractions_path = OUTPUT_FOLDER / EXTRACTIONS_FILENAME
         if not extractions_path.exists():
             raise SystemExit(
-                f"❌ Cannot run text replacement: {extractions_path} not found.\n"
+                f"❌ Cannot run text {'translation' if stage == 'translate' else 'replacement'}: "
+                f"{extractions_path} not found.\n"
                 "   Run with --stage ocr first, or run --stage all for full pipeline."
             )
 
+    if stage == "translate" and (not OPENAI_API_KEY or OPENAI_API_KEY == "your-openai-api-key-here"):
+        raise SystemExit(
+            "❌ OPENAI_API_KEY is not set.\n"
+            "   Copy .env.example → .env and add your API key."
+        )
+
 
 def main() -> None:
     # ── Parse arguments ─────────────────────────
@@ -83,14 +119,30 @@ def main() -> None:
     )
     parser.add_argument(
         "--stage",
-        choices=["ocr", "replace", "all"],
+        choices=["ocr", "translate", "replace", "all"],
         default="all",
-        help="Which stage(s) to run: ocr (extraction only), replace (text replacement only), or all (default)",
+        help="Which stage(s) to run: ocr (extraction only), translate (submit or resume a "
+             "Batch API translation job), replace (text replacement only), or all (default)",
+    )
+    parser.add_argument(
+        "--translation-mode",
+        choices=["sync", "batch"],
+        default=TRANSLATION_MODE.strip().lower(),
+        help="sync (translate while processing, default from TRANSLATION_MODE) or "
+             "batch (OCR first, then translate through the OpenAI Batch API)",
+    )
+    parser.add_argument(
+        "--detection-cache",
+        choices=["use", "bypass", "refresh"],
+        default=DETECTION_CACHE_MODE,
+        help="Detection result cache: use (default from DETECTION_CACHE_MODE), "
+             "bypass (ignore it) or refresh (re-detect and overwrite)",
     )
     args = parser.parse_args()
     stage = args.stage
+    batch_mode = args.translation_mode == "batch"
 
-    _validate(stage)
+    _validate(stage, args.translation_mode)
 
     # Ensure output folders exist
     OUTPUT_FOLDER.mkdir(parents=True, exist_ok=True)
@@ -105,9 +157,17 @@ def main() -> None:
     log.info(f"  Input              : {INPUT_FOLDER}")
     log.info(f"  Output             : {OUTPUT_FOLDER}")
     if stage in ("ocr", "all"):
-        log.info(f"  Detection          : Google Cloud Vision API")
+        log.info(f"  Detection Backend  : {DETECTION_BACKEND}")
         log.info(f"  Translation Model  : {MODEL}")
+        log.info(f"  Translation Mode   : {args.translation_mode}")
         log.info(f"  DPI                : {DPI}")
+        log.info(f"  Render Workers     : {PDF_RENDER_WORKERS}")
+        if ADAPTIVE_DPI:
+            log.info(f"  Detection DPI      : {PREVIEW_DPI} (adaptive)")
+        log.info(f"  Color Mode         : {COLOR_MODE}")
+        log.info(f"  Detection Cache    : {args.detection_cache}")
+        if PAGE_FILTER_ENABLED:
+            log.info(f"  Page Filter        : min {PAGE_FILTER_MIN_CANDIDATES} candidate(s)")
     if stage in ("replace", "all"):
         log.info(f"  Text Replacement   : {'Enabled' if ENABLE_TEXT_REPLACEMENT else 'Disabled'}")
     log.info("=" * 68)
@@ -122,11 +182,25 @@ def main() -> None:
         log.info(f"✅ Replacement completed in {elapsed}s")
         return
 
-    # ── Initialize services (Google Cloud Vision + GPT-4o Translation) ──────────
-    log.info("\n🚀 Initializing pipeline (Google Cloud Vision detection + GPT-4o translation)...")
-    text_detector = TextDetector()
+    # ── Handle batch translation (submit or resume) ───────────
+    if stage == "translate":
+        log.info("\n📦 Batch Translation Mode (using existing extractions)")
+        _run_batch_translation()
+        elapsed = round(time.time() - start, 2)
+        log.info(f"✅ Batch translation completed in {elapsed}s")
+        return
+
+    # ── Initialize services (detection backend + GPT-4o Translation) ──────────
+    log.info(f"\n🚀 Initializing pipeline ({DETECTION_BACKEND} detection + {MODEL} translation)...")
+    try:
+        text_detector = create_detector(cache_mode=args.detection_cache)
+    except RuntimeError as exc:
+        raise SystemExit(f"❌ {exc}")
     translator = Translator()
-    image_replacer = ImageReplacer() if ENABLE_TEXT_REPLACEMENT and stage in ("replace", "all") else None
+    page_filter = PageFilter() if PAGE_FILTER_ENABLED else None
+    # In batch mode pages are only detected now; replacement runs after the batch job
+    replace_now = stage == "all" and not batch_mode
+    image_replacer = ImageReplacer() if ENABLE_TEXT_REPLACEMENT and replace_now else None
 
     # ── Run pipeline (Detection + Translation) ──────────────────
     # Process each PDF
@@ -134,14 +208,25 @@ def main() -> None:
     log.info(f"Found {len(pdf_files)} PDF(s) in {INPUT_FOLDER}")
 
     results = []
-    images = []
+    # Pages are written as soon as they are finished instead of being held in memory
+    image_saver = _ImageSaver(images_folder) if replace_now else None
 
-    for pdf_path in pdf_files:
-        file_result, file_images = process_pdf_accurate(
-            pdf_path, text_detector, translator, image_replacer
-        )
-        results.append(file_result)
-        images.extend(file_images)
+    # One translation queue for the whole run, so small pages share requests across PDFs
+    batcher = DeferredBatcher() if batch_mode else TranslationBatcher(translator)
+
+    try:
+        for pdf_path in pdf_files:
+            file_result = process_pdf_accurate(
+                pdf_path, text_detector, translator, image_replacer, image_saver, page_filter, batcher
+            )
+            results.append(file_result)
+
+        # Translate (and replace/save) whatever is still queued
+        batcher.flush()
+    finally:
+        # Stop the detection and translation worker threads
+        translator.close()
+        text_detector.close()
 
     elapsed = round(time.time() - start, 2)
 
@@ -150,9 +235,11 @@ def main() -> None:
         "metadata": {
             "generated_at": datetime.now().isoformat(),
             "pipeline_version": "efficient-v1",
-            "detection_method": "Google Cloud Vision",
+            "detection_method": text_detector.name,
             "translation_model": MODEL,
             "dpi": DPI,
+            "detection_dpi": PREVIEW_DPI if ADAPTIVE_DPI and PREVIEW_DPI < DPI else DPI,
+            "color_mode": COLOR_MODE,
             "text_replacement_enabled": ENABLE_TEXT_REPLACEMENT and stage in ("replace", "all"),
             "total_files_processed": len(results),
             "total_elapsed_seconds": elapsed,
@@ -164,13 +251,17 @@ def main() -> None:
     with open(extractions_path, "w", encoding="utf-8") as fh:
         json.dump(extraction_output, fh, ensure_ascii=False, indent=2)
 
-    # ── Save images ─────────────────────────────
-    if stage in ("all", "replace"):
-        log.info(f"\n💾 Saving {len(images)} image(s)...")
-        for img, filename in images:
-            img_path = images_folder / filename
-            img.save(img_path, "PNG")
-            log.debug(f"  Saved: {img_path.name}")
+    if image_saver:
+        log.info(f"\n💾 Saved {image_saver.count} image(s)")
+
+    batch_stats = None
+    if batch_mode:
+        log.info("\n📦 Translating extractions through the Batch API...")
+        batch_stats = _run_batch_translation()
+        if stage == "all":
+            log.info("\n🔄 Text Replacement (using batch translations)")
+            _run_replacement_only(images_folder)
+        elapsed = round(time.time() - start, 2)
 
     # ── Generate processing report ──────────────
     total_pages = sum(f.get("total_pages", 0) for f in results)
@@ -185,6 +276,11 @@ def main() -> None:
                 total_replacements += stats.get("successful", 0)
                 total_failures += stats.get("failed", 0)
 
+    file_usages = [
+        _usage_totals(page.get("translation_usage") for page in f.get("pages", []))
+        for f in results
+    ]
+
     report = {
         "summary": {
             "total_files": len(results),
@@ -192,15 +288,39 @@ def main() -> None:
             "pages_with_japanese": total_japanese_pages,
             "total_replacements_successful": total_replacements,
             "total_replacements_failed": total_failures,
+            "vision_calls_saved": sum(f.get("vision_calls_saved", 0) for f in results),
+            "translation_requests": translator.request_count,
+            "translation_dedup": batcher.dedup_stats(),
+            "translation_usage": _usage_totals(file_usages),
             "elapsed_seconds": elapsed,
         },
+        "translation_memory": (
+            translator.memory.stats() if translator.memory else {"enabled": False}
+        ),
+        "translation_bisection": translator.bisection_stats(),
+        "glossary": (
+            {"entries": len(translator.glossary), "hits": translator.glossary.hits}
+            if translator.glossary else {"enabled": False}
+        ),
+        "detection_cache": (
+            text_detector.cache.stats() if text_detector.cache else {"mode": "bypass"}
+        ),
+        "batch_translation": batch_stats,
         "files": [
             {
                 "file": f.get("file"),
                 "pages": f.get("total_pages"),
                 "japanese_pages": f.get("pages_with_japanese"),
+                "render_seconds": f.get("render_seconds"),
+                "vision_calls_saved": f.get("vision_calls_saved"),
+                "translation_usage": usage,
+                "page_usage": [
+                    {"page": page.get("page_number"), **page["translation_usage"]}
+                    for page in f.get("pages", [])
+                    if page.get("translation_usage")
+                ],
             }
-            for f in results
+            for f, usage in zip(results, file_usages)
         ],
     }
 
@@ -214,16 +334,46 @@ def main() -> None:
     log.info(f"  ✅ Pipeline completed in {elapsed}s")
     log.info(f"  📂 Extraction data  → {extractions_path}")
     log.info(f"  📂 Processing report→ {report_path}")
-    if stage in ("all", "replace"):
-        log.info(f"  🖼️  Images saved     → {images_folder} ({len(images)} files)")
+    if image_saver:
+        log.info(f"  🖼️  Images saved     → {images_folder} ({image_saver.count} files)")
     log.info(f"  📄 Pages processed  : {total_pages}")
     log.info(f"  🇯🇵 Pages with Japanese: {total_japanese_pages}")
-    if ENABLE_TEXT_REPLACEMENT and stage in ("all", "replace"):
+    if ENABLE_TEXT_REPLACEMENT and replace_now:
         log.info(f"  ✏️  Text replacements : {total_replacements} successful, {total_failures} failed")
-    log.info(f"  🚀 Architecture     : Google Cloud Vision + {MODEL} (batch translation)")
+    usage = report["summary"]["translation_usage"]
+    if usage["prompt_tokens"]:
+        log.info(f"  🪙 Translation tokens: {usage['prompt_tokens']} prompt + "
+                 f"{usage['completion_tokens']} completion (≈ ${usage['cost_usd']:.4f})")
+    dedup_stats = batcher.dedup_stats()
+    if dedup_stats["texts"]:
+        log.info(f"  🔁 Unique texts     : {dedup_stats['unique']}/{dedup_stats['texts']} "
+                 f"({dedup_stats['dedup_ratio']:.0%} deduplicated)")
+    if translator.memory:
+        memory_stats = translator.memory.stats()
+        log.info(f"  💾 Translation memory: {memory_stats['hits']} hit(s), "
+                 f"{memory_stats['hit_rate']:.0%} hit rate, "
+                 f"{memory_stats['fuzzy_hits']} variant hit(s), "
+                 f"{memory_stats['fuzzy_suggestions']} suggestion(s)")
+    log.info(f"  🚀 Architecture     : {text_detector.name} + {MODEL} (batch translation)")
     log.info("=" * 68)
 
 
+def _usage_totals(usages) -> dict:
+    """Sum token usage entries (None entries are skipped) into one entry."""
+    prompt_tokens = completion_tokens = 0
+    for usage in usages:
+        if usage:
+            prompt_tokens += usage.get("prompt_tokens", 0)
+            completion_tokens += usage.get("completion_tokens", 0)
+    return usage_entry(prompt_tokens, completion_tokens)
+
+
+def _run_batch_translation() -> dict:
+    """Fill extractions.json through a Batch API job (resuming any pending one)."""
+    extractions_path = OUTPUT_FOLDER / EXTRACTIONS_FILENAME
+    return BatchTranslator().translate_extractions(extractions_path)
+
+
 def _run_replacement_only(images_folder: Path) -> None:
     """Run text replacement using existing extractions.json."""
     extractions_path = OUTPUT_FOLDER / EXTRACTIONS_FILENAME
@@ -232,14 +382,25 @@ def _run_replacement_only(images_folder: Path) -> None:
         extraction_data = json.load(fh)
     
     image_replacer = ImageReplacer()
-    results, images = process_replacement_only(
-        extraction_data, INPUT_FOLDER, image_replacer
+    image_saver = _ImageSaver(images_folder)
+    process_replacement_only(
+        extraction_data, INPUT_FOLDER, image_replacer, image_saver
     )
-    
-    log.info(f"\n💾 Saving {len(images)} image(s)...")
-    for img, filename in images:
-        img_path = images_folder / filename
+
+    log.info(f"\n💾 Saved {image_saver.count} image(s)")
+
+
+class _ImageSaver:
+    """Image sink that writes each finished page straight to the images folder."""
+
+    def __init__(self, images_folder: Path) -> None:
+        self._images_folder = images_folder
+        self.count = 0
+
+    def __call__(self, img, filename: str) -> None:
+        img_path = self._images_folder / filename
         img.save(img_path, "PNG")
+        self.count += 1
         log.debug(f"  Saved: {img_path.name}")
 
 
@@ -0,0 +1,189 @@
+"""
+BatchTranslator against a stand-in Batch API client: fresh submits,
+resuming from the state file, follow-up batches for lines a resumed
+batch does not cover, unreadable output lines and the atomic state write.
+"""
+
+import json
+from types import SimpleNamespace
+
+import pytest
+
+import app.batch_translation as batch_module
+from app.batch_translation import BatchTranslator
+
+
+class FakeBatchClient:
+    """
+    Stores uploaded files and answers each batch with "EN <text>" for
+    every item, unless ``outputs`` holds a ready-made output for its id.
+    """
+
+    def __init__(self, outputs=None):
+        self.stored = {}
+        self.submitted = {}  # batch id → input file id
+        self.outputs = dict(outputs or {})
+        self.files = SimpleNamespace(create=self._create_file, content=self._file_content)
+        self.batches = SimpleNamespace(create=self._create_batch, retrieve=self._retrieve)
+
+    def _create_file(self, file, purpose):
+        file_id = f"file-{len(self.stored) + 1}"
+        self.stored[file_id] = file.read().decode("utf-8")
+        return SimpleNamespace(id=file_id)
+
+    def _file_content(self, file_id):
+        return SimpleNamespace(text=self.stored[file_id])
+
+    def _create_batch(self, input_file_id, endpoint, completion_window):
+        batch_id = f"batch-{len(self.submitted) + 1}"
+        self.submitted[batch_id] = input_file_id
+        return SimpleNamespace(id=batch_id)
+
+    def _retrieve(self, batch_id):
+        output = self.outputs.get(batch_id)
+        if output is None:
+            output = "\n".join(
+                _output_line(request["custom_id"], _answer(request))
+                for request in self.requests(batch_id)
+            )
+        output_id = f"output-{batch_id}"
+        self.stored[output_id] = output
+        return SimpleNamespace(
+            status="completed",
+            request_counts=SimpleNamespace(completed=1, failed=0, total=1),
+            output_file_id=output_id,
+        )
+
+    def requests(self, batch_id):
+        """The request lines submitted as ``batch_id``."""
+        return [json.loads(line) for line in self.stored[self.submitted[batch_id]].splitlines()]
+
+
+def _request_items(request):
+    return json.loads(request["body"]["messages"][1]["content"].split("\n\n", 1)[1])
+
+
+def _answer(request):
+    return json.dumps({"translations": [
+        {"id": item["id"], "text": f"EN {item['text']}"} for item in _request_items(request)
+    ]})
+
+
+def _output_line(custom_id, content, finish_reason="stop"):
+    return json.dumps({
+        "custom_id": custom_id,
+        "response": {"status_code": 200, "body": {
+            "choices": [{"message": {"content": content}, "finish_reason": finish_reason}],
+            "usage": {"prompt_tokens": 10, "completion_tokens": 5},
+        }},
+    }, ensure_ascii=False)
+
+
+def _write_extractions(path, texts):
+    path.write_text(json.dumps({"files": [{"pages": [{"extractions": [
+        {"japanese_text": text, "english_translation": ""} for text in texts
+    ]}]}]}, ensure_ascii=False), encoding="utf-8")
+
+
+def _translations(path):
+    data = json.loads(path.read_text(encoding="utf-8"))
+    return [entry["english_translation"] for entry in data["files"][0]["pages"][0]["extractions"]]
+
+
+@pytest.fixture
+def workspace(tmp_path, monkeypatch):
+    monkeypatch.setattr(batch_module, "get_glossary", lambda: None)
+    extractions = tmp_path / "extractions.json"
+    state = tmp_path / "translation_batch.json"
+    return extractions, state
+
+
+def _translator(client, state):
+    return BatchTranslator(client=client, state_path=state, poll_seconds=0, use_memory=False)
+
+
+def test_fresh_submit_translates_each_distinct_line_once(workspace):
+    extractions, state = workspace
+    _write_extractions(extractions, ["こんにちは", "ありがとう", "こんにちは"])
+    client = FakeBatchClient()
+
+    stats = _translator(client, state).translate_extractions(extractions)
+
+    assert _translations(extractions) == ["EN こんにちは", "EN ありがとう", "EN こんにちは"]
+    assert list(client.submitted) == ["batch-1"]
+    assert stats["batches"] == 1 and stats["translated"] == 2 and stats["untranslated"] == 0
+    assert not state.exists()
+
+
+def test_resume_joins_the_recorded_batch_without_resubmitting(workspace):
+    extractions, state = workspace
+    _write_extractions(extractions, ["こんにちは", "ありがとう"])
+    client = FakeBatchClient()
+    # An earlier run submitted the batch and stopped before joining it
+    _translator(client, state)._submit(["こんにちは", "ありがとう"])
+    assert state.exists()
+
+    stats = _translator(client, state).translate_extractions(extractions)
+
+    assert _translations(extractions) == ["EN こんにちは", "EN ありがとう"]
+    assert list(client.submitted) == ["batch-1"]
+    assert stats["batch_id"] == "batch-1" and stats["batches"] == 1
+    assert not state.exists()
+
+
+def test_lines_the_resumed_batch_does_not_cover_go_out_in_a_follow_up(workspace):
+    extractions, state = workspace
+    _write_extractions(extractions, ["こんにちは", "ありがとう"])
+    client = FakeBatchClient()
+    _translator(client, state)._submit(["こんにちは"])
+
+    stats = _translator(client, state).translate_extractions(extractions)
+
+    assert _translations(extractions) == ["EN こんにちは", "EN ありがとう"]
+    assert list(client.submitted) == ["batch-1", "batch-2"]
+    (follow_up,) = client.requests("batch-2")
+    assert [item["text"] for item in _request_items(follow_up)] == ["ありがとう"]
+    assert stats["batches"] == 2 and stats["requests"] == 2 and stats["translated"] == 2
+    assert not state.exists()
+
+
+def test_unreadable_and_truncated_output_lines_keep_what_they_can(workspace):
+    extractions, state = workspace
+    texts = ["こんにちは", "ありがとう", "さようなら"]
+    _write_extractions(extractions, texts)
+    truncated = '{"translations": [{"id": 1, "text": "EN こんにちは"}, {"id": 2, "text": "EN あり'
+    outputs = {"batch-1": "\n".join([
+        '{"custom_id": "translate-00001", "response": {"status_co',
+        _output_line("translate-00001", truncated, finish_reason="length"),
+        "",
+    ])}
+    client = FakeBatchClient(outputs)
+
+    stats = _translator(client, state).translate_extractions(extractions)
+
+    assert _translations(extractions) == ["EN こんにちは", "", ""]
+    assert stats["translated"] == 1 and stats["untranslated"] == 2
+    # The lines left empty go out in a new batch on the next run
+    client.outputs.clear()
+    _translator(client, state).translate_extractions(extractions)
+    assert _translations(extractions) == ["EN こんにちは", "EN ありがとう", "EN さようなら"]
+
+
+def test_state_file_is_replaced_atomically(workspace, monkeypatch):
+    _, state = workspace
+    client = FakeBatchClient()
+    translator = _translator(client, state)
+    translator._submit(["こんにちは"])
+    recorded = state.read_text(encoding="utf-8")
+
+    def torn_dump(data, fh, **kwargs):
+        fh.write('{"batch_id": "batch-')
+        raise OSError("disk full")
+
+    monkeypatch.setattr(batch_module.json, "dump", torn_dump)
+    with pytest.raises(OSError):
+        translator._submit(["ありがとう"])
+
+    # The interrupted write never touched the recorded state
+    assert state.read_text(encoding="utf-8") == recorded
+    assert json.loads(recorded)["batch_id"] == "batch-1"
@@ -0,0 +1,26 @@
+"""
+Glossary lookups: SFX spellings share one entry, but short entries do
+not swallow dialogue written in hiragana.
+"""
+
+from app.glossary import Glossary
+
+SFX = {"ドン": "BAM", "ドキドキ": "BA-DUMP BA-DUMP", "ジー": "STARE", "ポン": "POP", "ゴゴゴ": "RUMBLE"}
+
+
+def test_sfx_spellings_share_one_entry():
+    glossary = Glossary(SFX)
+
+    assert glossary.lookup("ドンッ！") == "BAM"
+    assert glossary.lookup("ｼﾞｰｰｰ") == "STARE"
+    assert glossary.lookup("どきどき") == "BA-DUMP BA-DUMP"
+    assert glossary.lookup("ゴゴゴゴゴ") == "RUMBLE"
+    assert glossary.hits == 4
+
+
+def test_dialogue_is_not_glossed_by_short_entries():
+    glossary = Glossary(SFX)
+
+    for dialogue in ("じー", "ぽん", "どん", "じーっ…", "ポンと"):
+        assert glossary.lookup(dialogue) is None, dialogue
+    assert glossary.hits == 0
@@ -0,0 +1,69 @@
+"""
+group_regions: columns of one bubble merge into a single region, boxes
+of separate bubbles stay apart.
+"""
+
+import pytest
+
+from app.region_grouping import group_regions
+
+PAGE_WIDTH, PAGE_HEIGHT = 1000, 1000
+
+
+def _detection(text, x0, y0, x1, y1, confidence=0.9):
+    return {
+        "japanese_text": text,
+        "bounding_box": {
+            "x": x0 / PAGE_WIDTH,
+            "y": y0 / PAGE_HEIGHT,
+            "width": (x1 - x0) / PAGE_WIDTH,
+            "height": (y1 - y0) / PAGE_HEIGHT,
+        },
+        "confidence": confidence,
+    }
+
+
+def test_adjacent_columns_of_one_bubble_merge():
+    # Two vertical columns 30 px wide, 10 px apart, read right to left
+    detections = [
+        _detection("元気？", 460, 100, 490, 260, confidence=0.8),
+        _detection("やあ", 500, 100, 530, 300),
+    ]
+
+    regions = group_regions(detections, PAGE_WIDTH, PAGE_HEIGHT, gap_factor=0.6)
+
+    assert len(regions) == 1
+    assert regions[0]["japanese_text"] == "やあ元気？"
+    assert regions[0]["confidence"] == 0.8
+    assert regions[0]["bounding_box"] == pytest.approx({
+        "x": 0.46, "y": 0.1, "width": 0.07, "height": 0.2,
+    })
+
+
+def test_stacked_horizontal_lines_merge():
+    detections = [
+        _detection("こんにちは", 100, 100, 300, 130),
+        _detection("世界", 100, 140, 260, 170),
+    ]
+
+    regions = group_regions(detections, PAGE_WIDTH, PAGE_HEIGHT, gap_factor=0.6)
+
+    assert [r["japanese_text"] for r in regions] == ["こんにちは世界"]
+
+
+def test_separate_bubbles_stay_apart():
+    detections = [
+        _detection("やあ", 500, 100, 530, 300),
+        _detection("元気？", 460, 100, 490, 260),
+        # Another bubble far below, and a column too far to the left
+        _detection("またね", 500, 700, 530, 900),
+        _detection("遠い", 300, 100, 330, 300),
+        # Much larger glyphs (SFX) next to the first bubble
+        _detection("ドン", 540, 100, 640, 300),
+    ]
+
+    regions = group_regions(detections, PAGE_WIDTH, PAGE_HEIGHT, gap_factor=0.6)
+
+    assert sorted(r["japanese_text"] for r in regions) == sorted(
+        ["やあ元気？", "またね", "遠い", "ドン"]
+    )
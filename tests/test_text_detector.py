@@ -0,0 +1,137 @@
+"""
+Vision batching in TextDetector: responses map back to their pages,
+per-image errors stay local, failed batches fall back to single
+requests, and batches respect the count and payload limits.
+"""
+
+import io
+
+import pytest
+from google.cloud import vision
+from PIL import Image
+
+import app.text_detector as text_detector_module
+from app.text_detector import TextDetector
+
+
+def _page(width: int) -> Image.Image:
+    """A blank page whose width identifies it in the fake client."""
+    return Image.new("L", (width, 100), 255)
+
+
+def _response_for(content: bytes) -> vision.AnnotateImageResponse:
+    """One paragraph reading ページ<width>, boxed in the top-left quarter."""
+    width = Image.open(io.BytesIO(content)).width
+    symbols = [vision.Symbol(text=char) for char in f"ページ{width}"]
+    vertices = [
+        vision.Vertex(x=0, y=0),
+        vision.Vertex(x=width // 2, y=0),
+        vision.Vertex(x=width // 2, y=50),
+        vision.Vertex(x=0, y=50),
+    ]
+    paragraph = vision.Paragraph(
+        words=[vision.Word(symbols=symbols)],
+        bounding_box=vision.BoundingPoly(vertices=vertices),
+        confidence=0.95,
+    )
+    block = vision.Block(block_type=vision.Block.BlockType.TEXT, paragraphs=[paragraph])
+    return vision.AnnotateImageResponse(
+        full_text_annotation=vision.TextAnnotation(pages=[vision.Page(blocks=[block])])
+    )
+
+
+class FakeVisionClient:
+    """Answers batch_annotate_images like Vision, with configurable failures."""
+
+    def __init__(self, error_widths=(), fail_batches=False):
+        self.error_widths = set(error_widths)
+        self.fail_batches = fail_batches
+        self.batch_sizes = []
+        self.single_calls = 0
+
+    def batch_annotate_images(self, requests):
+        self.batch_sizes.append(len(requests))
+        if self.fail_batches:
+            raise RuntimeError("503 Service Unavailable")
+        responses = []
+        for request in requests:
+            content = request.image.content
+            if Image.open(io.BytesIO(content)).width in self.error_widths:
+                responses.append(vision.AnnotateImageResponse(
+                    error={"code": 3, "message": "Bad image data"}
+                ))
+            else:
+                responses.append(_response_for(content))
+        return vision.BatchAnnotateImagesResponse(responses=responses)
+
+    def document_text_detection(self, image):
+        self.single_calls += 1
+        return _response_for(image.content)
+
+
+@pytest.fixture
+def make_detector():
+    """Build detectors around a fake client; closed after the test."""
+    built = []
+
+    def make(client, concurrency=2):
+        detector = TextDetector(client=client, concurrency=concurrency, cache_mode="bypass")
+        built.append(detector)
+        return detector
+
+    yield make
+    for detector in built:
+        detector.close()
+
+
+def _texts(results):
+    return [None if detections is None else [d["japanese_text"] for d in detections]
+            for detections in results]
+
+
+def test_responses_map_back_to_pages_in_order(monkeypatch, make_detector):
+    monkeypatch.setattr(text_detector_module, "VISION_BATCH_SIZE", 2)
+    client = FakeVisionClient()
+    widths = [101, 102, 103, 104, 105]
+
+    results = make_detector(client)._detect_pages([_page(w) for w in widths], [f"p{w}" for w in widths])
+
+    assert client.batch_sizes == [2, 2, 1]
+    assert _texts(results) == [[f"ページ{w}"] for w in widths]
+    assert results[0][0]["bounding_box"] == pytest.approx(
+        {"x": 0.0, "y": 0.0, "width": 50 / 101, "height": 0.5}
+    )
+
+
+def test_error_on_one_image_only_fails_that_page(monkeypatch, make_detector):
+    monkeypatch.setattr(text_detector_module, "VISION_BATCH_SIZE", 16)
+    client = FakeVisionClient(error_widths={102})
+
+    results = make_detector(client)._detect_pages([_page(w) for w in (101, 102, 103)], ["a", "b", "c"])
+
+    assert _texts(results) == [["ページ101"], None, ["ページ103"]]
+    assert client.single_calls == 0
+
+
+def test_failed_batch_falls_back_to_single_requests(monkeypatch, make_detector):
+    monkeypatch.setattr(text_detector_module, "VISION_BATCH_SIZE", 16)
+    client = FakeVisionClient(fail_batches=True)
+
+    results = make_detector(client)._detect_pages([_page(w) for w in (101, 102, 103)], ["a", "b", "c"])
+
+    assert client.batch_sizes == [3]
+    assert client.single_calls == 3
+    assert _texts(results) == [["ページ101"], ["ページ102"], ["ページ103"]]
+
+
+def test_plan_batches_honours_count_and_payload_limits(monkeypatch):
+    monkeypatch.setattr(text_detector_module, "VISION_BATCH_SIZE", 3)
+    monkeypatch.setattr(text_detector_module, "VISION_BATCH_MAX_MB", 1)
+    mb = 1024 * 1024
+
+    # Count limit alone
+    assert TextDetector._plan_batches([10] * 7) == [[0, 1, 2], [3, 4, 5], [6]]
+    # Payload limit closes a batch before the count limit does
+    assert TextDetector._plan_batches([mb // 2, mb // 2, 1, mb // 2]) == [[0, 1], [2, 3]]
+    # An image over the payload limit still gets a batch of its own
+    assert TextDetector._plan_batches([2 * mb, 10]) == [[0], [1]]
@@ -0,0 +1,70 @@
+"""
+merge_tile_detections: text seen in two overlapping tiles comes out once,
+in page coordinates.
+"""
+
+import pytest
+
+from app.tiling import merge_tile_detections, plan_tiles
+
+PAGE_WIDTH, PAGE_HEIGHT = 1000, 3000
+
+
+def _tile_box(x0, y0, x1, y1, top, bottom):
+    """Normalized tile box of a page-pixel box (rows clipped to the tile)."""
+    height = bottom - top
+    y0, y1 = max(y0, top) - top, min(y1, bottom) - top
+    return {
+        "x": x0 / PAGE_WIDTH,
+        "y": y0 / height,
+        "width": (x1 - x0) / PAGE_WIDTH,
+        "height": (y1 - y0) / height,
+    }
+
+
+def _detection(text, box):
+    return {"japanese_text": text, "bounding_box": box, "confidence": 0.9}
+
+
+def test_box_across_tile_seam_is_kept_once_in_page_coordinates():
+    spans = plan_tiles(PAGE_HEIGHT, 1600, 200)
+    assert spans == [(0, 1600), (1400, 3000)]
+    (top_a, bottom_a), (top_b, bottom_b) = spans
+
+    # Rows 1550-1650 cross the first tile's bottom edge (1600): the first
+    # tile only sees a clipped copy, the second sees it whole
+    seam = (100, 1550, 300, 1650)
+    tile_results = [
+        ((top_a, bottom_a), [
+            _detection("上のセリフ", _tile_box(100, 200, 300, 300, top_a, bottom_a)),
+            _detection("境目", _tile_box(*seam, top_a, bottom_a)),
+        ]),
+        ((top_b, bottom_b), [
+            _detection("境目", _tile_box(*seam, top_b, bottom_b)),
+            _detection("下のセリフ", _tile_box(100, 2700, 300, 2800, top_b, bottom_b)),
+        ]),
+    ]
+
+    merged = merge_tile_detections(tile_results, PAGE_WIDTH, PAGE_HEIGHT)
+
+    assert [d["japanese_text"] for d in merged] == ["上のセリフ", "境目", "下のセリフ"]
+    assert merged[1]["bounding_box"] == pytest.approx({
+        "x": 100 / PAGE_WIDTH,
+        "y": 1550 / PAGE_HEIGHT,
+        "width": 200 / PAGE_WIDTH,
+        "height": 100 / PAGE_HEIGHT,
+    })
+
+
+def test_box_inside_overlap_seen_by_both_tiles_is_kept_once():
+    spans = plan_tiles(PAGE_HEIGHT, 1600, 200)
+    inside = (400, 1450, 600, 1550)  # wholly within both tiles
+
+    merged = merge_tile_detections(
+        [(span, [_detection("重なり", _tile_box(*inside, *span))]) for span in spans],
+        PAGE_WIDTH, PAGE_HEIGHT,
+    )
+
+    assert len(merged) == 1
+    assert merged[0]["bounding_box"]["y"] == pytest.approx(1450 / PAGE_HEIGHT)
+    assert merged[0]["bounding_box"]["height"] == pytest.approx(100 / PAGE_HEIGHT)
@@ -0,0 +1,58 @@
+"""
+TranslationBatcher: each normalized text is sent once, spelled as first
+seen, and pages waiting for translation are bounded by their bitmap size.
+"""
+
+from app.translation_batcher import TranslationBatcher
+
+MB = 1024 * 1024
+
+
+class FakeTranslator:
+    """Records every batch it is asked to translate."""
+
+    concurrency = 1
+
+    def __init__(self):
+        self.batches = []
+
+    def translate_batch(self, texts, label="", on_item=None):
+        self.batches.append(list(texts))
+        return [f"EN {text}" for text in texts]
+
+    def usage_snapshot(self):
+        return {"prompt_tokens": 0, "completion_tokens": 0}
+
+
+def _collector(results, name):
+    return lambda translations, usage: results.__setitem__(name, translations)
+
+
+def test_first_original_spelling_is_sent_and_fanned_out():
+    translator = FakeTranslator()
+    batcher = TranslationBatcher(translator, token_budget=10_000, max_pending_mb=1_000)
+    results = {}
+
+    # Half-width katakana normalizes to the same key as the full-width form
+    batcher.add(["ﾊﾞｶ!", "やあ"], _collector(results, "p1"), label="p1")
+    batcher.add(["バカ!"], _collector(results, "p2"), label="p2")
+    batcher.flush()
+
+    assert translator.batches == [["ﾊﾞｶ!", "やあ"]]
+    assert results == {"p1": ["EN ﾊﾞｶ!", "EN やあ"], "p2": ["EN ﾊﾞｶ!"]}
+
+
+def test_pending_pages_flush_at_the_bitmap_cap():
+    translator = FakeTranslator()
+    batcher = TranslationBatcher(
+        translator, token_budget=10_000, max_pending_pages=100, max_pending_mb=20
+    )
+    results = {}
+
+    batcher.add(["一"], _collector(results, "p1"), label="p1", held_bytes=8 * MB)
+    batcher.add(["二"], _collector(results, "p2"), label="p2", held_bytes=8 * MB)
+    assert translator.batches == []
+
+    batcher.add(["三"], _collector(results, "p3"), label="p3", held_bytes=8 * MB)
+    assert translator.batches == [["一", "二", "三"]]
+    assert set(results) == {"p1", "p2", "p3"}
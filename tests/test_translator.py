@@ -0,0 +1,225 @@
+"""
+Response parsing (streamed chunks, truncated answers, the free-form
+fallback, unknown ids) and the request flow around it: truncated answers
+keep the items they completed and only the rest is requested again, with
+a larger max_tokens, and batches the API rejects for their content are
+bisected down to the offending item.
+"""
+
+import json
+from types import SimpleNamespace
+
+import httpx
+import openai
+import pytest
+
+import app.translator as translator_module
+from app.glossary import Glossary
+from app.rate_limiter import RateLimiter
+from app.translator import Translator, _ItemStreamParser, parse_translation_items
+
+TRUNCATED = (
+    '{"translations": [{"id": 1, "text": "Hello"}, '
+    '{"id": 2, "text": "Thank you"}, {"id": 3, "text": "How are'
+)
+
+
+class FakeCompletions:
+    """Answers the first request truncated, later ones in full."""
+
+    def __init__(self):
+        self.requests = []
+
+    def create(self, **request):
+        self.requests.append(request)
+        items = json.loads(request["messages"][1]["content"].split("\n\n", 1)[1])
+        if len(self.requests) == 1:
+            content, finish_reason = TRUNCATED, "length"
+        else:
+            content = json.dumps({
+                "translations": [{"id": item["id"], "text": f"EN {item['text']}"} for item in items]
+            })
+            finish_reason = "stop"
+        choice = SimpleNamespace(
+            message=SimpleNamespace(content=content), finish_reason=finish_reason
+        )
+        return SimpleNamespace(choices=[choice], usage=None)
+
+
+@pytest.fixture
+def make_translator():
+    """Build translators around a fake completions client; closed after the test."""
+    built = []
+
+    def make(completions, **kwargs):
+        translator = Translator(
+            client=SimpleNamespace(chat=SimpleNamespace(completions=completions)),
+            use_memory=False,
+            glossary=Glossary(),
+            rate_limiter=RateLimiter(0, 0),
+            streaming=False,
+            **kwargs,
+        )
+        built.append(translator)
+        return translator
+
+    yield make
+    for translator in built:
+        translator.close()
+
+
+def _requested_ids(request):
+    items = json.loads(request["messages"][1]["content"].split("\n\n", 1)[1])
+    return [item["id"] for item in items]
+
+
+def test_parse_truncated_answer_keeps_completed_items():
+    assert parse_translation_items(TRUNCATED, [1, 2, 3]) == {}
+    assert parse_translation_items(TRUNCATED, [1, 2, 3], truncated=True) == {
+        1: "Hello",
+        2: "Thank you",
+    }
+
+
+def test_stream_parser_assembles_items_split_across_chunks():
+    answer = (
+        '{"translations": [{"id": 1, "text": "Hi {there}"}, '
+        '{"id": 2, "text": "Say \\"no\\" ]"}, {"id": 3, "text": "Bye"}]}'
+    )
+    parser = _ItemStreamParser()
+    chunks = [answer[i:i + 7] for i in range(0, len(answer), 7)]
+
+    found = [item for chunk in chunks for item in parser.feed(chunk)]
+
+    assert found == [(1, "Hi {there}"), (2, 'Say "no" ]'), (3, "Bye")]
+
+
+def test_stream_parser_reports_each_item_when_its_object_closes():
+    parser = _ItemStreamParser()
+
+    assert parser.feed('{"translations": [{"id": 1, "te') == []
+    assert parser.feed('xt": "Hello"}, {"id": 2, ') == [(1, "Hello")]
+    assert parser.feed('"text": ""}, {"id": 3, "text": "Bye"}]}') == [(3, "Bye")]
+
+
+def test_parse_falls_back_to_free_form_answers():
+    numbered = "1. Hello\n2. Thank you"
+
+    assert parse_translation_items(numbered, [4, 5]) == {4: "Hello", 5: "Thank you"}
+    # A free-form answer with the wrong number of lines cannot be aligned
+    assert parse_translation_items(numbered, [4, 5, 6]) == {}
+
+
+def test_parse_drops_unknown_ids_and_empty_texts():
+    content = json.dumps({"translations": [
+        {"id": 1, "text": "Hello"},
+        {"id": 7, "text": "Stray"},
+        {"id": 2, "text": "  "},
+        {"id": "3", "text": "Wrong type"},
+    ]})
+
+    assert parse_translation_items(content, [1, 2, 3]) == {1: "Hello"}
+    assert parse_translation_items(TRUNCATED, [2, 3], truncated=True) == {2: "Thank you"}
+
+
+def test_truncated_answer_retries_only_missing_ids(monkeypatch, make_translator):
+    monkeypatch.setattr(translator_module, "RETRY_DELAY_SECONDS", 0)
+    completions = FakeCompletions()
+    translator = make_translator(completions)
+
+    translations, answered = translator._translate_api(
+        ["こんにちは", "ありがとう", "お元気ですか"], "test"
+    )
+
+    assert answered
+    assert translations == ["Hello", "Thank you", "EN お元気ですか"]
+    assert [_requested_ids(request) for request in completions.requests] == [[1, 2, 3], [3]]
+    # The retry gets twice the limit the remaining item would normally get
+    assert completions.requests[1]["max_tokens"] == translator_module.completion_token_limit(
+        ["お元気ですか"], scale=2.0
+    )
+
+
+def _bad_request(code, message):
+    response = httpx.Response(400, request=httpx.Request("POST", "https://api.openai.com/v1"))
+    return openai.BadRequestError(message, response=response, body={"code": code, "message": message})
+
+
+class RejectingCompletions:
+    """Raises ``error`` for any request containing a rejected text, answers the rest."""
+
+    def __init__(self, rejected, error):
+        self.rejected = set(rejected)
+        self.error = error
+        self.requests = []
+
+    def create(self, **request):
+        self.requests.append(request)
+        items = json.loads(request["messages"][1]["content"].split("\n\n", 1)[1])
+        if any(item["text"] in self.rejected for item in items):
+            raise self.error
+        content = json.dumps({
+            "translations": [{"id": item["id"], "text": f"EN {item['text']}"} for item in items]
+        })
+        choice = SimpleNamespace(message=SimpleNamespace(content=content), finish_reason="stop")
+        return SimpleNamespace(choices=[choice], usage=None)
+
+
+TEXTS = ["一", "二", "三", "四"]
+CONTENT_FILTERED = _bad_request("content_filter", "The response was filtered")
+
+
+def test_bisection_isolates_a_single_rejected_item(monkeypatch, make_translator):
+    monkeypatch.setattr(translator_module, "RETRY_DELAY_SECONDS", 0)
+    completions = RejectingCompletions({"三"}, CONTENT_FILTERED)
+    translator = make_translator(completions)
+
+    translations = translator._translate_bisecting(TEXTS, "test")
+
+    assert translations == ["EN 一", "EN 二", "", "EN 四"]
+    # Level 1 answers the clean half; level 2 splits the other one
+    assert translator.bisection_stats() == {
+        "1": {"requests": 2, "items": 4, "recovered": 2},
+        "2": {"requests": 2, "items": 2, "recovered": 1},
+    }
+
+
+def test_bisection_of_an_all_rejected_batch_leaves_every_item_empty(monkeypatch, make_translator):
+    monkeypatch.setattr(translator_module, "RETRY_DELAY_SECONDS", 0)
+    completions = RejectingCompletions(TEXTS, CONTENT_FILTERED)
+    translator = make_translator(completions)
+
+    translations = translator._translate_bisecting(TEXTS, "test")
+
+    assert translations == ["", "", "", ""]
+    assert translator.bisection_stats() == {
+        "1": {"requests": 2, "items": 4, "recovered": 0},
+        "2": {"requests": 4, "items": 4, "recovered": 0},
+    }
+    assert len(completions.requests) == translator_module.MAX_RETRIES + 6
+
+
+def test_request_level_400_fails_once_without_bisecting(monkeypatch, make_translator):
+    monkeypatch.setattr(translator_module, "RETRY_DELAY_SECONDS", 0)
+    error = _bad_request("unsupported_parameter", "Unsupported parameter: 'response_format'")
+    completions = RejectingCompletions(TEXTS, error)
+    translator = make_translator(completions)
+
+    translations = translator._translate_bisecting(TEXTS, "test")
+
+    assert translations == ["", "", "", ""]
+    assert len(completions.requests) == 1
+    assert translator.bisection_stats() == {}
+
+
+def test_close_stops_the_request_pool():
+    with Translator(
+        client=SimpleNamespace(chat=SimpleNamespace(completions=FakeCompletions())),
+        use_memory=False,
+        glossary=Glossary(),
+        rate_limiter=RateLimiter(0, 0),
+        concurrency=2,
+    ) as translator:
+        pool = translator._pool
+    with pytest.raises(RuntimeError):
+        pool.submit(print)